@@ -1,6 +1,8 @@
 import os
 import sys
 import glob
+import uuid
+import itertools
 import streamlit as st
 
 # --------------------------------------------------
@@ -9,8 +11,13 @@ import streamlit as st
 ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, ROOT_DIR)
 
-from src.agents.finance_agent import run_finance_agent
+from src.agents.finance_agent import run_finance_agent_stream, new_conversation_memory
 from src.agents.rag_agent import StockMarketRAGAgent
+from src.registry import registry
+from src.ratelimit import set_request_context, PRIORITY_INTERACTIVE
+from src.tracing import recent_traces, metrics_text
+from src.tools.llm_cache import get_llm_cache
+from src.config import LLM_CACHE_ENABLED
 
 # --------------------------------------------------
 # Page Config
@@ -115,9 +122,26 @@ div[data-testid="stChatMessage"][data-message-author-role="assistant"] {
 </style>
 """, unsafe_allow_html=True)
 
+# --------------------------------------------------
+# Shared RAG agent (one per process, not per session)
+# --------------------------------------------------
+def get_rag_agent():
+    def build():
+        agent = StockMarketRAGAgent()
+        agent.ingest_pdfs(glob.glob("data/pdfs/*.pdf"))
+        return agent
+
+    return registry.get("rag_agent", build)
+
 # --------------------------------------------------
 # Session State
 # --------------------------------------------------
+if "session_id" not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+
+# upstream rate limits are shared fairly between sessions
+set_request_context(session=st.session_state.session_id, priority=PRIORITY_INTERACTIVE)
+
 if "show_intro" not in st.session_state:
     st.session_state.show_intro = True
 
@@ -127,6 +151,11 @@ if "active_agent" not in st.session_state:
 if "finance_messages" not in st.session_state:
     st.session_state.finance_messages = []
 
+# what the finance agent sees: rolling summary + recent turns + facts
+# (finance_messages is only for display)
+if "finance_memory" not in st.session_state:
+    st.session_state.finance_memory = new_conversation_memory()
+
 if "rag_messages" not in st.session_state:
     st.session_state.rag_messages = []
 
@@ -139,6 +168,9 @@ if "rag_ready" not in st.session_state:
 if "answer_style" not in st.session_state:
     st.session_state.answer_style = "Detailed"
 
+if "debug_panel" not in st.session_state:
+    st.session_state.debug_panel = False
+
 # --------------------------------------------------
 # Sidebar
 # --------------------------------------------------
@@ -166,6 +198,7 @@ with st.sidebar:
     if st.session_state.active_agent == "Finance Planner":
         if st.button("🗑 Clear Finance Chat"):
             st.session_state.finance_messages = []
+            st.session_state.finance_memory = new_conversation_memory()
             st.rerun()
 
     if st.session_state.active_agent == "Stock Market RAG":
@@ -173,6 +206,46 @@ with st.sidebar:
             st.session_state.rag_messages = []
             st.rerun()
 
+        if st.session_state.rag_agent is not None:
+            cache_stats = st.session_state.rag_agent.answer_cache.stats()
+            st.caption(
+                f"Answer cache: {cache_stats['hits']} hits / "
+                f"{cache_stats['hits'] + cache_stats['misses']} queries, "
+                f"{cache_stats['latency_saved_s']}s saved"
+            )
+
+    st.divider()
+    st.session_state.debug_panel = st.checkbox("🔎 Debug panel", value=st.session_state.debug_panel)
+
+    if st.session_state.debug_panel:
+        traces = recent_traces(session=st.session_state.session_id, limit=5)
+        if not traces:
+            st.caption("No requests traced yet.")
+
+        for t in traces:
+            label = f"{t['name']} · {t['attrs'].get('route', '')} · {t['duration_ms']:.0f} ms"
+            with st.expander(label):
+                st.caption(f"query: {t['attrs'].get('query_chars', 0)} chars, #{t['attrs'].get('query_hash', '')}")
+                for s in t["spans"]:
+                    depth, parent = 0, s["parent"]
+                    while parent is not None:
+                        depth, parent = depth + 1, t["spans"][parent]["parent"]
+                    st.text(f"{'  ' * depth}{s['name']:<24} {s['duration_ms']:>9.1f} ms")
+                    if s["attrs"]:
+                        st.caption(f"{'  ' * depth}{s['attrs']}")
+
+        if LLM_CACHE_ENABLED:
+            llm_cache = get_llm_cache().stats()
+            st.caption(
+                f"LLM cache: {llm_cache['hits']} hits / "
+                f"{llm_cache['hits'] + llm_cache['misses']} lookups "
+                f"({llm_cache['bypassed']} bypassed), "
+                f"{llm_cache['entries']} entries, {llm_cache['bytes'] / 1024:.0f} KB"
+            )
+
+        with st.expander("Prometheus metrics"):
+            st.code(metrics_text(), language="text")
+
 # --------------------------------------------------
 # INTRO SCREEN
 # --------------------------------------------------
@@ -249,12 +322,14 @@ if st.session_state.active_agent == "Finance Planner":
             st.write(query)
 
         with st.chat_message("assistant"):
+            # tools run before the first token; show the spinner until then
             with st.spinner("Thinking..."):
-                response = run_finance_agent(
+                stream = run_finance_agent_stream(
                     query,
-                    chat_history=st.session_state.finance_messages
+                    memory=st.session_state.finance_memory
                 )
-            st.write(response)
+                first = next(stream, "")
+            response = st.write_stream(itertools.chain([first], stream))
 
         st.session_state.finance_messages.append(
             {"role": "assistant", "content": response})
@@ -271,10 +346,7 @@ if st.session_state.active_agent == "Stock Market RAG":
 
     if not st.session_state.rag_ready:
         with st.spinner("Indexing documents..."):
-            agent = StockMarketRAGAgent()
-            pdfs = glob.glob("data/pdfs/*.pdf")
-            agent.ingest_pdfs(pdfs)
-            st.session_state.rag_agent = agent
+            st.session_state.rag_agent = get_rag_agent()
             st.session_state.rag_ready = True
         st.success("Documents indexed successfully!")
         st.rerun()
@@ -295,19 +367,23 @@ if st.session_state.active_agent == "Stock Market RAG":
 
         with st.chat_message("assistant"):
             with st.spinner("Searching documents..."):
-                result = st.session_state.rag_agent.ask(
+                result = st.session_state.rag_agent.ask_stream(
                     query,
                     answer_style=st.session_state.answer_style
                 )
 
-            st.markdown(result["answer"])
+            # sources are known before generation; render them right away
+            answer_box = st.container()
 
             st.markdown("**Sources:**")
             for src in result["sources"]:
                 st.write(f"{src['source']} | Page {src['page']}")
 
+            with answer_box:
+                answer = st.write_stream(result["tokens"])
+
         st.session_state.rag_messages.append(
-            {"role": "assistant", "content": result["answer"]}
+            {"role": "assistant", "content": answer}
         )
         
         st.rerun()
\ No newline at end of file
@@ -0,0 +1,195 @@
+"""
+Answer a file of questions with the Stock Market RAG agent.
+
+Input is JSONL ({"id": ..., "question": ...} per line; id optional) or
+CSV (a "question" column, optional "id" column; otherwise the first
+column). Answers are appended to the output JSONL as they finish, one
+line per question. Re-running with the same output file skips questions
+already answered and retries the ones that failed (the later line wins).
+
+Usage:
+    python batch_qa.py questions.csv answers.jsonl
+    python batch_qa.py questions.jsonl answers.jsonl --style Concise --concurrency 8
+
+Needs an ingested index (data/vector_store), e.g. from test_rag.py.
+LLM calls run at batch priority under the shared Groq rate limit.
+"""
+
+import os
+import csv
+import json
+import time
+import argparse
+
+import numpy as np
+
+from src.config import BATCH_LLM_CONCURRENCY
+
+
+DEFAULT_BATCH_SIZE = 64
+
+
+# --------------------------------------------------
+# INPUT / OUTPUT
+# --------------------------------------------------
+def read_questions(path: str):
+    """
+    [(id, question)] in file order; ids default to the 1-based row number.
+    """
+    questions = []
+    if path.lower().endswith(".jsonl"):
+        with open(path, encoding="utf-8") as f:
+            for n, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                questions.append((str(row.get("id", n)), row["question"]))
+    else:
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            reader = csv.DictReader(f)
+            columns = {name.lower().strip(): name for name in reader.fieldnames or []}
+            question_col = columns.get("question") or (reader.fieldnames or [None])[0]
+            if question_col is None:
+                raise SystemExit(f"no columns in {path}")
+            id_col = columns.get("id")
+            for n, row in enumerate(reader, start=1):
+                question = (row.get(question_col) or "").strip()
+                if question:
+                    questions.append((str(row[id_col]) if id_col else str(n), question))
+
+    ids = [qid for qid, _ in questions]
+    if len(set(ids)) != len(ids):
+        raise SystemExit(f"duplicate ids in {path}; resuming needs unique ids")
+    return questions
+
+
+def answered_ids(path: str) -> set:
+    """
+    Ids with an answer in an earlier run's output (later lines win).
+    """
+    status = {}
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                # partial line from an interrupted run
+                continue
+            status[str(row.get("id"))] = not row.get("error")
+    return {qid for qid, ok in status.items() if ok}
+
+
+def open_output(path: str):
+    """
+    Append mode, starting on a fresh line if the last run died mid-write.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    needs_newline = False
+    if os.path.exists(path) and os.path.getsize(path):
+        with open(path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) != b"\n"
+    out = open(path, "a", encoding="utf-8")
+    if needs_newline:
+        out.write("\n")
+    return out
+
+
+# --------------------------------------------------
+# RUN
+# --------------------------------------------------
+def run_batch(agent, questions, out, answer_style: str, concurrency: int,
+              batch_size: int, use_cache: bool):
+    """
+    Answer questions in chunks of batch_size (one embedding call and one
+    FAISS search per chunk), writing each answer as soon as it is done.
+    """
+    stats = {"answered": 0, "cached": 0, "errors": 0, "prepare_s": 0.0}
+    latencies = []
+    start = time.perf_counter()
+
+    for offset in range(0, len(questions), batch_size):
+        chunk = questions[offset:offset + batch_size]
+        chunk_start = time.perf_counter()
+        first = True
+
+        results = agent.ask_batch([q for _, q in chunk], answer_style=answer_style,
+                                  use_cache=use_cache, concurrency=concurrency)
+        for i, result in results:
+            if first:
+                # retrieval for the whole chunk is done before the first result
+                stats["prepare_s"] += time.perf_counter() - chunk_start
+                first = False
+
+            qid, question = chunk[i]
+            out.write(json.dumps({"id": qid, "question": question, **result}, ensure_ascii=False) + "\n")
+            out.flush()
+
+            if result.get("error"):
+                stats["errors"] += 1
+                continue
+            stats["answered"] += 1
+            if result["cached"]:
+                stats["cached"] += 1
+            else:
+                latencies.append(result["seconds"])
+
+        done = min(offset + batch_size, len(questions))
+        elapsed = time.perf_counter() - start
+        print(f"  {done}/{len(questions)} questions, {done / elapsed:.2f}/s")
+
+    wall = time.perf_counter() - start
+    return dict(
+        stats,
+        questions=len(questions),
+        wall_s=round(wall, 2),
+        questions_per_s=round(len(questions) / wall, 2) if wall else None,
+        prepare_s=round(stats["prepare_s"], 2),
+        generate_p50_s=round(float(np.percentile(latencies, 50)), 2) if latencies else None,
+        generate_p95_s=round(float(np.percentile(latencies, 95)), 2) if latencies else None,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("questions", help="questions file (.jsonl or .csv)")
+    parser.add_argument("output", help="answers file (.jsonl), appended to and resumed from")
+    parser.add_argument("--style", choices=["Detailed", "Concise"], default="Detailed")
+    parser.add_argument("--concurrency", type=int, default=BATCH_LLM_CONCURRENCY,
+                        help="LLM calls in flight at once")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="questions embedded and searched together")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="do not read or write the semantic answer cache")
+    parser.add_argument("--restart", action="store_true",
+                        help="ignore earlier answers in the output file")
+    args = parser.parse_args()
+
+    from src.agents.rag_agent import StockMarketRAGAgent
+    from src.tools.vector_store import index_exists
+
+    if not index_exists():
+        raise SystemExit("no index in data/vector_store: ingest data/pdfs first (python test_rag.py)")
+
+    questions = read_questions(args.questions)
+    done = set() if args.restart else answered_ids(args.output)
+    todo = [(qid, q) for qid, q in questions if qid not in done]
+    print(f"{len(questions)} questions, {len(questions) - len(todo)} already answered, "
+          f"{len(todo)} to go (concurrency {args.concurrency}, batch {args.batch_size})")
+    if not todo:
+        raise SystemExit(0)
+
+    agent = StockMarketRAGAgent()
+    with (open(args.output, "w", encoding="utf-8") if args.restart else open_output(args.output)) as out:
+        summary = run_batch(agent, todo, out, args.style, args.concurrency,
+                            args.batch_size, not args.no_cache)
+
+    print(f"\n{summary['answered']} answered ({summary['cached']} from cache), "
+          f"{summary['errors']} errors in {summary['wall_s']}s: "
+          f"{summary['questions_per_s']} questions/s")
+    print(f"retrieval {summary['prepare_s']}s, generation p50 {summary['generate_p50_s']}s "
+          f"p95 {summary['generate_p95_s']}s")
@@ -0,0 +1,77 @@
+"""
+Latency of sparse (BM25), dense (FAISS) and hybrid retrieval
+over the saved index.
+
+Run from the repo root after ingesting data/pdfs:
+    python -m benchmarks.bench_hybrid
+"""
+
+import time
+import argparse
+import numpy as np
+
+from src.tools.vector_store import load_faiss_index
+from src.tools.retrieval import hybrid_search
+
+
+QUERIES = [
+    "What are the powers of SEBI?",
+    "Section 11B directions",
+    "Section 45-IA registration of NBFC",
+    "functions of the Reserve Bank",
+    "penalty for insider trading",
+    "repo rate decision",
+    "constitution of the Central Board",
+    "collective investment scheme",
+    "Section 15HA fraudulent and unfair trade practices",
+    "liquidity adjustment facility",
+]
+
+
+def percentiles(values):
+    return {
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3),
+    }
+
+
+def run(k: int, repeat: int):
+    db = load_faiss_index()
+    sparse = db.docstore.sparse
+
+    # warm up model and caches
+    for q in QUERIES:
+        hybrid_search(db, q, k=k)
+
+    timings = {"sparse": [], "dense": [], "hybrid": []}
+    modes = {}
+    for _ in range(repeat):
+        for q in QUERIES:
+            start = time.perf_counter()
+            sparse.search(q, k=k)
+            timings["sparse"].append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            db.similarity_search(q, k=k)
+            timings["dense"].append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            result = hybrid_search(db, q, k=k)
+            timings["hybrid"].append((time.perf_counter() - start) * 1000)
+            modes[result["mode"]] = modes.get(result["mode"], 0) + 1
+
+    return {name: percentiles(values) for name, values in timings.items()}, modes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--k", type=int, default=6)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    results, modes = run(args.k, args.repeat)
+
+    print(f"{'path':<10}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, r in results.items():
+        print(f"{name:<10}{r['p50_ms']:>10}{r['p99_ms']:>10}")
+    print("\nhybrid modes:", modes)
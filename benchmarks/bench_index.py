@@ -0,0 +1,133 @@
+"""
+Benchmark FAISS index types against exact (flat) search.
+
+Reports build time, recall@k vs flat, and p50/p99 single-query latency
+for each index type and nprobe / efSearch setting.
+
+Run from the repo root:
+    python -m benchmarks.bench_index
+    python -m benchmarks.bench_index --synthetic 100000 --k 6
+"""
+
+import os
+import json
+import time
+import argparse
+import numpy as np
+import faiss
+
+from src.tools.vector_store import (
+    VECTOR_DB_PATH,
+    make_faiss_index,
+    set_search_params,
+)
+
+
+SWEEPS = {
+    "flat": [{}],
+    "ivf_flat": [{"nprobe": p} for p in (1, 4, 16, 64)],
+    "ivf_pq": [{"nprobe": p} for p in (1, 4, 16, 64)],
+    "hnsw": [{"ef_search": e} for e in (16, 64, 256)],
+}
+
+
+def load_vectors(synthetic: int, dim: int, seed: int):
+    """
+    Vectors from the saved corpus index, or a synthetic clustered set.
+    """
+    path = os.path.join(VECTOR_DB_PATH, "index.faiss")
+    if not synthetic and os.path.exists(path):
+        index = faiss.read_index(path)
+        return index.reconstruct_n(0, index.ntotal), "corpus"
+
+    n = synthetic or 20_000
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(1, n // 100), dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, len(centers), n)]
+    vectors += 0.3 * rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors, "synthetic"
+
+
+def make_queries(vectors, count: int, seed: int):
+    rng = np.random.default_rng(seed + 1)
+    picked = vectors[rng.choice(len(vectors), min(count, len(vectors)), replace=False)]
+    noise = 0.1 * picked.std() * rng.standard_normal(picked.shape).astype(np.float32)
+    return np.ascontiguousarray(picked + noise, dtype=np.float32)
+
+
+def recall_at_k(found, truth, k: int) -> float:
+    hits = sum(len(set(f[:k]) & set(t[:k])) for f, t in zip(found, truth))
+    return hits / (k * len(truth))
+
+
+def time_queries(index, queries, k: int):
+    latencies = []
+    results = []
+    for q in queries:
+        start = time.perf_counter()
+        _, ids = index.search(q.reshape(1, -1), k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append(ids[0])
+    return results, latencies
+
+
+def run(index_types, synthetic, dim, queries_n, k, seed):
+    vectors, origin = load_vectors(synthetic, dim, seed)
+    queries = make_queries(vectors, queries_n, seed)
+
+    exact = make_faiss_index(vectors, "flat")
+    _, truth = exact.search(queries, k)
+
+    rows = []
+    for index_type in index_types:
+        start = time.perf_counter()
+        index = exact if index_type == "flat" else make_faiss_index(vectors, index_type, seed=seed)
+        build_s = time.perf_counter() - start
+
+        for params in SWEEPS[index_type]:
+            set_search_params(index, **params)
+            found, latencies = time_queries(index, queries, k)
+            rows.append({
+                "index_type": index_type,
+                "params": params,
+                "build_s": round(build_s, 3),
+                f"recall@{k}": round(recall_at_k(found, truth, k), 4),
+                "p50_ms": round(float(np.percentile(latencies, 50)), 4),
+                "p99_ms": round(float(np.percentile(latencies, 99)), 4),
+            })
+
+    return {
+        "vectors": len(vectors),
+        "dim": int(vectors.shape[1]),
+        "origin": origin,
+        "queries": len(queries),
+        "k": k,
+        "results": rows,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--types", nargs="+", default=list(SWEEPS), choices=list(SWEEPS))
+    parser.add_argument("--synthetic", type=int, default=0,
+                        help="use N synthetic vectors instead of the saved index")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    report = run(args.types, args.synthetic, args.dim, args.queries, args.k, args.seed)
+
+    print(f"{report['vectors']} {report['origin']} vectors, dim={report['dim']}, "
+          f"{report['queries']} queries, k={report['k']}\n")
+    print(f"{'index':<10}{'params':<20}{'build s':>10}{'recall':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for r in report["results"]:
+        params = ", ".join(f"{k}={v}" for k, v in r["params"].items()) or "-"
+        print(f"{r['index_type']:<10}{params:<20}{r['build_s']:>10}"
+              f"{r[f'recall@{args.k}']:>10}{r['p50_ms']:>10}{r['p99_ms']:>10}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
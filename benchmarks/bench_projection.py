@@ -0,0 +1,147 @@
+"""
+Monte Carlo savings projection: vectorized engine vs a plain Python
+loop over paths and months, on the same random draws.
+
+Checks that both give the same final values per path, then times
+project_savings at several horizons (target: 10k paths x 360 months
+in under ~100 ms).
+
+Run from the repo root:
+    python -m benchmarks.bench_projection
+    python -m benchmarks.bench_projection --paths 50000 --months 120 360 --naive-paths 200
+"""
+
+import math
+import time
+import argparse
+
+import numpy as np
+
+from src.tools.projection import (
+    project_savings,
+    simulate_paths,
+    INSTRUMENTS,
+    INFLATION_MEAN,
+    INFLATION_VOLATILITY,
+)
+
+
+TARGET_MS = 100
+
+
+# ---------------------------------------------------
+# REFERENCE: one path, one month at a time
+# ---------------------------------------------------
+def draws(months: int, paths: int, seed: int, volatile: bool):
+    """
+    The random numbers simulate_paths uses, in the same order
+    (antithetic monthly shocks if returns are volatile, then yearly inflation).
+    """
+    rng = np.random.default_rng(seed)
+    shocks = np.zeros((paths, months), dtype=np.float32)
+    if volatile:
+        half = (paths + 1) // 2
+        shocks = rng.standard_normal((half, months), dtype=np.float32)
+        shocks = np.vstack([shocks, -shocks[:paths - half]])
+    years = -(-months // 12)
+    inflation = rng.normal(INFLATION_MEAN, INFLATION_VOLATILITY, size=(paths, years))
+    return shocks.tolist(), inflation.tolist()
+
+
+def naive_projection(monthly: float, months: int, paths: int, annual_return: float,
+                     volatility: float, seed: int):
+    """
+    Final (nominal, real) value per path: pay in at the start of each
+    month, then grow by that month's return.
+    """
+    shocks, inflation = draws(months, paths, seed, volatile=volatility > 0)
+    mu = math.log1p(annual_return) / 12
+    sigma = volatility / math.sqrt(12)
+
+    nominal, real = [], []
+    for p in range(paths):
+        value = 0.0
+        for t in range(months):
+            value = (value + monthly) * math.exp(mu - sigma ** 2 / 2 + sigma * shocks[p][t])
+
+        index = 1.0
+        for year, rate in enumerate(inflation[p]):
+            fraction = min(12, months - 12 * year) / 12
+            index *= (1 + max(rate, -0.5)) ** fraction
+
+        nominal.append(value)
+        real.append(value / index)
+    return np.array(nominal), np.array(real)
+
+
+def vectorized_projection(monthly: float, months: int, paths: int, annual_return: float,
+                          volatility: float, seed: int):
+    growth, contribution_growth, inflation_index = simulate_paths(
+        months, paths, annual_return, volatility, seed=seed
+    )
+    nominal = monthly * contribution_growth
+    return nominal, nominal / inflation_index
+
+
+def best_ms(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--paths", type=int, default=10000)
+    parser.add_argument("--months", type=int, nargs="+", default=[12, 60, 120, 360])
+    parser.add_argument("--naive-paths", type=int, default=1000,
+                        help="paths for the Python loop (its time is scaled to --paths)")
+    parser.add_argument("--instrument", choices=sorted(INSTRUMENTS), default="sip")
+    parser.add_argument("--monthly", type=float, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    annual_return, volatility = INSTRUMENTS[args.instrument]
+
+    # same draws -> same answers, path by path
+    months = max(args.months)
+    check_paths = min(args.naive_paths, args.paths)
+    ref_nominal, ref_real = naive_projection(args.monthly, months, check_paths,
+                                             annual_return, volatility, args.seed)
+    vec_nominal, vec_real = vectorized_projection(args.monthly, months, check_paths,
+                                                  annual_return, volatility, args.seed)
+    vec_nominal = np.broadcast_to(vec_nominal, ref_nominal.shape)
+    worst = max(
+        float(np.max(np.abs(vec_nominal / ref_nominal - 1))),
+        float(np.max(np.abs(vec_real / ref_real - 1))),
+    )
+    print(f"equivalence: {check_paths} paths x {months} months, "
+          f"max relative difference {worst:.2e}")
+
+    print(f"\n{args.instrument}, {args.paths:,} paths")
+    print(f"{'months':>8}{'vectorized ms':>16}{'loop ms':>14}{'speedup':>10}{'p50 final':>16}")
+    slow = False
+    for months in args.months:
+        result = {}
+
+        def run():
+            result.update(project_savings(args.monthly, months, goal=args.monthly * months * 1.5,
+                                          instrument=args.instrument, paths=args.paths,
+                                          seed=args.seed))
+
+        vec_ms = best_ms(run, args.repeat)
+        loop_ms = best_ms(lambda: naive_projection(args.monthly, months, args.naive_paths,
+                                                   annual_return, volatility, args.seed), 1)
+        loop_ms *= args.paths / args.naive_paths
+        slow = slow or (months <= 360 and args.paths <= 10000 and vec_ms > TARGET_MS)
+
+        print(f"{months:>8}{vec_ms:>16.1f}{loop_ms:>14.0f}{loop_ms / vec_ms:>9.0f}x"
+              f"{result['percentiles']['p50']:>16,.0f}")
+
+    if worst > 1e-3:
+        raise SystemExit("vectorized and loop results differ")
+    if slow:
+        print(f"\nslower than the {TARGET_MS} ms target")
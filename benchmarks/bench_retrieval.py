@@ -0,0 +1,368 @@
+"""
+Offline retrieval benchmark over the bundled RBI/SEBI PDFs.
+
+Builds a throwaway index per (embedding model, chunk size, index type)
+and scores it against a golden set of questions with known
+(source, page) answers:
+- recall@k: share of questions with an expected page in the top k chunks
+- MRR: mean of 1 / rank of the first chunk from an expected page
+- ingestion time (parse, split, embed, index build) and index size
+- query latency percentiles (query embedding, dense and hybrid search,
+  and the full agent ask() path with a stub LLM)
+
+No network or API keys are needed once the embedding model is in the
+local Hugging Face cache. The saved index in data/vector_store is not
+touched. Results are written as JSON so runs can be compared across commits.
+
+Run from the repo root:
+    python -m benchmarks.bench_retrieval
+    python -m benchmarks.bench_retrieval --chunk-sizes 500 800 1200 --types flat hnsw
+    python -m benchmarks.bench_retrieval --compare benchmarks/results/retrieval_<commit>.json
+"""
+
+import os
+import glob
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+# the agent only needs a key to build its default Groq client; the stub replaces it
+os.environ.setdefault("GROQ_API_KEY", "offline-benchmark")
+
+import numpy as np
+import faiss
+from langchain_community.vectorstores import FAISS
+from langchain_community.embeddings import HuggingFaceEmbeddings
+from langchain_core.language_models import FakeListChatModel
+
+from src.registry import registry
+from src.config import FAISS_NPROBE, FAISS_EF_SEARCH
+from src.tools.pdf_loader import load_pdfs
+from src.tools.text_splitter import get_splitter, CHUNK_SIZE, CHUNK_OVERLAP
+from src.tools.embeddings import EMBEDDING_MODEL
+from src.tools.chunk_store import SQLiteDocstore
+from src.tools.retrieval import hybrid_search
+from src.tools.vector_store import INDEX_TYPES, make_faiss_index, set_search_params
+from src.agents.rag_agent import StockMarketRAGAgent
+
+
+PDF_GLOB = "data/pdfs/*.pdf"
+GOLDEN_PATH = os.path.join(os.path.dirname(__file__), "data", "retrieval_golden.json")
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+K_VALUES = (1, 3, 6, 10)
+STUB_ANSWER = "stub answer"
+
+
+def load_golden(path: str = GOLDEN_PATH):
+    """
+    [{"question": ..., "expected": {(source, page), ...}}]
+    """
+    with open(path, encoding="utf-8") as f:
+        items = json.load(f)
+    return [
+        {
+            "question": item["question"],
+            "expected": {(e["source"], int(e["page"])) for e in item["expected"]},
+        }
+        for item in items
+    ]
+
+
+def doc_key(doc):
+    return (os.path.basename(doc.metadata.get("source", "")), doc.metadata.get("page"))
+
+
+# ---------------------------------------------------
+# SCORING
+# ---------------------------------------------------
+def first_relevant_rank(keys, expected):
+    for rank, key in enumerate(keys, start=1):
+        if key in expected:
+            return rank
+    return None
+
+
+def score(ranks, k_values):
+    """
+    ranks: rank of the first relevant chunk per question (None = not retrieved)
+    """
+    n = len(ranks)
+    out = {f"recall@{k}": round(sum(1 for r in ranks if r and r <= k) / n, 4) for k in k_values}
+    out["mrr"] = round(sum(1 / r for r in ranks if r) / n, 4)
+    return out
+
+
+def percentiles(values):
+    return {
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3),
+    }
+
+
+def _ms(start: float) -> float:
+    return (time.perf_counter() - start) * 1000
+
+
+# ---------------------------------------------------
+# INGESTION (into a temporary directory)
+# ---------------------------------------------------
+def chunk_corpus(pages, chunk_size: int, chunk_overlap: int):
+    start = time.perf_counter()
+    chunks = get_splitter(chunk_size, chunk_overlap).split_documents(pages)
+    return chunks, time.perf_counter() - start
+
+
+def embed_chunks(embeddings, chunks):
+    start = time.perf_counter()
+    vectors = np.asarray(embeddings.embed_documents([c.page_content for c in chunks]),
+                         dtype=np.float32)
+    return vectors, time.perf_counter() - start
+
+
+def build_store(workdir: str, name: str, chunks):
+    store = SQLiteDocstore(os.path.join(workdir, f"{name}.sqlite"))
+    ids = [f"{name}:{i}" for i in range(len(chunks))]
+    store.add(dict(zip(ids, chunks)))
+    return store, ids
+
+
+def build_index(embeddings, vectors, store, ids, index_type: str):
+    start = time.perf_counter()
+    index = make_faiss_index(vectors, index_type)
+    build_s = time.perf_counter() - start
+    set_search_params(index, nprobe=FAISS_NPROBE, ef_search=FAISS_EF_SEARCH)
+
+    db = FAISS(embeddings, index, store, dict(enumerate(ids)))
+    return db, build_s, int(faiss.serialize_index(index).nbytes)
+
+
+# ---------------------------------------------------
+# QUERIES
+# ---------------------------------------------------
+def embed_questions(embeddings, golden, repeat: int):
+    vectors, latencies = [], []
+    for item in golden:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            vector = embeddings.embed_query(item["question"])
+            latencies.append(_ms(start))
+        vectors.append(vector)
+    return vectors, latencies
+
+
+def run_queries(db, golden, query_vectors, k: int, repeat: int):
+    """
+    Dense and hybrid retrieval for every golden question, with the
+    query embedding precomputed so only search time is measured.
+    """
+    ranks = {"dense": [], "hybrid": []}
+    latencies = {"dense": [], "hybrid": []}
+    modes = {}
+
+    for item, vector in zip(golden, query_vectors):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            dense = db.similarity_search_by_vector(vector, k=k)
+            latencies["dense"].append(_ms(start))
+
+            start = time.perf_counter()
+            hybrid = hybrid_search(db, item["question"], k=k, query_vector=vector)
+            latencies["hybrid"].append(_ms(start))
+
+        modes[hybrid["mode"]] = modes.get(hybrid["mode"], 0) + 1
+        ranks["dense"].append(first_relevant_rank([doc_key(d) for d in dense], item["expected"]))
+        ranks["hybrid"].append(
+            first_relevant_rank([doc_key(d) for d in hybrid["docs"]], item["expected"])
+        )
+
+    return ranks, latencies, modes
+
+
+def run_agent(db, store, golden):
+    """
+    End-to-end ask() with a stub LLM: embedding, retrieval and prompt
+    building as in the app, with generation taking no time.
+    """
+    registry.put("vector_store", db)
+    registry.put("chunk_store", store)
+    agent = StockMarketRAGAgent(llm=FakeListChatModel(responses=[STUB_ANSWER]))
+
+    latencies, ranks, sources = [], [], []
+    for item in golden:
+        start = time.perf_counter()
+        result = agent.ask(item["question"], use_cache=False)
+        latencies.append(_ms(start))
+        keys = [(s["source"], s["page"]) for s in result["sources"]]
+        ranks.append(first_relevant_rank(keys, item["expected"]))
+        sources.append(len(keys))
+    return ranks, latencies, sources
+
+
+# ---------------------------------------------------
+# RUN
+# ---------------------------------------------------
+def run(models, chunk_sizes, chunk_overlap, index_types, k_values, repeat, pdf_glob=PDF_GLOB):
+    golden = load_golden()
+    pdf_paths = sorted(glob.glob(pdf_glob))
+    if not pdf_paths:
+        raise SystemExit(f"no PDFs match {pdf_glob}")
+
+    start = time.perf_counter()
+    pages = load_pdfs(pdf_paths)
+    parse_s = time.perf_counter() - start
+
+    k = max(k_values)
+    workdir = tempfile.mkdtemp(prefix="bench_retrieval_")
+    rows = []
+    try:
+        for model in models:
+            start = time.perf_counter()
+            embeddings = HuggingFaceEmbeddings(model_name=model)
+            load_s = time.perf_counter() - start
+            query_vectors, embed_latencies = embed_questions(embeddings, golden, repeat)
+
+            for chunk_size in chunk_sizes:
+                chunks, split_s = chunk_corpus(pages, chunk_size, chunk_overlap)
+                vectors, embed_s = embed_chunks(embeddings, chunks)
+                name = f"{len(rows)}_{chunk_size}"
+                store, ids = build_store(workdir, name, chunks)
+
+                for index_type in index_types:
+                    db, build_s, index_bytes = build_index(embeddings, vectors, store, ids, index_type)
+                    ranks, latencies, modes = run_queries(db, golden, query_vectors, k, repeat)
+                    agent_ranks, agent_latencies, agent_sources = run_agent(db, store, golden)
+
+                    rows.append({
+                        "model": model,
+                        "chunk_size": chunk_size,
+                        "chunk_overlap": chunk_overlap,
+                        "index_type": index_type,
+                        "chunks": len(chunks),
+                        "dim": int(vectors.shape[1]),
+                        "ingest_s": {
+                            "model_load": round(load_s, 3),
+                            "split": round(split_s, 3),
+                            "embed": round(embed_s, 3),
+                            "index_build": round(build_s, 3),
+                        },
+                        "index_bytes": index_bytes,
+                        "chunk_store_bytes": os.path.getsize(store.path),
+                        "dense": score(ranks["dense"], k_values),
+                        "hybrid": dict(score(ranks["hybrid"], k_values), modes=modes),
+                        # recall over the passages the agent put in its prompt
+                        "agent": dict(score(agent_ranks, [max(agent_sources)]),
+                                      passages=round(sum(agent_sources) / len(golden), 2)),
+                        "latency": {
+                            "embed_query": percentiles(embed_latencies),
+                            "dense": percentiles(latencies["dense"]),
+                            "hybrid": percentiles(latencies["hybrid"]),
+                            "agent_ask": percentiles(agent_latencies),
+                        },
+                        "misses": [
+                            item["question"] for item, r in zip(golden, ranks["hybrid"]) if r is None
+                        ],
+                    })
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "commit": git_commit(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "corpus": {
+            "pdfs": [os.path.basename(p) for p in pdf_paths],
+            "pages": len(pages),
+            "parse_s": round(parse_s, 3),
+        },
+        "questions": len(golden),
+        "k_values": list(k_values),
+        "repeat": repeat,
+        "results": rows,
+    }
+
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# ---------------------------------------------------
+# REPORT
+# ---------------------------------------------------
+def config_key(row):
+    return (row["model"], row["chunk_size"], row["chunk_overlap"], row["index_type"])
+
+
+def print_report(report, baseline=None):
+    corpus = report["corpus"]
+    print(f"{len(corpus['pdfs'])} PDFs, {corpus['pages']} pages (parsed in {corpus['parse_s']}s), "
+          f"{report['questions']} golden questions, commit {report['commit']}\n")
+
+    k_values = report["k_values"]
+    old = {config_key(r): r for r in baseline["results"]} if baseline else {}
+
+    header = f"{'model':<22}{'chunk':>6}{'index':>9}{'path':>8}{'chunks':>8}"
+    header += "".join(f"{'R@' + str(k):>7}" for k in k_values)
+    header += f"{'MRR':>7}{'p50 ms':>9}{'p95 ms':>9}{'embed s':>9}{'index KB':>10}"
+    print(header)
+
+    for r in report["results"]:
+        model = r["model"].split("/")[-1][:20]
+        for path in ("dense", "hybrid"):
+            s, lat = r[path], r["latency"][path]
+            line = f"{model:<22}{r['chunk_size']:>6}{r['index_type']:>9}{path:>8}{r['chunks']:>8}"
+            line += "".join(f"{s[f'recall@{k}']:>7.3f}" for k in k_values)
+            line += f"{s['mrr']:>7.3f}{lat['p50_ms']:>9.2f}{lat['p95_ms']:>9.2f}"
+            line += f"{r['ingest_s']['embed']:>9.1f}{r['index_bytes'] / 1024:>10.0f}"
+            print(line)
+
+            prev = old.get(config_key(r))
+            if prev:
+                deltas = [f"R@{k} {s[f'recall@{k}'] - prev[path][f'recall@{k}']:+.3f}"
+                          for k in k_values]
+                deltas.append(f"MRR {s['mrr'] - prev[path]['mrr']:+.3f}")
+                deltas.append(f"p50 {lat['p50_ms'] - prev['latency'][path]['p50_ms']:+.2f}ms")
+                print(f"{'':<22}  vs {baseline['commit']}: " + ", ".join(deltas))
+
+        ask = r["latency"]["agent_ask"]
+        agent = r["agent"]
+        recall = next(v for key, v in agent.items() if key.startswith("recall@"))
+        print(f"{'':<22}  agent ask (stub LLM): recall {recall:.3f} over "
+              f"{agent['passages']} passages, p50 {ask['p50_ms']:.1f}ms, p95 {ask['p95_ms']:.1f}ms; "
+              f"query embed p50 {r['latency']['embed_query']['p50_ms']:.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--models", nargs="+", default=[EMBEDDING_MODEL])
+    parser.add_argument("--chunk-sizes", nargs="+", type=int, default=[CHUNK_SIZE])
+    parser.add_argument("--chunk-overlap", type=int, default=CHUNK_OVERLAP)
+    parser.add_argument("--types", nargs="+", default=["flat"], choices=list(INDEX_TYPES))
+    parser.add_argument("--k", nargs="+", type=int, default=list(K_VALUES))
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="timed runs per question for latency percentiles")
+    parser.add_argument("--json", help="results file (default: benchmarks/results/retrieval_<commit>.json)")
+    parser.add_argument("--compare", help="earlier results file to print deltas against")
+    args = parser.parse_args()
+
+    report = run(args.models, args.chunk_sizes, args.chunk_overlap, args.types,
+                 sorted(args.k), args.repeat)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    path = args.json or os.path.join(RESULTS_DIR, f"retrieval_{report['commit'] or 'local'}.json")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nresults written to {path}")
@@ -0,0 +1,110 @@
+"""
+Routes/second of the compiled intent router vs the original
+substring-scan routing, and a check that both pick the same intents.
+
+Run from the repo root:
+    python -m benchmarks.bench_router
+"""
+
+import os
+import time
+import random
+import argparse
+
+from src.agents.router import IntentRouter, KEYWORDS
+
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "data", "router_queries.txt")
+
+
+# ---------------------------------------------------
+# REFERENCE: routing conditions as they were in resolve_query()
+# ---------------------------------------------------
+LEGACY_TIME_SENSITIVE = [
+    "ipo", "upcoming", "repo rate", "interest rate", "latest", "today",
+    "current", "deadline", "update", "announcement", "new rules",
+    "happened on", "union budget", "news", "stocks", "stock", "announced",
+]
+LEGACY_MULTI_SYMBOL_KEYWORDS = ["compare", "watchlist", " vs ", "versus", "price", "quote"]
+
+
+def legacy_route(q: str):
+    intents = []
+    if "news" not in q and any(x in q for x in LEGACY_MULTI_SYMBOL_KEYWORDS):
+        intents.append("multi_symbol")
+    if any(word in q for word in LEGACY_TIME_SENSITIVE):
+        intents.append("time_sensitive")
+    if any(x in q for x in ["stock price", "share price", "price of"]):
+        intents.append("stock_price")
+    if "news" in q:
+        intents.append("news")
+    if ("save" in q or "saving" in q) and "month" in q:
+        intents.append("savings")
+    if any(x in q for x in ["salary", "income", "budget"]):
+        intents.append("budget")
+    return intents
+
+
+def load_corpus(path: str = CORPUS_PATH):
+    with open(path, encoding="utf-8") as f:
+        lines = [line.strip() for line in f]
+    return [line.lower() for line in lines if line and not line.startswith("#")]
+
+
+def fuzz_corpus(corpus, n: int, seed: int = 0):
+    """
+    Extra queries made of spliced corpus lines and keywords, including
+    keywords glued to neighbours ("stockprice", "newsletter"), so
+    overlapping and prefix matches are exercised.
+    """
+    rng = random.Random(seed)
+    words = [w for ws in KEYWORDS.values() for w in ws] + ["of", "the", "letter", "s", "ly"]
+    out = []
+    for _ in range(n):
+        parts = [rng.choice(corpus)[: rng.randint(0, 40)]]
+        for _ in range(rng.randint(1, 4)):
+            sep = rng.choice(["", " ", ", "])
+            parts.append(sep + rng.choice(words))
+        out.append("".join(parts))
+    return out
+
+
+def check(router, queries):
+    return [(q, legacy_route(q), router.route(q))
+            for q in queries if legacy_route(q) != router.route(q)]
+
+
+def throughput(fn, queries, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for q in queries:
+            fn(q)
+    return repeat * len(queries) / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--fuzz", type=int, default=20000)
+    args = parser.parse_args()
+
+    router = IntentRouter()
+    corpus = load_corpus()
+    fuzzed = fuzz_corpus(corpus, args.fuzz)
+
+    mismatches = check(router, corpus + fuzzed)
+    print(f"decision check: {len(corpus)} recorded + {len(fuzzed)} fuzzed queries, "
+          f"{len(mismatches)} mismatches")
+    for q, old, new in mismatches[:10]:
+        print(f"  {q!r}: legacy={old} router={new}")
+
+    legacy_rps = throughput(legacy_route, corpus, args.repeat)
+    router_rps = throughput(router.route, corpus, args.repeat)
+
+    print(f"\n{'router':<12}{'routes/s':>14}")
+    print(f"{'legacy':<12}{legacy_rps:>14,.0f}")
+    print(f"{'compiled':<12}{router_rps:>14,.0f}")
+    print(f"speedup: {router_rps / legacy_rps:.2f}x")
+
+    if mismatches:
+        raise SystemExit(1)
@@ -0,0 +1,146 @@
+"""
+Latency and accuracy of company-name -> symbol resolution
+with the local symbol directory (optionally vs Finnhub /search).
+
+Run from the repo root:
+    python -m benchmarks.bench_symbols
+    python -m benchmarks.bench_symbols --finnhub     # also call the API (uses quota)
+"""
+
+import time
+import argparse
+import numpy as np
+
+from src.agents.finance_agent import clean_company_query
+from src.tools.symbol_directory import SymbolDirectory, load_listing, best_listing
+
+
+# (user query, expected symbol)
+QUERIES = [
+    ("stock price of hdfc bank", "HDFCBANK.NS"),
+    ("share price of reliance", "RELIANCE.NS"),
+    ("price of tcs", "TCS.NS"),
+    ("infosys share price", "INFY.NS"),
+    ("what is the share price of state bank of india", "SBIN.NS"),
+    ("price of icici bank", "ICICIBANK.NS"),
+    ("stock price of tata motors", "TATAMOTORS.NS"),
+    ("tata steel share price", "TATASTEEL.NS"),
+    ("price of l&t", "LT.NS"),
+    ("larsen and toubro stock price", "LT.NS"),
+    ("price of hindustan unilever", "HINDUNILVR.NS"),
+    ("price of hindust", "HINDUNILVR.NS"),
+    ("stock price of hdfc bnk", "HDFCBANK.NS"),
+    ("share price of relaince", "RELIANCE.NS"),
+    ("price of infosis", "INFY.NS"),
+    ("price of bajaj finance", "BAJFINANCE.NS"),
+    ("stock price of dr reddy's", "DRREDDY.NS"),
+    ("price of mahindra and mahindra", "M&M.NS"),
+    ("price of kotak mahindra bank", "KOTAKBANK.NS"),
+    ("reliance bse share price", "RELIANCE.BO"),
+    ("price of infosys nyse", "INFY"),
+    ("stock price of apple", "AAPL"),
+    ("share price of microsoft", "MSFT"),
+    ("price of AAPL", "AAPL"),
+    ("stock price of NVDA", "NVDA"),
+    ("price of google", "GOOGL"),
+    ("tesla stock price", "TSLA"),
+    ("price of amazon", "AMZN"),
+    ("stock price of jp morgan", "JPM"),
+    ("price of coca cola", "KO"),
+    ("price of berkshire hathaway", "BRK.B"),
+    ("price of asian paints", "ASIANPAINT.NS"),
+    ("stock price of adani ports", "ADANIPORTS.NS"),
+    ("price of zomato", "ZOMATO.NS"),
+    ("share price of irctc", "IRCTC.NS"),
+    ("price of sun pharma", "SUNPHARMA.NS"),
+    ("stock price of ultratech cement", "ULTRACEMCO.NS"),
+    ("price of maruti suzuki", "MARUTI.NS"),
+    ("price of wipro", "WIPRO.NS"),
+    ("price of bharti airtel", "BHARTIARTL.NS"),
+    # a listed name inside another company's name; the directory should
+    # resolve it only if that company is listed, else leave it to Finnhub
+    ("price of reliance power", "RPOWER.NS"),
+    ("icici lombard share price", "ICICIGI.NS"),
+    ("sbi cards share price", "SBICARD.NS"),
+    ("stock price of mahindra lifespace", "MAHLIFE.NS"),
+    ("infosys bpm share price", None),
+    ("apple hospitality stock price", "APLE"),
+]
+
+
+def percentiles_us(values):
+    return {
+        "p50_us": round(float(np.percentile(values, 50)), 1),
+        "p99_us": round(float(np.percentile(values, 99)), 1),
+    }
+
+
+def bench_directory(directory, repeat: int):
+    """
+    A query whose company is not in the listing is correct when the
+    directory gives no usable match (None or "partial"), so the agent
+    falls back to Finnhub.
+    """
+    listed = {row["symbol"] for row in directory.entries}
+    timings, correct, misses, wrong = [], 0, 0, []
+    for query, expected in QUERIES:
+        cleaned = clean_company_query(query)
+        for _ in range(repeat):
+            start = time.perf_counter()
+            match = directory.resolve(cleaned)
+            timings.append((time.perf_counter() - start) * 1e6)
+
+        if expected not in listed:
+            expected = None
+        if match is None or match["match"] == "partial":
+            if expected is None:
+                correct += 1
+            else:
+                misses += 1
+        elif match["symbol"] == expected:
+            correct += 1
+        else:
+            wrong.append((query, expected, match["symbol"], match["match"]))
+
+    return percentiles_us(timings), correct, misses, wrong
+
+
+def bench_finnhub():
+    from src.tools.symbol_lookup import symbol_lookup
+
+    timings, correct = [], 0
+    for query, expected in QUERIES:
+        start = time.perf_counter()
+        lookup = symbol_lookup(clean_company_query(query))
+        timings.append((time.perf_counter() - start) * 1e6)
+
+        results = lookup.get("result", []) if isinstance(lookup, dict) else []
+        best = best_listing(results)
+        correct += int(best is not None and best["symbol"] == expected)
+
+    return percentiles_us(timings), correct
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--finnhub", action="store_true")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    directory = SymbolDirectory(load_listing())
+    build_ms = (time.perf_counter() - start) * 1000
+    print(f"directory: {len(directory.entries)} listings, built in {build_ms:.1f} ms\n")
+
+    lat, correct, misses, wrong = bench_directory(directory, args.repeat)
+    n = len(QUERIES)
+    print(f"{'resolver':<12}{'p50 us':>10}{'p99 us':>10}{'accuracy':>10}")
+    print(f"{'directory':<12}{lat['p50_us']:>10}{lat['p99_us']:>10}{correct / n:>10.2%}")
+
+    if args.finnhub:
+        lat, api_correct = bench_finnhub()
+        print(f"{'finnhub':<12}{lat['p50_us']:>10}{lat['p99_us']:>10}{api_correct / n:>10.2%}")
+
+    print(f"\nmisses: {misses}")
+    for query, expected, got, how in wrong:
+        print(f"wrong: {query!r} -> {got} ({how}), expected {expected}")
@@ -0,0 +1,426 @@
+"""
+Local stand-ins for Finnhub, Tavily and the Groq (OpenAI-compatible)
+chat API, with configurable latency, errors and 429s, for load tests
+that should not spend real quota.
+
+- finnhub: GET /quote, /company-news, /search
+- tavily:  POST /search
+- groq:    POST /openai/v1/chat/completions (also /v1/chat/completions),
+           plain and streamed (SSE)
+
+Point the app at them with:
+    FINNHUB_BASE_URL=http://127.0.0.1:8901
+    TAVILY_BASE_URL=http://127.0.0.1:8902
+    GROQ_BASE_URL=http://127.0.0.1:8903
+
+Run from the repo root:
+    python -m benchmarks.fake_servers
+    python -m benchmarks.fake_servers --set groq:latency_ms=600,tokens_per_s=150 \\
+        --set finnhub:rate_limit_rate=0.05,rpm=300
+"""
+
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+
+DEFAULT_PORTS = {"finnhub": 8901, "tavily": 8902, "groq": 8903}
+
+# per-server defaults; override with --set name:key=value,...
+DEFAULT_FAULTS = {
+    "finnhub": {"latency_ms": 40, "jitter_ms": 20},
+    "tavily": {"latency_ms": 300, "jitter_ms": 150},
+    "groq": {"latency_ms": 250, "jitter_ms": 100, "tokens_per_s": 250},
+}
+
+ANSWER_WORDS = (
+    "Based on the latest available data the figures look stable with moderate "
+    "movement compared to the previous close and no unusual activity was reported "
+    "investors may want to review fundamentals before acting"
+).split()
+
+
+class Faults:
+    """
+    Injected behaviour of one fake server.
+
+    latency_ms + uniform(0, jitter_ms) before every response; error_rate
+    and rate_limit_rate are the chances of a 500 / 429 (with Retry-After);
+    rpm > 0 also returns 429 once more than rpm requests arrived in the
+    last 60 s, like a real quota.
+    """
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, rate_limit_rate=0.0,
+                 retry_after=1.0, rpm=0, tokens_per_s=0.0, answer_tokens=60, seed=None):
+        self.latency_ms = float(latency_ms)
+        self.jitter_ms = float(jitter_ms)
+        self.error_rate = float(error_rate)
+        self.rate_limit_rate = float(rate_limit_rate)
+        self.retry_after = float(retry_after)
+        self.rpm = int(rpm)
+        self.tokens_per_s = float(tokens_per_s)
+        self.answer_tokens = int(answer_tokens)
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._window = deque()
+        self.stats = {"requests": 0, "ok": 0, "injected_429": 0, "quota_429": 0, "injected_500": 0}
+
+    def decide(self) -> int:
+        """
+        Sleep the configured latency; return the status to answer with.
+        """
+        with self._lock:
+            self.stats["requests"] += 1
+            delay = self.latency_ms + self._rng.uniform(0, self.jitter_ms)
+            roll = self._rng.random()
+
+            now = time.monotonic()
+            over_quota = False
+            if self.rpm:
+                while self._window and now - self._window[0] > 60:
+                    self._window.popleft()
+                over_quota = len(self._window) >= self.rpm
+                if not over_quota:
+                    self._window.append(now)
+
+        time.sleep(delay / 1000)
+
+        with self._lock:
+            if over_quota:
+                self.stats["quota_429"] += 1
+                return 429
+            if roll < self.rate_limit_rate:
+                self.stats["injected_429"] += 1
+                return 429
+            if roll < self.rate_limit_rate + self.error_rate:
+                self.stats["injected_500"] += 1
+                return 500
+            self.stats["ok"] += 1
+            return 200
+
+
+# ---------------------------------------------------
+# HANDLERS
+# ---------------------------------------------------
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    faults: Faults = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, body, headers: dict = None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _fault(self) -> bool:
+        """
+        Apply latency and injected failures; True if a failure was sent.
+        """
+        status = self.faults.decide()
+        if status == 200:
+            return False
+        retry = {"Retry-After": f"{self.faults.retry_after:g}"} if status == 429 else None
+        self._send_json(status, self.error_body(status), retry)
+        return True
+
+    def error_body(self, status: int):
+        return {"error": f"injected {status}"}
+
+    def not_found(self):
+        self._send_json(404, {"error": f"unknown path {self.path}"})
+
+
+class FinnhubHandler(_Handler):
+    def error_body(self, status):
+        if status == 429:
+            return {"error": "API limit reached. Please try again later."}
+        return {"error": "Internal server error"}
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        path = url.path.rstrip("/").rsplit("/", 1)[-1]
+        routes = {"quote": self.quote, "company-news": self.company_news, "search": self.search}
+
+        if path not in routes:
+            return self.not_found()
+        if self._fault():
+            return
+        self._send_json(200, routes[path](params))
+
+    @staticmethod
+    def quote(params):
+        symbol = params.get("symbol", "").upper()
+        base = 50 + _seed(symbol) % 4000
+        prev = round(base * (1 + random.uniform(-0.02, 0.02)), 2)
+        price = round(prev * (1 + random.uniform(-0.03, 0.03)), 2)
+        return {
+            "c": price,
+            "d": round(price - prev, 2),
+            "dp": round((price - prev) / prev * 100, 4),
+            "h": round(max(price, prev) * 1.01, 2),
+            "l": round(min(price, prev) * 0.99, 2),
+            "o": prev,
+            "pc": prev,
+            "t": int(time.time()),
+        }
+
+    @staticmethod
+    def company_news(params):
+        symbol = params.get("symbol", "").upper()
+        now = datetime.now()
+        return [
+            {
+                "category": "company",
+                "datetime": int((now - timedelta(hours=6 * i)).timestamp()),
+                "headline": f"{symbol} shares move as analysts update outlook ({i + 1})",
+                "id": _seed(symbol) + i,
+                "image": "",
+                "related": symbol,
+                "source": "Fake Wire",
+                "summary": f"Synthetic news item {i + 1} about {symbol}.",
+                "url": f"https://example.com/news/{symbol.lower()}/{i + 1}",
+            }
+            for i in range(8)
+        ]
+
+    @staticmethod
+    def search(params):
+        q = params.get("q", "").strip()
+        symbol = "".join(ch for ch in q.upper() if ch.isalnum())[:6] or "TEST"
+        return {
+            "count": 2,
+            "result": [
+                {"description": q.upper(), "displaySymbol": symbol,
+                 "symbol": symbol, "type": "Common Stock"},
+                {"description": q.upper(), "displaySymbol": f"{symbol}.NS",
+                 "symbol": f"{symbol}.NS", "type": "Common Stock"},
+            ],
+        }
+
+
+class TavilyHandler(_Handler):
+    def error_body(self, status):
+        message = "Rate limit exceeded" if status == 429 else "Internal server error"
+        return {"detail": {"error": message}}
+
+    def do_POST(self):
+        if urlparse(self.path).path.rstrip("/") != "/search":
+            return self.not_found()
+        body = self._read_json()
+        if self._fault():
+            return
+
+        query = body.get("query", "")
+        n = int(body.get("max_results") or 5)
+        self._send_json(200, {
+            "query": query,
+            "follow_up_questions": None,
+            "answer": None,
+            "images": [],
+            "results": [
+                {
+                    "title": f"{query} - result {i + 1}",
+                    "url": f"https://example.com/search/{_seed(query)}/{i + 1}",
+                    "content": f"Synthetic search result {i + 1} for: {query}.",
+                    "score": round(0.9 - 0.1 * i, 2),
+                    "raw_content": None,
+                }
+                for i in range(n)
+            ],
+            "response_time": round(self.faults.latency_ms / 1000, 2),
+        })
+
+
+class GroqHandler(_Handler):
+    def error_body(self, status):
+        kind = "rate_limit_error" if status == 429 else "internal_server_error"
+        return {"error": {"message": f"injected {status}", "type": kind, "code": kind}}
+
+    def do_POST(self):
+        path = urlparse(self.path).path.rstrip("/")
+        if path not in ("/openai/v1/chat/completions", "/v1/chat/completions"):
+            return self.not_found()
+        body = self._read_json()
+        if self._fault():
+            return
+
+        prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in body.get("messages", []))
+        words = [ANSWER_WORDS[i % len(ANSWER_WORDS)] for i in range(self.faults.answer_tokens)]
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": len(words),
+            "total_tokens": prompt_tokens + len(words),
+        }
+        model = body.get("model", "fake-model")
+        completion_id = f"chatcmpl-{_seed(str(time.time_ns()))}"
+
+        if body.get("stream"):
+            return self._stream(completion_id, model, words, usage)
+
+        if self.faults.tokens_per_s:
+            time.sleep(len(words) / self.faults.tokens_per_s)
+        self._send_json(200, {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": " ".join(words)},
+                "finish_reason": "stop",
+            }],
+            "usage": usage,
+        })
+
+    def _stream(self, completion_id, model, words, usage):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        pause = 1 / self.faults.tokens_per_s if self.faults.tokens_per_s else 0
+        base = {"id": completion_id, "object": "chat.completion.chunk",
+                "created": int(time.time()), "model": model}
+
+        def event(delta, finish=None, extra=None):
+            chunk = dict(base, choices=[{"index": 0, "delta": delta, "finish_reason": finish}])
+            chunk.update(extra or {})
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        try:
+            event({"role": "assistant", "content": ""})
+            for i, word in enumerate(words):
+                time.sleep(pause)
+                event({"content": word if i == 0 else " " + word})
+            # Groq reports usage in x_groq on the last chunk
+            event({}, "stop", {"x_groq": {"id": completion_id, "usage": usage}, "usage": usage})
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+HANDLERS = {"finnhub": FinnhubHandler, "tavily": TavilyHandler, "groq": GroqHandler}
+
+
+def _seed(text: str) -> int:
+    return int(hashlib.md5(text.encode("utf-8")).hexdigest()[:8], 16)
+
+
+# ---------------------------------------------------
+# SERVERS
+# ---------------------------------------------------
+class FakeServers:
+    """
+    Starts the fake servers on background threads.
+
+        servers = FakeServers(faults={"groq": {"latency_ms": 500}}).start()
+        os.environ.update(servers.env())
+        ...
+        servers.stop()
+    """
+
+    def __init__(self, host: str = "127.0.0.1", ports: dict = None, faults: dict = None):
+        self.host = host
+        self.ports = dict(DEFAULT_PORTS, **(ports or {}))
+        self.faults = {}
+        for name in HANDLERS:
+            settings = dict(DEFAULT_FAULTS.get(name, {}), **(faults or {}).get(name, {}))
+            self.faults[name] = Faults(**settings)
+        self._servers = {}
+
+    def start(self):
+        for name, handler in HANDLERS.items():
+            cls = type(handler.__name__, (handler,), {"faults": self.faults[name]})
+            server = ThreadingHTTPServer((self.host, self.ports[name]), cls)
+            server.daemon_threads = True
+            # port 0 picks a free port
+            self.ports[name] = server.server_address[1]
+            threading.Thread(target=server.serve_forever, daemon=True,
+                             name=f"fake-{name}").start()
+            self._servers[name] = server
+        return self
+
+    def stop(self):
+        for server in self._servers.values():
+            server.shutdown()
+            server.server_close()
+        self._servers.clear()
+
+    def url(self, name: str) -> str:
+        return f"http://{self.host}:{self.ports[name]}"
+
+    def env(self) -> dict:
+        """
+        Environment variables that point src.config at these servers.
+        """
+        return {
+            "FINNHUB_BASE_URL": self.url("finnhub"),
+            "TAVILY_BASE_URL": self.url("tavily"),
+            "GROQ_BASE_URL": self.url("groq"),
+        }
+
+    def stats(self) -> dict:
+        return {name: dict(f.stats) for name, f in self.faults.items()}
+
+
+def parse_settings(items):
+    """
+    ["groq:latency_ms=500,error_rate=0.01", ...] -> {"groq": {"latency_ms": "500", ...}}
+    """
+    out = {}
+    for item in items or []:
+        name, _, pairs = item.partition(":")
+        if name not in HANDLERS or not pairs:
+            raise SystemExit(f"bad --set {item!r}, expected one of {list(HANDLERS)}:key=value,...")
+        for pair in pairs.split(","):
+            key, _, value = pair.partition("=")
+            out.setdefault(name, {})[key.strip()] = value.strip()
+    return out
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    for name, port in DEFAULT_PORTS.items():
+        parser.add_argument(f"--{name}-port", type=int, default=port)
+    parser.add_argument("--set", action="append", metavar="NAME:KEY=VALUE,...",
+                        help="fault settings: latency_ms, jitter_ms, error_rate, rate_limit_rate, "
+                             "retry_after, rpm, tokens_per_s, answer_tokens")
+    args = parser.parse_args()
+
+    ports = {name: getattr(args, f"{name}_port") for name in DEFAULT_PORTS}
+    servers = FakeServers(args.host, ports, parse_settings(args.set)).start()
+
+    for key, value in servers.env().items():
+        print(f"{key}={value}")
+    print("\nCtrl+C to stop")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print("\n" + json.dumps(servers.stats(), indent=2))
+        servers.stop()
@@ -0,0 +1,329 @@
+"""
+Load generator: replays a query mix against the finance and RAG agents
+at a fixed concurrency and reports throughput and latency per route.
+
+By default the agents are pointed at the local fake servers
+(benchmarks/fake_servers.py), so no Groq/Tavily/Finnhub quota is used,
+and the per-minute rate limits are lifted so the agents themselves are
+measured. RAG queries need an ingested index in data/vector_store.
+
+Run from the repo root:
+    python -m benchmarks.loadgen --concurrency 16 --duration 30
+    python -m benchmarks.loadgen --stream --set groq:latency_ms=800,rate_limit_rate=0.05
+    python -m benchmarks.loadgen --no-fake --real-limits --requests 20
+"""
+
+import os
+import json
+import time
+import random
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from benchmarks.fake_servers import FakeServers, parse_settings
+
+
+MIX_PATH = os.path.join(os.path.dirname(__file__), "data", "load_mix.txt")
+AGENTS = ("finance", "rag")
+
+# replies the agents return instead of raising
+ERROR_PREFIXES = (
+    "Something went wrong",
+    "Error getting LLM response",
+    "I retrieved the data successfully, but formatting failed",
+)
+
+
+def load_mix(path: str = MIX_PATH):
+    mix = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            agent, _, query = line.partition("|")
+            agent, query = agent.strip(), query.strip()
+            if agent not in AGENTS or not query:
+                raise SystemExit(f"bad line in {path}: {line!r}")
+            mix.append((agent, query))
+    return mix
+
+
+def configure_env(servers, real_limits: bool, llm_cache: bool = False):
+    """
+    Must run before anything under src is imported (config reads env once).
+    """
+    if servers is not None:
+        os.environ.update(servers.env())
+        for key in ("GROQ_API_KEY", "TAVILY_API_KEY", "FINNHUB_API_KEY"):
+            os.environ.setdefault(key, "loadgen")
+    if not real_limits:
+        for key in ("FINNHUB_CALLS_PER_MINUTE", "GROQ_REQUESTS_PER_MINUTE",
+                    "TAVILY_REQUESTS_PER_MINUTE"):
+            os.environ.setdefault(key, "1000000")
+    # thousands of requests would flood the trace log
+    os.environ.setdefault("TRACE_LOG_PATH", "")
+    # off unless asked for: repeated queries would measure cache hits, not the agents
+    os.environ.setdefault("LLM_CACHE_ENABLED", "true" if llm_cache else "false")
+
+
+# ---------------------------------------------------
+# ONE REQUEST
+# ---------------------------------------------------
+class Runner:
+    def __init__(self, stream: bool, use_answer_cache: bool):
+        from src.agents.finance_agent import run_finance_agent, run_finance_agent_stream
+        from src.agents.router import route
+        from src.tracing import recent_traces, query_attrs
+
+        self.stream = stream
+        self.use_answer_cache = use_answer_cache
+        self._finance = run_finance_agent_stream if stream else run_finance_agent
+        self._route = route
+        self._recent_traces = recent_traces
+        self._query_attrs = query_attrs
+        self._rag = None
+        self._rag_lock = threading.Lock()
+
+    @property
+    def rag(self):
+        if self._rag is None:
+            with self._rag_lock:
+                if self._rag is None:
+                    from src.agents.rag_agent import StockMarketRAGAgent
+                    self._rag = StockMarketRAGAgent()
+        return self._rag
+
+    def run(self, agent: str, query: str, session: str) -> dict:
+        start = time.perf_counter()
+        ttft = None
+        error = None
+        text = ""
+        try:
+            if agent == "finance":
+                if self.stream:
+                    parts = []
+                    for piece in self._finance(query):
+                        if ttft is None and piece:
+                            ttft = time.perf_counter() - start
+                        parts.append(piece)
+                    text = "".join(parts)
+                else:
+                    text = self._finance(query)
+            else:
+                if self.stream:
+                    result = self.rag.ask_stream(query, use_cache=self.use_answer_cache)
+                    parts = []
+                    for piece in result["tokens"]:
+                        if ttft is None and piece:
+                            ttft = time.perf_counter() - start
+                        parts.append(piece)
+                    text = "".join(parts)
+                else:
+                    text = self.rag.ask(query, use_cache=self.use_answer_cache)["answer"]
+        except Exception as e:
+            error = type(e).__name__
+
+        elapsed = time.perf_counter() - start
+        if error is None and text.startswith(ERROR_PREFIXES):
+            error = "error_reply"
+
+        return {
+            "route": self.route_of(agent, query, session),
+            "seconds": elapsed,
+            "ttft": ttft,
+            "error": error,
+        }
+
+    def route_of(self, agent, query, session):
+        """
+        The route the agent actually took, from this session's last trace
+        (a handler may decline the router's first pick).
+        """
+        query_hash = self._query_attrs(query)["query_hash"]
+        for t in self._recent_traces(session=session, limit=3):
+            if t["attrs"].get("query_hash") == query_hash:
+                if agent == "rag":
+                    return "rag:cached" if t["attrs"].get("cached") else "rag"
+                route = t["attrs"].get("route") or "chat"
+                return f"{route}:fast" if t["attrs"].get("fast_path") else route
+
+        if agent == "rag":
+            return "rag"
+        intents = self._route(query.lower())
+        return intents[0] if intents else "chat"
+
+
+# ---------------------------------------------------
+# LOAD
+# ---------------------------------------------------
+def run_load(runner, mix, concurrency: int, duration: float, requests: int,
+             warmup: int, seed: int):
+    """
+    Closed loop: `concurrency` workers, each sending its next query as
+    soon as the previous one finished, until duration or requests is hit.
+    """
+    from src.ratelimit import request_context
+
+    lock = threading.Lock()
+    results = []
+    issued = [0]
+    deadline = [None]
+
+    def worker(i):
+        rng = random.Random(seed + i)
+        session = f"load-{i}"
+        with request_context(session=session):
+            while True:
+                with lock:
+                    if requests and issued[0] >= requests + warmup:
+                        return
+                    if deadline[0] is not None and time.perf_counter() >= deadline[0]:
+                        return
+                    issued[0] += 1
+                    n = issued[0]
+
+                agent, query = rng.choice(mix)
+                result = runner.run(agent, query, session)
+
+                with lock:
+                    if n == warmup:
+                        # measurement window starts after the warmup requests
+                        deadline[0] = time.perf_counter() + duration if duration else None
+                    if n > warmup:
+                        results.append(dict(result, end=time.perf_counter()))
+
+    if not warmup:
+        deadline[0] = time.perf_counter() + duration if duration else None
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="loadgen") as pool:
+        for f in [pool.submit(worker, i) for i in range(concurrency)]:
+            f.result()
+    wall = time.perf_counter() - start
+
+    if warmup and results:
+        # throughput over the measured window only
+        first_end = min(r["end"] - r["seconds"] for r in results)
+        wall = max(r["end"] for r in results) - first_end
+    return results, wall
+
+
+def summarize(results, wall: float):
+    def row(items):
+        ok = [r for r in items if r["error"] is None]
+        latencies = [r["seconds"] * 1000 for r in ok] or [0.0]
+        ttfts = [r["ttft"] * 1000 for r in ok if r["ttft"] is not None]
+        errors = {}
+        for r in items:
+            if r["error"]:
+                errors[r["error"]] = errors.get(r["error"], 0) + 1
+        out = {
+            "requests": len(items),
+            "errors": errors,
+            "rps": round(len(items) / wall, 2) if wall else None,
+            "p50_ms": round(float(np.percentile(latencies, 50)), 1),
+            "p95_ms": round(float(np.percentile(latencies, 95)), 1),
+            "p99_ms": round(float(np.percentile(latencies, 99)), 1),
+        }
+        if ttfts:
+            out["ttft_p50_ms"] = round(float(np.percentile(ttfts, 50)), 1)
+            out["ttft_p95_ms"] = round(float(np.percentile(ttfts, 95)), 1)
+        return out
+
+    routes = {}
+    for r in results:
+        routes.setdefault(r["route"], []).append(r)
+
+    return {
+        "wall_s": round(wall, 2),
+        "total": row(results),
+        "routes": {name: row(items) for name, items in sorted(routes.items())},
+    }
+
+
+def print_summary(summary):
+    print(f"\n{'route':<18}{'reqs':>7}{'err':>6}{'rps':>8}{'p50 ms':>10}{'p95 ms':>10}"
+          f"{'p99 ms':>10}{'ttft p50':>10}")
+    rows = list(summary["routes"].items()) + [("TOTAL", summary["total"])]
+    for name, r in rows:
+        errors = sum(r["errors"].values())
+        ttft = r.get("ttft_p50_ms", "-")
+        print(f"{name:<18}{r['requests']:>7}{errors:>6}{r['rps']:>8}{r['p50_ms']:>10}"
+              f"{r['p95_ms']:>10}{r['p99_ms']:>10}{ttft:>10}")
+    print(f"\nwall {summary['wall_s']}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mix", default=MIX_PATH)
+    parser.add_argument("--agents", nargs="+", default=list(AGENTS), choices=AGENTS)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=20,
+                        help="seconds to run (0: until --requests)")
+    parser.add_argument("--requests", type=int, default=0, help="stop after N requests")
+    parser.add_argument("--warmup", type=int, default=0, help="requests excluded from results")
+    parser.add_argument("--stream", action="store_true", help="use the streaming entry points")
+    parser.add_argument("--answer-cache", action="store_true",
+                        help="let the RAG agent serve repeated questions from its cache")
+    parser.add_argument("--llm-cache", action="store_true",
+                        help="serve repeated prompts from the LLM completion cache")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-fake", action="store_true",
+                        help="use the endpoints configured in .env instead of fake servers")
+    parser.add_argument("--real-limits", action="store_true",
+                        help="keep the configured per-minute rate limits")
+    parser.add_argument("--set", action="append", metavar="NAME:KEY=VALUE,...",
+                        help="fake server faults, see benchmarks.fake_servers")
+    parser.add_argument("--json", help="write the summary to this file")
+    args = parser.parse_args()
+
+    if not args.duration and not args.requests:
+        parser.error("set --duration or --requests")
+
+    servers = None
+    if not args.no_fake:
+        ports = {name: 0 for name in ("finnhub", "tavily", "groq")}
+        servers = FakeServers(ports=ports, faults=parse_settings(args.set)).start()
+    configure_env(servers, args.real_limits, args.llm_cache)
+
+    mix = [(agent, q) for agent, q in load_mix(args.mix) if agent in args.agents]
+    if any(agent == "rag" for agent, _ in mix):
+        from src.tools.vector_store import index_exists
+        if not index_exists():
+            print("no index in data/vector_store: skipping rag queries (ingest data/pdfs first)")
+            mix = [(agent, q) for agent, q in mix if agent != "rag"]
+    if not mix:
+        raise SystemExit("empty query mix")
+
+    runner = Runner(stream=args.stream, use_answer_cache=args.answer_cache)
+    print(f"{len(mix)} queries in mix, concurrency {args.concurrency}, "
+          f"{'streaming' if args.stream else 'blocking'}"
+          f"{', fake upstreams' if servers else ''}")
+
+    results, wall = run_load(runner, mix, args.concurrency, args.duration, args.requests,
+                             args.warmup, args.seed)
+    summary = summarize(results, wall)
+    print_summary(summary)
+
+    from src.tools.http_client import get_http_client
+    from src.ratelimit import get_limiter
+    summary["http"] = get_http_client().stats()
+    if args.llm_cache:
+        from src.tools.llm_cache import get_llm_cache
+        summary["llm_cache"] = get_llm_cache().stats()
+    summary["rate_limiter"] = {":".join(map(str, k)) if isinstance(k, tuple) else str(k): v
+                               for k, v in get_limiter().stats().items()}
+    if servers:
+        summary["upstreams"] = servers.stats()
+        print("\nupstreams:")
+        for name, s in summary["upstreams"].items():
+            print(f"  {name:<8} " + ", ".join(f"{k}={v}" for k, v in s.items()))
+        servers.stop()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
@@ -4,65 +4,136 @@ import re
 from typing import Optional, List, Dict
 from datetime import datetime
 
-from src.llm import get_llm
+from src.llm import get_llm, stream_llm_response
 from src.tools.web_search import web_search
-from src.tools.market import get_stock_price
+from src.tools.market import get_stock_price, get_stock_prices
 from src.tools.news import get_company_news
 from src.tools.budget_calc import budget_plan
+from src.tools.projection import project_savings
 from src.tools.symbol_lookup import symbol_lookup
+from src.tools.symbol_directory import get_symbol_directory, best_listing
+from src.tools.renderers import render_result, format_inr
+from src.agents.tool_graph import ToolGraph
+from src.agents.router import route
+from src.tracing import trace, span, annotate, query_attrs
+from src.memory import ConversationMemory, trim_history
+from src.config import FAST_RENDER_ENABLED
 
 
 # =========================================================
-# TIME-SENSITIVE KEYWORDS
+# TOOL DEADLINES
 # =========================================================
 
-TIME_SENSITIVE = [
-    "ipo",
-    "upcoming",
-    "repo rate",
-    "interest rate",
-    "latest",
-    "today",
-    "current",
-    "deadline",
-    "update",
-    "announcement",
-    "new rules",
-    "happened on",
-    "union budget",
-    "news",
-    "stocks",
-    "stock",
-    "announced"
-]
+# whole stock-price tool graph must finish within this
+STOCK_TOOL_DEADLINE = 12.0
+
+# start the web-search fallback after this long if the quote is still pending
+HEDGE_DELAY = 1.0
+
+# budgets project their monthly savings this far ahead
+BUDGET_PROJECTION_MONTHS = 120
+
+# savings goals are compared across these instruments
+GOAL_INSTRUMENTS = ("rd", "sip")
+
+# exchanges the Finnhub free plan rejects (403) -> hedge immediately
+PLAN_LIMITED_SUFFIXES = (".NS", ".BO")
+_plan_limited_symbols = set()
+
+
+# =========================================================
+# MULTI-SYMBOL QUERIES
+# =========================================================
+
+MULTI_SYMBOL_SPLIT = re.compile(r",|;|/|\band\b|\bvs\.?|\bversus\b|\bwith\b", re.IGNORECASE)
+MULTI_SYMBOL_FILLER = re.compile(
+    r"\b(compare|comparison|watchlist|my|show|quotes?|prices?|stocks?|shares?"
+    r"|between|how|are|is|doing|the|for|what|whats)\b"
+)
+
+
+# =========================================================
+# PATTERNS (compiled once)
+# =========================================================
+
+TICKER_RE = re.compile(r"\b[A-Z]{2,10}\b")
+COMPANY_FILLER_RE = re.compile(r"\b(stock|share|price|of|give|me|today|current|latest|pls|please)\b")
+SPACES_RE = re.compile(r"\s+")
+COMPANY_CHARS_RE = re.compile(r"[^a-zA-Z0-9\s&.-]")
+INDIAN_AMOUNT_RE = re.compile(r"(\d+(\.\d+)?)\s*(lakh|lakhs|crore|crores)")
+DIGITS_RE = re.compile(r"\d+")
+MONTHS_RE = re.compile(r"(\d+)\s*(month|months|mths)")
+EXPLAIN_RE = re.compile(
+    r"\b(explain|why|elaborate|details?|detailed|in depth|analy[sz]e|analysis"
+    r"|advice|advise|recommend|what does|meaning|pros|cons)\b"
+)
+INCOME_RE = re.compile(r"\b(salary|income|earn|earning|earnings|ctc)\b")
+DATE_RE = re.compile(r'(\d{1,2})\s*(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\s*(\d{4})?')
 
 
 # =========================================================
 # HELPERS
 # =========================================================
 
+TICKER_BLACKLIST = {
+    "IPO", "INDIA", "NSE", "BSE", "STOCK", "SHARE",
+    "PRICE", "RATE", "RBI", "NEWS"
+}
+
+
+def extract_tickers(text: str, as_typed: bool = False) -> List[str]:
+    """
+    All ticker-like words, in order. With as_typed, only words the
+    user actually wrote in capitals ("compare TCS and INFY").
+    """
+    source = text if as_typed else text.upper()
+    tickers = TICKER_RE.findall(source)
+    tickers = [t for t in tickers if t not in TICKER_BLACKLIST]
+    return list(dict.fromkeys(tickers))
+
+
 def extract_ticker(text: str) -> Optional[str]:
-    tickers = re.findall(r"\b[A-Z]{2,10}\b", text.upper())
-    blacklist = {
-        "IPO", "INDIA", "NSE", "BSE", "STOCK", "SHARE",
-        "PRICE", "RATE", "RBI", "NEWS"
-    }
-    tickers = [t for t in tickers if t not in blacklist]
+    tickers = TICKER_RE.findall(text.upper())
+    tickers = [t for t in tickers if t not in TICKER_BLACKLIST]
     return tickers[-1] if tickers else None
 
 
+def resolve_symbols(user_query: str) -> List[str]:
+    """
+    "compare TCS, infosys and wipro" -> ["TCS.NS", "INFY.NS", "WIPRO.NS"]
+    Each comma / and / vs separated part is resolved on its own.
+    """
+    directory = get_symbol_directory()
+    symbols = []
+
+    for part in MULTI_SYMBOL_SPLIT.split(user_query):
+        cleaned = MULTI_SYMBOL_FILLER.sub(" ", clean_company_query(part)).strip()
+        if not cleaned:
+            continue
+
+        # several names at once: only exact names, a fuzzy hit on a
+        # stray word ("tomato" -> ZOMATO) would turn into a quote
+        match = directory.resolve(cleaned)
+        if match and match["match"] == "exact":
+            symbols.append(match["symbol"])
+        else:
+            symbols.extend(extract_tickers(part, as_typed=True))
+
+    return list(dict.fromkeys(symbols))
+
+
 def clean_company_query(user_query: str) -> str:
     q = user_query.lower().strip()
-    q = re.sub(r"\b(stock|share|price|of|give|me|today|current|latest|pls|please)\b", " ", q)
-    q = re.sub(r"\s+", " ", q).strip()
-    q = re.sub(r"[^a-zA-Z0-9\s&.-]", "", q).strip()
+    q = COMPANY_FILLER_RE.sub(" ", q)
+    q = SPACES_RE.sub(" ", q).strip()
+    q = COMPANY_CHARS_RE.sub("", q).strip()
     return q if q else user_query.strip()
 
 
 def parse_indian_amount(text: str) -> Optional[int]:
     t = text.lower().replace(",", "").strip()
 
-    match = re.search(r"(\d+(\.\d+)?)\s*(lakh|lakhs|crore|crores)", t)
+    match = INDIAN_AMOUNT_RE.search(t)
     if match:
         num = float(match.group(1))
         unit = match.group(3)
@@ -71,19 +142,18 @@ def parse_indian_amount(text: str) -> Optional[int]:
         if "crore" in unit:
             return int(num * 10000000)
 
-    digits = re.findall(r"\d+", t)
+    digits = DIGITS_RE.findall(t)
     return int(digits[0]) if digits else None
 
 
 def extract_months(text: str) -> Optional[int]:
-    match = re.search(r"(\d+)\s*(month|months|mths)", text.lower())
+    match = MONTHS_RE.search(text.lower())
     return int(match.group(1)) if match else None
 
 
 def detect_date_query(query: str) -> Optional[str]:
     q = query.lower()
-    pattern = r'(\d{1,2})\s*(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\s*(\d{4})?'
-    match = re.search(pattern, q)
+    match = DATE_RE.search(q)
 
     if match:
         year = match.group(3) or datetime.now().year
@@ -92,24 +162,62 @@ def detect_date_query(query: str) -> Optional[str]:
     return None
 
 
-def build_conversation_context(chat_history: List[Dict]) -> str:
+# =========================================================
+# CONVERSATION MEMORY
+# =========================================================
+
+SYMBOL_INTENTS = {"multi_symbol", "stock_price", "news"}
+
+
+def extract_facts(user_query: str) -> Dict:
+    """
+    Facts worth keeping for the whole chat, from one user turn:
+    {"income": "₹80,000", "goals": ["save ₹5,00,000 in 12 months"], "tickers": [...]}
+    """
+    q = user_query.lower().strip()
+    facts = {}
+
+    amount = parse_indian_amount(q)
+    months = extract_months(q)
+    if amount and INCOME_RE.search(q):
+        facts["income"] = format_inr(amount)
+    elif amount and months and "save" in q:
+        facts["goals"] = [f"save {format_inr(amount)} in {months} months"]
+
+    if SYMBOL_INTENTS.intersection(route(q)):
+        tickers = resolve_symbols(user_query) or extract_tickers(user_query, as_typed=True)
+        if tickers:
+            facts["tickers"] = tickers
+
+    return facts
+
+
+def new_conversation_memory() -> ConversationMemory:
+    return ConversationMemory(extract_facts=extract_facts)
+
+
+def build_conversation_context(chat_history) -> str:
+    """
+    chat_history is a ConversationMemory or a list of {"role", "content"};
+    either way the block stays within the memory token caps.
+    """
+    if isinstance(chat_history, ConversationMemory):
+        return chat_history.context()
     if not chat_history:
         return ""
 
-    context = "Conversation so far:\n"
-    for msg in chat_history[-6:]:
+    lines = ["Conversation so far:"]
+    for msg in trim_history(chat_history):
         role = "User" if msg["role"] == "user" else "Assistant"
-        context += f"{role}: {msg['content']}\n"
+        lines.append(f"{role}: {msg['content']}")
 
-    return context + "\n"
+    return "\n".join(lines) + "\n\n"
 
 
-def format_with_llm(user_query: str, data, chat_history: List[Dict] = None) -> str:
-    try:
-        llm = get_llm()
-        context = build_conversation_context(chat_history or [])
+def build_format_prompt(user_query: str, data, chat_history: List[Dict] = None) -> str:
+    context = build_conversation_context(chat_history or [])
 
-        prompt = f"""
+    return f"""
 {context}
 User's question: "{user_query}"
 
@@ -124,130 +232,323 @@ Write a clear, well-structured, helpful answer.
 - Do NOT repeat raw JSON
 """
 
-        res = llm.invoke(prompt)
+
+def format_with_llm(user_query: str, data, chat_history: List[Dict] = None,
+                    use_cache: bool = True) -> str:
+    try:
+        llm = get_llm()
+        prompt = build_format_prompt(user_query, data, chat_history)
+
+        res = llm.invoke(prompt, use_cache=use_cache)
         return res.content
 
     except Exception:
         return "I retrieved the data successfully, but formatting failed. Please try again."
 
 
+def format_with_llm_stream(user_query: str, data, chat_history: List[Dict] = None,
+                           use_cache: bool = True):
+    """
+    Streaming version of format_with_llm: yields text as it arrives.
+    """
+    prompt = build_format_prompt(user_query, data, chat_history)
+    yield from stream_llm_response(prompt, use_cache=use_cache)
+
+
+def build_chat_prompt(user_query: str, chat_history: List[Dict]) -> str:
+    context = build_conversation_context(chat_history)
+
+    return f"""
+{context}
+User: {user_query}
+
+Give a detailed, structured, helpful response.
+Use bullet points if useful.
+"""
+
+
 # =========================================================
-# MAIN ROUTER
+# FAST PATH (template answers, no LLM)
 # =========================================================
 
-def run_finance_agent(user_query: str, chat_history: List[Dict] = None):
+EXPLAIN_HINT = "\n\n_Say “explain more” for a detailed walkthrough._"
 
-    if chat_history is None:
-        chat_history = []
 
-    q = user_query.lower().strip()
+def wants_explanation(user_query: str) -> bool:
+    return bool(EXPLAIN_RE.search(user_query.lower()))
 
-    # -----------------------------------------------------
-    # 1️⃣ TIME-SENSITIVE → WEB SEARCH
-    # -----------------------------------------------------
-    if any(word in q for word in TIME_SENSITIVE):
-        date_query = detect_date_query(user_query)
-        if date_query:
-            results = web_search(date_query)
-        else:
-            results = web_search(user_query)
 
-        return format_with_llm(user_query, results, chat_history)
+def render_fast(user_query: str, data) -> Optional[str]:
+    """
+    Template answer for budget / savings / quote results, or None when
+    the user asked for an explanation or the result has no template
+    (the LLM writes those up).
+    """
+    if not FAST_RENDER_ENABLED or wants_explanation(user_query):
+        return None
+
+    with span("render") as s:
+        text = render_result(data)
+        s.set(rendered=text is not None)
+
+    if text is None:
+        return None
+    annotate(fast_path=True)
+    return text + EXPLAIN_HINT
+
+
+# =========================================================
+# STOCK PRICE TOOL GRAPH
+# =========================================================
 
-    # -----------------------------------------------------
-    # 2️⃣ STOCK PRICE
-    # -----------------------------------------------------
-    if any(x in q for x in ["stock price", "share price", "price of"]):
+def _usable_result(value) -> bool:
+    """
+    A quote with a real (non-zero) price, or non-empty web results.
+    """
+    if isinstance(value, dict):
+        if value.get("error"):
+            return False
+        if "current" in value:
+            return bool(value["current"])
+    return bool(value)
+
+
+def fetch_stock_price_data(user_query: str):
+    """
+    symbol lookup -> quote, raced against a hedged web search.
+
+    Symbols come from the local directory first; Finnhub /search is
+    only called when neither the directory nor the query has one.
+
+    The web search starts after HEDGE_DELAY, or right away when the
+    quote is likely to fail (plan-limited exchange, earlier 403) or
+    has already failed. The first usable result wins.
+    """
+    clean_q = clean_company_query(user_query)
+
+    def resolve_symbol():
+        match = get_symbol_directory().resolve(clean_q)
+        # "partial": a listed name inside an unlisted one ("icici lombard")
+        if match and match["match"] != "partial":
+            return match["symbol"]
 
         symbol = extract_ticker(user_query)
+        if symbol:
+            return symbol
+
+        lookup = symbol_lookup(clean_q)
+        results = lookup.get("result", []) if isinstance(lookup, dict) else []
+        if not results:
+            raise LookupError("no symbol found")
+        return best_listing(results)["symbol"]
+
+    def quote(sym):
+        if sym.endswith(PLAN_LIMITED_SUFFIXES) or sym in _plan_limited_symbols:
+            graph.trigger("web")
+
+        price_data = get_stock_price(sym)
+        if isinstance(price_data, dict) and price_data.get("status_code") == 403:
+            _plan_limited_symbols.add(sym)
+        return price_data
+
+    graph = ToolGraph(deadline=STOCK_TOOL_DEADLINE)
+    graph.add("symbol", resolve_symbol)
+    graph.add("quote", quote, deps=["symbol"])
+    graph.add("web", lambda: web_search(f"{user_query} live stock price"), delay=HEDGE_DELAY)
+
+    name, value = graph.first(["quote", "web"], usable=_usable_result)
+    if name:
+        return value
+
+    return {
+        "error": True,
+        "message": "Live price lookup did not finish in time. Please try again.",
+    }
 
-        if not symbol:
-            clean_q = clean_company_query(user_query)
-            lookup = symbol_lookup(clean_q)
-            results = lookup.get("result", []) if isinstance(lookup, dict) else []
-            symbol = results[0]["symbol"] if results else None
 
-        if not symbol:
-            search_results = web_search(f"{user_query} live stock price")
-            return format_with_llm(user_query, search_results, chat_history)
+# =========================================================
+# MAIN ROUTER
+# =========================================================
 
-        price_data = get_stock_price(symbol)
+def _multi_symbol(user_query: str, q: str):
+    symbols = resolve_symbols(user_query)
+    if len(symbols) < 2:
+        return None
 
-        if isinstance(price_data, dict) and price_data.get("current", 0) == 0:
-            search_results = web_search(f"{user_query} live stock price")
-            return format_with_llm(user_query, search_results, chat_history)
+    data = get_stock_prices(symbols)
+    _plan_limited_symbols.update(
+        s for s, e in data["errors"].items() if e.get("status_code") == 403
+    )
+    if not data["quotes"]:
+        # e.g. NSE symbols on the free Finnhub plan: same fallback as a single quote
+        return web_search(f"{user_query} live stock price")
+    return data
 
-        return format_with_llm(user_query, price_data, chat_history)
 
-    # -----------------------------------------------------
-    # 3️⃣ NEWS
-    # -----------------------------------------------------
-    if "news" in q:
+def _time_sensitive(user_query: str, q: str):
+    date_query = detect_date_query(user_query)
+    if date_query:
+        return web_search(date_query)
+    return web_search(user_query)
 
-        date_query = detect_date_query(user_query)
-        if date_query:
-            results = web_search(date_query)
-            return format_with_llm(user_query, results, chat_history)
 
-        symbol = extract_ticker(user_query)
+def _stock_price(user_query: str, q: str):
+    return fetch_stock_price_data(user_query)
 
-        if symbol:
-            news_data = get_company_news(symbol)
-            return format_with_llm(user_query, news_data, chat_history)
-
-        results = web_search(user_query)
-        return format_with_llm(user_query, results, chat_history)
-
-    # -----------------------------------------------------
-    # 4️⃣ SAVINGS GOAL
-    # -----------------------------------------------------
-    if ("save" in q or "saving" in q) and "month" in q:
-        goal = parse_indian_amount(q)
-        months = extract_months(q)
-
-        if goal and months and months > 0:
-            per_month = round(goal / months, 2)
-
-            savings_data = {
-                "goal_amount": goal,
-                "months": months,
-                "monthly_required": per_month,
-                "tip": "Automate savings using SIP or recurring deposit."
-            }
-
-            return format_with_llm(user_query, savings_data, chat_history)
-
-    # -----------------------------------------------------
-    # 5️⃣ BUDGET
-    # -----------------------------------------------------
-    if any(x in q for x in ["salary", "income", "budget"]):
-        income = parse_indian_amount(q) or 50000
-        fixed = round(income * 0.5)
-        variable = round(income * 0.3)
-
-        budget_data = budget_plan(income=income, fixed=fixed, variable=variable)
-        return format_with_llm(user_query, budget_data, chat_history)
-
-    # -----------------------------------------------------
-    # 6️⃣ DEFAULT → LLM WITH CONTEXT
-    # -----------------------------------------------------
-    try:
-        llm = get_llm()
-        context = build_conversation_context(chat_history)
 
-        prompt = f"""
-{context}
-User: {user_query}
+def _news(user_query: str, q: str):
+    date_query = detect_date_query(user_query)
+    if date_query:
+        return web_search(date_query)
 
-Give a detailed, structured, helpful response.
-Use bullet points if useful.
-"""
+    symbol = extract_ticker(user_query)
+    if symbol:
+        return get_company_news(symbol)
 
-        res = llm.invoke(prompt)
-        return res.content
+    return web_search(user_query)
+
+
+def _savings(user_query: str, q: str):
+    goal = parse_indian_amount(q)
+    months = extract_months(q)
+
+    if goal and months and months > 0:
+        per_month = round(goal / months, 2)
+
+        # returns and inflation on top of the plain split; the goal is
+        # the amount the user named, not today's money
+        projections = {
+            instrument: project_savings(per_month, months, goal=goal, instrument=instrument,
+                                        goal_in_todays_money=False)
+            for instrument in GOAL_INSTRUMENTS
+        }
+
+        return {
+            "goal_amount": goal,
+            "months": months,
+            "monthly_required": per_month,
+            "projections": projections,
+            "tip": "Automate savings using SIP or recurring deposit."
+        }
+
+    return None
+
+
+def _budget(user_query: str, q: str):
+    income = parse_indian_amount(q) or 50000
+    fixed = round(income * 0.5)
+    variable = round(income * 0.3)
+
+    return budget_plan(income=income, fixed=fixed, variable=variable,
+                       projection_months=BUDGET_PROJECTION_MONTHS)
 
-    except Exception as e:
-        return f"Something went wrong: {str(e)}"
 
+# answers about live data are never served from the LLM completion cache
+LIVE_ROUTES = {"multi_symbol", "time_sensitive", "stock_price", "news"}
 
 
+# intent (see src/agents/router.py ROUTES) -> handler(user_query, q)
+# a handler returning None passes the query on to the next intent
+INTENT_HANDLERS = {
+    "multi_symbol": _multi_symbol,      # several symbols → batch quotes
+    "time_sensitive": _time_sensitive,  # → web search
+    "stock_price": _stock_price,        # → quote, hedged by web search
+    "news": _news,                      # → Finnhub news or web search
+    "savings": _savings,                # → monthly savings plan
+    "budget": _budget,                  # → 50/30/20 budget
+}
+
+
+def resolve_query(user_query: str):
+    """
+    Route the query and run its tools.
+    Returns (intent, tool_output) to be written up by the LLM,
+    or ("chat", None) for a plain conversational answer.
+    """
+    q = user_query.lower().strip()
+
+    with span("route") as s:
+        intents = route(q)
+        s.set(intents=intents)
+
+    for intent in intents:
+        with span(f"tool:{intent}") as s:
+            data = INTENT_HANDLERS[intent](user_query, q)
+            s.set(handled=data is not None)
+        if data is not None:
+            annotate(route=intent)
+            return intent, data
+
+    # default → LLM with context
+    annotate(route="chat")
+    return "chat", None
+
+
+def _remember(memory: Optional[ConversationMemory], user_query: str, answer: str):
+    if memory is not None:
+        memory.add("user", user_query)
+        memory.add("assistant", answer)
+
+
+def run_finance_agent(user_query: str, chat_history: List[Dict] = None,
+                      memory: ConversationMemory = None):
+    """
+    With memory, the prompt gets its bounded context and the turn is
+    recorded afterwards; chat_history is then ignored.
+    """
+    if memory is not None:
+        chat_history = memory
+    elif chat_history is None:
+        chat_history = []
+
+    with trace("finance", **query_attrs(user_query)):
+        kind, data = resolve_query(user_query)
+
+        if kind != "chat":
+            answer = render_fast(user_query, data) or format_with_llm(
+                user_query, data, chat_history, use_cache=kind not in LIVE_ROUTES
+            )
+            _remember(memory, user_query, answer)
+            return answer
+
+        try:
+            llm = get_llm()
+            prompt = build_chat_prompt(user_query, chat_history)
+
+            res = llm.invoke(prompt)
+            _remember(memory, user_query, res.content)
+            return res.content
+
+        except Exception as e:
+            return f"Something went wrong: {str(e)}"
+
+
+def run_finance_agent_stream(user_query: str, chat_history: List[Dict] = None,
+                             memory: ConversationMemory = None):
+    """
+    Streaming version of run_finance_agent.
+    Tools run first; the answer is then yielded token by token.
+    """
+    if memory is not None:
+        chat_history = memory
+    elif chat_history is None:
+        chat_history = []
+
+    with trace("finance", stream=True, **query_attrs(user_query)):
+        kind, data = resolve_query(user_query)
+
+        fast = render_fast(user_query, data) if kind != "chat" else None
+
+        if fast is not None:
+            pieces = [fast]
+        elif kind != "chat":
+            pieces = format_with_llm_stream(user_query, data, chat_history,
+                                            use_cache=kind not in LIVE_ROUTES)
+        else:
+            pieces = stream_llm_response(build_chat_prompt(user_query, chat_history))
+
+        parts = []
+        for piece in pieces:
+            parts.append(piece)
+            yield piece
+        _remember(memory, user_query, "".join(parts))
@@ -1,15 +1,37 @@
 import os
+import time
+import contextvars
 from typing import List, Dict, Any
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from src.tools.pdf_loader import load_pdfs
-from src.tools.text_splitter import split_documents
+from src.tools.ingest_pipeline import run_ingest_pipeline
+from src.tools.retrieval import hybrid_search, hybrid_search_batch
+from src.tools.context_packer import pack_context
+from src.tools.answer_cache import get_answer_cache
 from src.tools.vector_store import (
-    build_faiss_index,
     load_faiss_index,
-    VECTOR_DB_PATH,
+    get_shared_index,
+    publish_index,
+    save_faiss_index,
+    ensure_ann_index,
+    get_chunk_store,
+    get_index_version,
+    index_exists,
+    file_sha256,
+    load_manifest,
+    save_manifest,
+    manifest_from_index,
 )
 from src.llm import get_llm
+from src.config import (
+    CONTEXT_CANDIDATES,
+    CONTEXT_TOKENS_CONCISE,
+    CONTEXT_TOKENS_DETAILED,
+    BATCH_LLM_CONCURRENCY,
+)
+from src.tracing import trace, start_trace, span, query_attrs
+from src.ratelimit import request_context, PRIORITY_BATCH
 
 
 
@@ -18,11 +40,19 @@ class StockMarketRAGAgent:
     """
     Stock Market RAG Agent using RBI & SEBI documents.
     Now supports feedback logging.
+
+    The LLM client and the FAISS index are process-wide shared resources,
+    so creating an agent per session is cheap. Pass llm to use another
+    chat model (e.g. a stub in offline benchmarks).
     """
 
-    def __init__(self):
-        self.llm = get_llm()
-        self.vector_db = None
+    def __init__(self, llm=None):
+        self.llm = llm or get_llm()
+        self.answer_cache = get_answer_cache()
+
+    @property
+    def vector_db(self):
+        return get_shared_index()
 
 
 
@@ -30,40 +60,140 @@ class StockMarketRAGAgent:
     # PDF INGESTION
     # ---------------------------------------------------
     def ingest_pdfs(self, pdf_paths: List[str]):
-        if os.path.exists(VECTOR_DB_PATH):
-            self.vector_db = load_faiss_index()
-            return {"status": "loaded_existing_index"}
+        """
+        Incrementally sync the index with pdf_paths.
+        Only new/changed PDFs are parsed and embedded; vectors of
+        deleted or changed PDFs are removed from the existing index.
+        """
+        current = {os.path.normpath(p): file_sha256(p) for p in pdf_paths}
+
+        fresh = not index_exists()
+        manifest = {"files": {}} if fresh else load_manifest()
+
+        if not fresh and not manifest["files"]:
+            manifest = manifest_from_index(load_faiss_index(writable=True), pdf_paths)
+
+        files = manifest["files"]
+        added = [p for p in current if p not in files]
+        removed = [p for p in files if p not in current]
+        changed = [
+            p for p in current
+            if p in files and files[p]["sha256"] != current[p]
+        ]
+
+        if not fresh and not (added or removed or changed):
+            ensure_ann_index()
+            get_shared_index()
+            return {
+                "status": "loaded_existing_index",
+                "unchanged": len(current),
+            }
+
+        # private copy: sessions keep querying the shared index meanwhile
+        if fresh:
+            get_chunk_store().clear()
+            db = None
+        else:
+            get_chunk_store().collect_garbage()
+            db = load_faiss_index(writable=True)
+
+        # drop vectors of deleted and outdated files
+        stale_ids = []
+        for path in removed + changed:
+            stale_ids.extend(files.pop(path)["chunk_ids"])
+
+        if stale_ids and db is not None:
+            db.delete(stale_ids)
+
+        # embed only new and changed files (streaming pipeline)
+        db, stats = run_ingest_pipeline(
+            added + changed,
+            hashes=current,
+            vector_db=db,
+        )
+        for path in added + changed:
+            files[path] = {
+                "sha256": current[path],
+                "chunk_ids": stats["chunk_ids"].get(path, []),
+            }
 
-        docs = load_pdfs(pdf_paths)
-        chunks = split_documents(docs)
-        self.vector_db = build_faiss_index(chunks)
+        if db is not None:
+            save_faiss_index(db)
+            publish_index()
+        save_manifest(manifest)
 
         return {
-            "status": "built_new_index",
-            "pdfs_loaded": len(pdf_paths),
-            "chunks_created": len(chunks),
+            "status": "built_new_index" if fresh else "updated_index",
+            "added": [os.path.basename(p) for p in added],
+            "changed": [os.path.basename(p) for p in changed],
+            "removed": [os.path.basename(p) for p in removed],
+            "unchanged": len(current) - len(added) - len(changed),
+            "chunks_added": stats["vectors"],
+            "chunks_removed": len(stale_ids),
+            "throughput": stats["throughput"],
+            "embedding_cache": stats.get("embedding_cache"),
         }
 
     # ---------------------------------------------------
-    # MAIN ASK METHOD
+    # RETRIEVAL + PROMPT
     # ---------------------------------------------------
-    def ask(self, query: str, answer_style: str = "Detailed"):
+    def _prepare(self, query: str, answer_style: str, use_cache: bool):
+        """
+        Everything before generation: cache lookup, retrieval, prompt.
+        Returns a dict with either "cached" (a finished result)
+        or "prompt" and "sources".
+        """
+        start = time.perf_counter()
+        vector_db = self.vector_db
+        with span("embed_query"):
+            query_vector = vector_db.embeddings.embed_query(query)
+        index_version = get_index_version()
+
+        # semantically equivalent question already answered for this index?
+        if use_cache:
+            with span("answer_cache") as s:
+                cached = self.answer_cache.lookup(query_vector, answer_style, index_version)
+                s.set(hit=bool(cached))
+            if cached:
+                return {
+                    "cached": {
+                        "answer": cached["answer"],
+                        "sources": cached["sources"],
+                        "cached": True,
+                    }
+                }
+
+        # BM25 + dense, fused (exact identifiers can skip dense search)
+        with span("retrieval") as s:
+            retrieved = hybrid_search(vector_db, query, k=CONTEXT_CANDIDATES, query_vector=query_vector)
+            s.set(mode=retrieved["mode"], k=len(retrieved["docs"]), **retrieved["timings_ms"])
 
-        if not self.vector_db:
-            self.vector_db = load_faiss_index()
+        prompt, sources = self._build_prompt(query, answer_style, retrieved["docs"])
 
-        retriever = self.vector_db.as_retriever(search_kwargs={"k": 6})
-        docs = retriever.invoke(query)
+        return {
+            "prompt": prompt,
+            "sources": sources,
+            "query_vector": query_vector,
+            "index_version": index_version,
+            "start": start,
+        }
 
-        context_blocks = []
-        for doc in docs:
-            source = os.path.basename(doc.metadata.get("source", "Unknown"))
-            page = doc.metadata.get("page", "N/A")
-            content = doc.page_content.strip()
+    def _build_prompt(self, query: str, answer_style: str, docs):
+        """
+        Pack retrieved chunks into the style's context budget.
+        Returns (prompt, sources).
+        """
+        # merge neighbouring chunks, drop overlap/duplicates, fit the style's budget
+        budget = CONTEXT_TOKENS_CONCISE if answer_style == "Concise" else CONTEXT_TOKENS_DETAILED
+        with span("context_pack", budget=budget) as s:
+            packed = pack_context(docs, token_budget=budget)
+            s.set(tokens=packed["tokens"], **packed["stats"])
+        passages = packed["passages"]
 
-            context_blocks.append(
-                f"Source: {source} | Page: {page}\n{content}"
-            )
+        context_blocks = [
+            f"Source: {p['source']} | Page: {p['page']}\n{p['text']}"
+            for p in passages
+        ]
 
         context = "\n\n---\n\n".join(context_blocks)
 
@@ -100,18 +230,183 @@ Question:
 Answer:
 """
 
-        response = self.llm.invoke(prompt)
-        answer_text = response.content
+        sources = [{"source": p["source"], "page": p["page"]} for p in passages]
+        return prompt, sources
+
+    def _remember(self, query, answer_style, prepared, answer_text):
+        self.answer_cache.store(
+            query, prepared["query_vector"], answer_style, prepared["index_version"],
+            answer_text, prepared["sources"], time.perf_counter() - prepared["start"],
+        )
+
+    # ---------------------------------------------------
+    # MAIN ASK METHOD
+    # ---------------------------------------------------
+    def ask(self, query: str, answer_style: str = "Detailed", use_cache: bool = True):
+
+        with trace("rag", style=answer_style, **query_attrs(query)) as t:
+            prepared = self._prepare(query, answer_style, use_cache)
+            if "cached" in prepared:
+                t.set(cached=True)
+                return prepared["cached"]
 
-        sources = [
-            {
-                "source": os.path.basename(doc.metadata.get("source", "Unknown")),
-                "page": doc.metadata.get("page", "N/A"),
+            response = self.llm.invoke(prepared["prompt"])
+            answer_text = response.content
+
+            if use_cache:
+                self._remember(query, answer_style, prepared, answer_text)
+
+            return {
+                "answer": answer_text,
+                "sources": prepared["sources"],
+                "cached": False,
             }
-            for doc in docs
-        ]
+
+    # ---------------------------------------------------
+    # STREAMING ASK
+    # ---------------------------------------------------
+    def ask_stream(self, query: str, answer_style: str = "Detailed", use_cache: bool = True):
+        """
+        Like ask(), but returns as soon as retrieval is done:
+        {"sources": [...], "cached": bool, "tokens": generator of answer text}
+        Sources are available before generation starts.
+        """
+        # the trace stays open until the token stream is consumed
+        t = start_trace("rag", style=answer_style, stream=True, **query_attrs(query))
+        try:
+            prepared = self._prepare(query, answer_style, use_cache)
+        except Exception:
+            t.finish(error=True)
+            raise
+
+        if "cached" in prepared:
+            cached = prepared["cached"]
+            t.finish(cached=True)
+            return {
+                "sources": cached["sources"],
+                "cached": True,
+                "tokens": iter([cached["answer"]]),
+            }
+
+        def tokens():
+            try:
+                parts = []
+                for chunk in self.llm.stream(prepared["prompt"]):
+                    if chunk.content:
+                        parts.append(chunk.content)
+                        yield chunk.content
+
+                if use_cache:
+                    self._remember(query, answer_style, prepared, "".join(parts))
+            finally:
+                t.finish()
 
         return {
-            "answer": answer_text,
-            "sources": sources,
+            "sources": prepared["sources"],
+            "cached": False,
+            "tokens": tokens(),
         }
+
+    # ---------------------------------------------------
+    # BATCH ASK
+    # ---------------------------------------------------
+    def ask_batch(self, queries: List[str], answer_style: str = "Detailed",
+                  use_cache: bool = True, concurrency: int = BATCH_LLM_CONCURRENCY):
+        """
+        Answer many questions; yields (position, result) as answers finish.
+
+        All queries are embedded in one encoder call and searched in one
+        FAISS call over the query matrix. Generation runs `concurrency`
+        LLM calls at a time at batch priority, so interactive sessions
+        keep their share of the Groq budget. A failed call yields a
+        result with "error" instead of raising.
+        """
+        prepared = self._prepare_batch(queries, answer_style, use_cache)
+
+        for i, item in enumerate(prepared):
+            if "cached" in item:
+                yield i, dict(item["cached"], seconds=0.0)
+
+        pending = [i for i, item in enumerate(prepared) if "prompt" in item]
+        if not pending:
+            return
+
+        def generate(i):
+            start = time.perf_counter()
+            query, item = queries[i], dict(prepared[i], start=start)
+            with request_context(priority=PRIORITY_BATCH), \
+                    trace("rag", style=answer_style, batch=True, **query_attrs(query)):
+                try:
+                    answer_text = self.llm.invoke(item["prompt"]).content
+                except Exception as e:
+                    return {"answer": None, "sources": item["sources"], "cached": False,
+                            "seconds": round(time.perf_counter() - start, 3), "error": str(e)}
+
+            if use_cache:
+                self._remember(query, answer_style, item, answer_text)
+            return {
+                "answer": answer_text,
+                "sources": item["sources"],
+                "cached": False,
+                "seconds": round(time.perf_counter() - start, 3),
+            }
+
+        with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="rag-batch") as pool:
+            futures = {
+                pool.submit(contextvars.copy_context().run, generate, i): i
+                for i in pending
+            }
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
+    def _prepare_batch(self, queries: List[str], answer_style: str, use_cache: bool):
+        """
+        _prepare for many queries at once; same result shape per query.
+        """
+        start = time.perf_counter()
+        vector_db = self.vector_db
+        index_version = get_index_version()
+
+        with trace("rag_batch", questions=len(queries), style=answer_style) as t:
+            with span("embed_queries", n=len(queries)):
+                embeddings = vector_db.embeddings
+                if hasattr(embeddings, "embed_queries"):
+                    vectors = embeddings.embed_queries(queries)
+                else:
+                    vectors = embeddings.embed_documents(list(queries))
+
+            prepared = [None] * len(queries)
+            if use_cache:
+                with span("answer_cache") as s:
+                    for i, (query, vector) in enumerate(zip(queries, vectors)):
+                        cached = self.answer_cache.lookup(vector, answer_style, index_version)
+                        if cached:
+                            prepared[i] = {"cached": {
+                                "answer": cached["answer"],
+                                "sources": cached["sources"],
+                                "cached": True,
+                            }}
+                    s.set(hits=sum(1 for p in prepared if p is not None))
+
+            misses = [i for i, p in enumerate(prepared) if p is None]
+            t.set(cached=len(queries) - len(misses))
+
+            if misses:
+                with span("retrieval", n=len(misses)):
+                    retrieved = hybrid_search_batch(
+                        vector_db,
+                        [queries[i] for i in misses],
+                        [vectors[i] for i in misses],
+                        k=CONTEXT_CANDIDATES,
+                    )
+                for i, result in zip(misses, retrieved):
+                    prompt, sources = self._build_prompt(queries[i], answer_style, result["docs"])
+                    prepared[i] = {
+                        "prompt": prompt,
+                        "sources": sources,
+                        "query_vector": vectors[i],
+                        "index_version": index_version,
+                        "start": start,
+                    }
+
+        return prepared
@@ -0,0 +1,140 @@
+# src/agents/router.py
+
+import re
+from typing import Dict, List
+
+
+# =========================================================
+# KEYWORD CLASSES (substring match on the lowercased query)
+# =========================================================
+
+TIME_SENSITIVE = [
+    "ipo",
+    "upcoming",
+    "repo rate",
+    "interest rate",
+    "latest",
+    "today",
+    "current",
+    "deadline",
+    "update",
+    "announcement",
+    "new rules",
+    "happened on",
+    "union budget",
+    "news",
+    "stocks",
+    "stock",
+    "announced"
+]
+
+KEYWORDS = {
+    "multi": ["compare", "watchlist", " vs ", "versus", "price", "quote"],
+    "time_sensitive": TIME_SENSITIVE,
+    "stock_price": ["stock price", "share price", "price of"],
+    "news": ["news"],
+    "save": ["save", "saving"],
+    "month": ["month"],
+    "budget": ["salary", "income", "budget"],
+}
+
+
+# =========================================================
+# ROUTE TABLE (checked in order; a handler may decline)
+# =========================================================
+
+ROUTES = [
+    {"intent": "multi_symbol", "all": ["multi"], "none": ["news"]},
+    {"intent": "time_sensitive", "all": ["time_sensitive"], "none": []},
+    {"intent": "stock_price", "all": ["stock_price"], "none": []},
+    {"intent": "news", "all": ["news"], "none": []},
+    {"intent": "savings", "all": ["save", "month"], "none": []},
+    {"intent": "budget", "all": ["budget"], "none": []},
+]
+
+
+class IntentRouter:
+    """
+    Classifies a query into intents in one regex pass.
+
+    All keywords are compiled into a single alternation. After each hit
+    the scan resumes one character past its start, so overlapping
+    keywords ("stock price" and "price of") are all seen. Alternatives
+    are ordered longest first; each keyword also carries the classes of
+    every keyword that is a prefix of it, since only the longest match
+    at a position is reported. The result is exactly "any(keyword in q)"
+    per class.
+    """
+
+    def __init__(self, keywords: Dict[str, List[str]] = None, routes: List[Dict] = None):
+        keywords = keywords or KEYWORDS
+        routes = routes or ROUTES
+
+        bits = {name: 1 << i for i, name in enumerate(keywords)}
+        masks = {}
+        for name, words in keywords.items():
+            for word in words:
+                masks[word] = masks.get(word, 0) | bits[name]
+
+        # a match at a position also implies every keyword that is its prefix
+        self._masks = {
+            word: _or(mask for other, mask in masks.items() if word.startswith(other))
+            for word in masks
+        }
+
+        ordered = sorted(masks, key=len, reverse=True)
+        self._pattern = re.compile("|".join(re.escape(w) for w in ordered))
+
+        self._routes = [
+            (
+                route["intent"],
+                _or(bits[n] for n in route["all"]),
+                _or(bits[n] for n in route["none"]),
+            )
+            for route in routes
+        ]
+        self._by_mask = {}
+
+    def classify(self, q: str) -> int:
+        """
+        Bitmask of the keyword classes present in q (already lowercased).
+        """
+        found = 0
+        masks = self._masks
+        search = self._pattern.search
+
+        # resume one character after each match start: overlapping
+        # keywords are still found, and the scan between matches runs in C
+        match = search(q)
+        while match:
+            found |= masks[match.group()]
+            match = search(q, match.start() + 1)
+        return found
+
+    def route(self, q: str) -> List[str]:
+        """
+        Intents whose conditions hold, in route-table order.
+        """
+        found = self.classify(q)
+        intents = self._by_mask.get(found)
+        if intents is None:
+            # few distinct keyword combinations occur; evaluate each once
+            intents = self._by_mask[found] = [
+                intent for intent, required, excluded in self._routes
+                if found & required == required and not found & excluded
+            ]
+        return list(intents)
+
+
+def _or(values) -> int:
+    result = 0
+    for value in values:
+        result |= value
+    return result
+
+
+_router = IntentRouter()
+
+
+def route(q: str) -> List[str]:
+    return _router.route(q)
@@ -0,0 +1,136 @@
+# src/agents/tool_graph.py
+
+import time
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+from src.tracing import span
+
+
+_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="tool")
+
+
+class ToolGraph:
+    """
+    Small thread-pool execution graph for agent tool calls.
+
+    Nodes run concurrently as soon as their dependencies finish.
+    A node with a delay is a hedge: it starts after `delay` seconds,
+    or immediately once a competing node fails. first() returns the
+    first usable result among competing nodes within the deadline;
+    everything still pending is abandoned (delayed nodes never start).
+
+    Usage:
+        graph = ToolGraph(deadline=12)
+        graph.add("symbol", resolve_symbol)
+        graph.add("quote", get_stock_price, deps=["symbol"])
+        graph.add("web", lambda: web_search(q), delay=1.0)
+        name, value = graph.first(["quote", "web"], usable=is_usable)
+    """
+
+    def __init__(self, deadline: float):
+        self.deadline_at = time.monotonic() + deadline
+        self._nodes = {}
+        self._results = {}
+        self._cond = threading.Condition()
+        self._cancelled = threading.Event()
+        self._started = False
+
+    def add(self, name: str, fn, deps=(), delay: float = 0.0):
+        self._nodes[name] = {
+            "fn": fn,
+            "deps": list(deps),
+            "delay": delay,
+            "go": threading.Event(),
+        }
+        return self
+
+    # ---------------------------------------------------
+    # EXECUTION
+    # ---------------------------------------------------
+    def start(self):
+        if self._started:
+            return
+        self._started = True
+        # nodes run with the caller's context (session, priority)
+        for name in self._nodes:
+            _executor.submit(contextvars.copy_context().run, self._run, name)
+
+    def trigger(self, name: str):
+        """
+        Start a delayed (hedge) node now.
+        """
+        self._nodes[name]["go"].set()
+
+    def cancel(self):
+        self._cancelled.set()
+        for node in self._nodes.values():
+            node["go"].set()
+
+    def _remaining(self) -> float:
+        return max(0.0, self.deadline_at - time.monotonic())
+
+    def _finish(self, name, status, value):
+        with self._cond:
+            self._results[name] = (status, value)
+            self._cond.notify_all()
+
+    def _run(self, name):
+        node = self._nodes[name]
+
+        if node["delay"]:
+            node["go"].wait(min(node["delay"], self._remaining()))
+
+        # wait for dependencies
+        with self._cond:
+            while not all(d in self._results for d in node["deps"]):
+                if self._cancelled.is_set() or not self._cond.wait(self._remaining()):
+                    break
+            deps = [self._results.get(d) for d in node["deps"]]
+
+        if self._cancelled.is_set() or self._remaining() <= 0:
+            return self._finish(name, "skipped", None)
+
+        if any(dep is None or dep[0] != "ok" for dep in deps):
+            return self._finish(name, "skipped", None)
+
+        try:
+            with span(f"node:{name}"):
+                value = node["fn"](*(dep[1] for dep in deps))
+        except Exception as e:
+            return self._finish(name, "error", e)
+
+        self._finish(name, "ok", value)
+
+    def first(self, names, usable=bool):
+        """
+        (name, value) of the first usable result among names,
+        or (None, None) if none is usable before the deadline.
+        A finished-but-unusable node immediately triggers the others.
+        """
+        self.start()
+
+        with self._cond:
+            while True:
+                for name in names:
+                    status, value = self._results.get(name, (None, None))
+                    if status == "ok" and usable(value):
+                        self.cancel()
+                        return name, value
+
+                failed = [n for n in names if n in self._results]
+                for name in names:
+                    if failed and name not in self._results:
+                        self.trigger(name)
+
+                if len(failed) == len(names) or not self._cond.wait(self._remaining()):
+                    self.cancel()
+                    return None, None
+
+    def result(self, name):
+        """
+        Finished result of any node: ("ok" | "error" | "skipped", value), or None.
+        """
+        with self._cond:
+            return self._results.get(name)
@@ -28,3 +28,87 @@ if not TAVILY_API_KEY:
     print(f"⚠️  TAVILY_API_KEY missing - Web search disabled")
 if not FINNHUB_API_KEY:
     print(f"⚠️  FINNHUB_API_KEY missing - Stock data disabled")
+
+# Vector index
+# flat | ivf_flat | ivf_pq | hnsw
+VECTOR_INDEX_TYPE = os.getenv("VECTOR_INDEX_TYPE", "flat").lower()
+FAISS_NPROBE = int(os.getenv("FAISS_NPROBE", "16"))
+FAISS_EF_SEARCH = int(os.getenv("FAISS_EF_SEARCH", "64"))
+
+# Semantic answer cache (RAG agent)
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.92"))
+ANSWER_CACHE_TTL_SECONDS = float(os.getenv("ANSWER_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "5000"))
+
+# Finance agent: answer plain calculations / quotes from templates, no LLM call
+FAST_RENDER_ENABLED = os.getenv("FAST_RENDER_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Savings projections (Monte Carlo): paths per projection, fixed seed so the
+# same inputs always give the same numbers
+PROJECTION_PATHS = int(os.getenv("PROJECTION_PATHS", "10000"))
+PROJECTION_SEED = int(os.getenv("PROJECTION_SEED", "0"))
+
+# LLM completion cache (exact prompt match, persisted in SQLite); optional,
+# off unless LLM_CACHE_ENABLED=true
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(24 * 3600)))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# RAG prompt context: retrieved candidates, packed into a token budget per answer style
+CONTEXT_CANDIDATES = int(os.getenv("CONTEXT_CANDIDATES", "10"))
+CONTEXT_TOKENS_CONCISE = int(os.getenv("CONTEXT_TOKENS_CONCISE", "600"))
+CONTEXT_TOKENS_DETAILED = int(os.getenv("CONTEXT_TOKENS_DETAILED", "1200"))
+CONTEXT_MMR_LAMBDA = float(os.getenv("CONTEXT_MMR_LAMBDA", "0.7"))
+
+# Batch question answering (batch_qa.py): LLM calls in flight at once
+BATCH_LLM_CONCURRENCY = int(os.getenv("BATCH_LLM_CONCURRENCY", "4"))
+
+# Upstream endpoints (override to point at local stand-ins, see benchmarks/fake_servers.py)
+FINNHUB_BASE_URL = os.getenv("FINNHUB_BASE_URL", "https://finnhub.io/api/v1").rstrip("/")
+TAVILY_BASE_URL = os.getenv("TAVILY_BASE_URL")    # default: https://api.tavily.com
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL")        # default: https://api.groq.com
+
+# Shared HTTP client (Finnhub tools)
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10"))
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "32"))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+HTTP_BACKOFF_BASE = float(os.getenv("HTTP_BACKOFF_BASE", "0.3"))
+HTTP_BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", "5"))
+
+# Tool result cache (quotes / news / symbol search)
+# memory | sqlite (sqlite is shared by all worker processes on this machine)
+TOOL_CACHE_BACKEND = os.getenv("TOOL_CACHE_BACKEND", "memory").lower()
+QUOTE_CACHE_TTL = float(os.getenv("QUOTE_CACHE_TTL", "15"))
+NEWS_CACHE_TTL = float(os.getenv("NEWS_CACHE_TTL", "600"))
+SYMBOL_CACHE_TTL = float(os.getenv("SYMBOL_CACHE_TTL", str(7 * 24 * 3600)))
+
+# Local symbol directory: preferred listing when a company trades on several
+SYMBOL_EXCHANGE_PREFERENCE = [
+    e.strip().upper() for e in os.getenv("SYMBOL_EXCHANGE_PREFERENCE", "NSE,BSE,US").split(",")
+]
+
+# Upstream rate limits (calls per minute; Groq limits are per model)
+# Finnhub free plan: 60 calls/minute
+FINNHUB_CALLS_PER_MINUTE = int(os.getenv("FINNHUB_CALLS_PER_MINUTE", "60"))
+GROQ_REQUESTS_PER_MINUTE = int(os.getenv("GROQ_REQUESTS_PER_MINUTE", "30"))
+TAVILY_REQUESTS_PER_MINUTE = int(os.getenv("TAVILY_REQUESTS_PER_MINUTE", "100"))
+RATE_LIMIT_QUEUE_TIMEOUT = float(os.getenv("RATE_LIMIT_QUEUE_TIMEOUT", "30"))
+LLM_RATE_LIMIT_RETRIES = int(os.getenv("LLM_RATE_LIMIT_RETRIES", "3"))
+
+# Batch quotes
+QUOTE_BATCH_DEADLINE = float(os.getenv("QUOTE_BATCH_DEADLINE", "8"))
+
+# Conversation memory (finance chat): recent-turn window, per-turn clip,
+# background summary every N turns and its size, all in tokens
+MEMORY_WINDOW_TOKENS = int(os.getenv("MEMORY_WINDOW_TOKENS", "800"))
+MEMORY_TURN_TOKENS = int(os.getenv("MEMORY_TURN_TOKENS", "250"))
+MEMORY_SUMMARY_EVERY = int(os.getenv("MEMORY_SUMMARY_EVERY", "4"))
+MEMORY_SUMMARY_TOKENS = int(os.getenv("MEMORY_SUMMARY_TOKENS", "200"))
+
+# Tracing (per-request spans, Prometheus histograms). The JSONL trace
+# log is opt-in: set TRACE_LOG_PATH (e.g. data/traces/traces.jsonl);
+# it rotates at TRACE_LOG_MAX_BYTES, keeping TRACE_LOG_BACKUPS old files
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() in ("1", "true", "yes")
+TRACE_LOG_PATH = os.getenv("TRACE_LOG_PATH", "")
+TRACE_LOG_MAX_BYTES = int(os.getenv("TRACE_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+TRACE_LOG_BACKUPS = int(os.getenv("TRACE_LOG_BACKUPS", "3"))
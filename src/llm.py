@@ -3,34 +3,211 @@ LLM utilities for all agents using LangChain
 Provides unified interface for Groq via LangChain
 """
 
+import time
+
 from langchain_groq import ChatGroq
-from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
-from src.config import GROQ_API_KEY
+from langchain_core.messages import HumanMessage, SystemMessage, AIMessage, AIMessageChunk
+from src.config import (
+    GROQ_API_KEY,
+    GROQ_BASE_URL,
+    RATE_LIMIT_QUEUE_TIMEOUT,
+    LLM_RATE_LIMIT_RETRIES,
+    LLM_CACHE_ENABLED,
+)
+from src.registry import registry
+from src.ratelimit import get_limiter, SingleFlight
+from src.tracing import span, count
+from src.memory import trim_history
+from src.tools.llm_cache import get_llm_cache, completion_key
+
+
+# identical prompts already in flight share one completion
+_flight = SingleFlight()
+
+
+class RateLimitedLLM:
+    """
+    ChatGroq behind the shared rate limiter.
+
+    - every call waits for a slot in the per-model Groq budget
+      (fair across sessions, interactive before batch)
+    - identical invoke() calls in flight are coalesced into one
+    - a 429 pauses the model's budget for Retry-After seconds and the
+      call is queued again instead of failing
+    - with LLM_CACHE_ENABLED, completions are served from the LLM cache
+      when the exact prompt was answered before (use_cache=False for
+      time-sensitive prompts)
+    Everything else is delegated to the wrapped ChatGroq.
+    """
+
+    def __init__(self, llm, model, temperature):
+        self.llm = llm
+        self.model = model
+        self.temperature = temperature
+
+    def invoke(self, messages, use_cache=True, **kwargs):
+        cache_key = self._cache_key(messages, kwargs, use_cache)
+        key = (self.model, self.temperature, _messages_key(messages), repr(sorted(kwargs.items())))
+        with span("llm", model=self.model) as s:
+            cached = self._cached(s, cache_key)
+            if cached is not None:
+                return AIMessage(content=cached, response_metadata={"cached": True})
+
+            response, shared = _flight.do(
+                key, lambda: self._call(s, lambda: self.llm.invoke(messages, **kwargs))
+            )
+            s.set(coalesced=shared)
+            if not shared:
+                usage = getattr(response, "usage_metadata", None)
+                self._record_usage(s, usage)
+                self._store(cache_key, response.content, usage)
+        return response
+
+    def stream(self, messages, use_cache=True, **kwargs):
+        cache_key = self._cache_key(messages, kwargs, use_cache)
+        with span("llm", model=self.model, stream=True) as s:
+            cached = self._cached(s, cache_key)
+            if cached is not None:
+                yield AIMessageChunk(content=cached, response_metadata={"cached": True})
+                return
+
+            for attempt in range(LLM_RATE_LIMIT_RETRIES + 1):
+                self._wait_for_slot(s)
+                started, usage, parts = False, None, []
+                try:
+                    for chunk in self.llm.stream(messages, **kwargs):
+                        if not started:
+                            s.set(first_token_ms=round(s.duration * 1000, 1))
+                        started = True
+                        parts.append(chunk.content)
+                        usage = _add_usage(usage, getattr(chunk, "usage_metadata", None))
+                        yield chunk
+                    s.set(chunks=len(parts))
+                    self._record_usage(s, usage)
+                    self._store(cache_key, "".join(p for p in parts if isinstance(p, str)), usage)
+                    return
+                except Exception as e:
+                    retry_after = _rate_limit_retry_after(e, attempt)
+                    if started or retry_after is None or attempt == LLM_RATE_LIMIT_RETRIES:
+                        raise
+                    get_limiter().penalize("groq", self.model, retry_after)
+                    s.set(rate_limited=attempt + 1)
+
+    def _call(self, s, fn):
+        for attempt in range(LLM_RATE_LIMIT_RETRIES + 1):
+            self._wait_for_slot(s)
+            try:
+                return fn()
+            except Exception as e:
+                retry_after = _rate_limit_retry_after(e, attempt)
+                if retry_after is None or attempt == LLM_RATE_LIMIT_RETRIES:
+                    raise
+                get_limiter().penalize("groq", self.model, retry_after)
+                s.set(rate_limited=attempt + 1)
+
+    def _wait_for_slot(self, s):
+        # if no slot frees up in time, send anyway; a 429 is retried
+        start = time.perf_counter()
+        get_limiter().acquire("groq", self.model, timeout=RATE_LIMIT_QUEUE_TIMEOUT)
+        waited = (time.perf_counter() - start) * 1000
+        s.set(queue_ms=round(s.attrs.get("queue_ms", 0) + waited, 1))
+
+    # ---------------------------------------------------
+    # COMPLETION CACHE
+    # ---------------------------------------------------
+    def _cache_key(self, messages, kwargs, use_cache):
+        if not LLM_CACHE_ENABLED:
+            return None
+        if not use_cache:
+            get_llm_cache().bypass()
+            count("atom_llm_cache_events_total", model=self.model, result="bypass")
+            return None
+        return completion_key(self.model, self.temperature, messages, kwargs)
+
+    def _cached(self, s, cache_key):
+        if cache_key is None:
+            return None
+        text = get_llm_cache().lookup(cache_key)
+        result = "miss" if text is None else "hit"
+        s.set(cache=result)
+        count("atom_llm_cache_events_total", model=self.model, result=result)
+        return text
+
+    def _store(self, cache_key, text, usage):
+        if cache_key is not None and text:
+            get_llm_cache().store(cache_key, self.model, text, (usage or {}).get("output_tokens"))
+
+    def _record_usage(self, s, usage):
+        if not usage:
+            return
+        s.set(input_tokens=usage.get("input_tokens"), output_tokens=usage.get("output_tokens"))
+        for kind in ("input", "output"):
+            count("atom_llm_tokens_total", usage.get(f"{kind}_tokens") or 0, model=self.model, kind=kind)
+
+    def __getattr__(self, name):
+        return getattr(self.llm, name)
+
+
+def _add_usage(total, usage):
+    if not usage:
+        return total
+    total = dict(total or {})
+    for k in ("input_tokens", "output_tokens"):
+        total[k] = total.get(k, 0) + (usage.get(k) or 0)
+    return total
+
+
+def _messages_key(messages):
+    if isinstance(messages, str):
+        return messages
+    return tuple((type(m).__name__, m.content) for m in messages)
+
+
+def _rate_limit_retry_after(error, attempt):
+    """
+    Seconds to back off if error is a 429, else None.
+    """
+    response = getattr(error, "response", None)
+    status = getattr(error, "status_code", None) or getattr(response, "status_code", None)
+    if status != 429:
+        return None
+
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return 2.0 * (attempt + 1)
 
 
 def get_llm(temperature=0.2, model="llama-3.3-70b-versatile"):
     """
-    Get LangChain ChatGroq instance
+    Get LangChain ChatGroq instance, wrapped in the shared rate limiter
+    (one shared client per model/temperature per process)
     
     Args:
         temperature (float): Response creativity (0-1)
         model (str): Groq model name
         
     Returns:
-        ChatGroq: Configured LangChain LLM instance
+        RateLimitedLLM: ChatGroq with invoke()/stream() rate limited
         
     Usage:
         llm = get_llm()
         response = llm.invoke("What is Python?")
     """
-    return ChatGroq(
-        groq_api_key=GROQ_API_KEY,
-        model=model,
-        temperature=temperature
-    )
+    return registry.get(f"llm:{model}:{temperature}", lambda: RateLimitedLLM(
+        ChatGroq(
+            groq_api_key=GROQ_API_KEY,
+            groq_api_base=GROQ_BASE_URL,
+            model=model,
+            temperature=temperature
+        ),
+        model,
+        temperature,
+    ))
 
 
-def get_llm_response(prompt, system_message=None, temperature=0.2):
+def get_llm_response(prompt, system_message=None, temperature=0.2, use_cache=True):
     """
     Get simple LLM response (no history)
     
@@ -38,6 +215,7 @@ def get_llm_response(prompt, system_message=None, temperature=0.2):
         prompt (str): User's question/input
         system_message (str, optional): System prompt to set behavior
         temperature (float): Response creativity
+        use_cache (bool): Serve/store identical prompts from the LLM cache
         
     Returns:
         str: LLM's response text
@@ -61,14 +239,15 @@ def get_llm_response(prompt, system_message=None, temperature=0.2):
         
         messages.append(HumanMessage(content=prompt))
         
-        response = llm.invoke(messages)
+        response = llm.invoke(messages, use_cache=use_cache)
         return response.content
         
     except Exception as e:
         return f"Error getting LLM response: {str(e)}"
 
 
-def get_llm_response_with_history(prompt, chat_history, system_message=None, temperature=0.2):
+def get_llm_response_with_history(prompt, chat_history, system_message=None, temperature=0.2,
+                                  use_cache=True):
     """
     Get LLM response with conversation history
     
@@ -81,6 +260,7 @@ def get_llm_response_with_history(prompt, chat_history, system_message=None, tem
             ]
         system_message (str, optional): System prompt
         temperature (float): Response creativity
+        use_cache (bool): Serve/store identical prompts from the LLM cache
         
     Returns:
         str: LLM's response text
@@ -104,8 +284,9 @@ def get_llm_response_with_history(prompt, chat_history, system_message=None, tem
         if system_message:
             messages.append(SystemMessage(content=system_message))
         
-        # Convert chat history to LangChain format
-        for msg in chat_history:
+        # Convert chat history to LangChain format (recent turns within
+        # the memory token window, not the whole session)
+        for msg in trim_history(chat_history):
             if msg["role"] == "user":
                 messages.append(HumanMessage(content=msg["content"]))
             elif msg["role"] == "assistant":
@@ -114,8 +295,44 @@ def get_llm_response_with_history(prompt, chat_history, system_message=None, tem
         # Add current prompt
         messages.append(HumanMessage(content=prompt))
         
-        response = llm.invoke(messages)
+        response = llm.invoke(messages, use_cache=use_cache)
         return response.content
         
     except Exception as e:
-        return f"Error getting LLM response: {str(e)}"
\ No newline at end of file
+        return f"Error getting LLM response: {str(e)}"
+
+
+def stream_llm_response(prompt, system_message=None, temperature=0.2, use_cache=True):
+    """
+    Streaming version of get_llm_response: yields text as it arrives
+    
+    Args:
+        prompt (str or list): User's question/input, or prepared LangChain messages
+        system_message (str, optional): System prompt to set behavior
+        temperature (float): Response creativity
+        use_cache (bool): Serve/store identical prompts from the LLM cache
+        
+    Yields:
+        str: Pieces of the LLM's response text
+        
+    Usage:
+        for token in stream_llm_response("What is a list in Python?"):
+            print(token, end="", flush=True)
+    """
+    try:
+        llm = get_llm(temperature=temperature)
+
+        if isinstance(prompt, list):
+            messages = prompt
+        else:
+            messages = []
+            if system_message:
+                messages.append(SystemMessage(content=system_message))
+            messages.append(HumanMessage(content=prompt))
+
+        for chunk in llm.stream(messages, use_cache=use_cache):
+            if chunk.content:
+                yield chunk.content
+
+    except Exception as e:
+        yield f"Error getting LLM response: {str(e)}"
@@ -0,0 +1,279 @@
+"""
+Bounded conversation memory for chat agents.
+
+The prompt gets three parts, each with a fixed cap, however long the
+session runs:
+- a rolling summary of older turns, refreshed by the LLM in the
+  background every few turns (batch priority, never blocks a reply)
+- the most recent turns that fit a token window (long answers clipped)
+- facts pulled from user turns (income, goals, tickers discussed)
+
+Usage:
+    memory = ConversationMemory(extract_facts=extract_facts)
+    prompt = memory.context() + question
+    memory.add("user", question)
+    memory.add("assistant", answer)
+"""
+
+import threading
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from src.ratelimit import request_context, PRIORITY_BATCH
+from src.tools.context_packer import estimate_tokens, CHARS_PER_TOKEN
+from src.config import (
+    MEMORY_WINDOW_TOKENS,
+    MEMORY_TURN_TOKENS,
+    MEMORY_SUMMARY_EVERY,
+    MEMORY_SUMMARY_TOKENS,
+)
+
+
+# turns awaiting summarization beyond this are dropped (summarizer down)
+MAX_PENDING_TURNS = 40
+# list-valued facts keep only the most recent items
+MAX_FACT_ITEMS = 8
+
+SUMMARY_PROMPT = """Update the running summary of a personal-finance conversation.
+Keep amounts, goals, decisions, preferences and the companies discussed.
+Drop greetings and anything already answered in full. At most {words} words.
+
+Current summary:
+{summary}
+
+New turns:
+{turns}
+
+Updated summary:"""
+
+_summary_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="memory-summary")
+
+
+class ConversationMemory:
+    """
+    summarize(previous_summary, turns_text) -> str defaults to the shared LLM.
+    extract_facts(user_text) -> dict is merged into the facts on every user turn.
+    """
+
+    def __init__(
+        self,
+        summarize=None,
+        extract_facts=None,
+        window_tokens: int = MEMORY_WINDOW_TOKENS,
+        turn_tokens: int = MEMORY_TURN_TOKENS,
+        summary_every: int = MEMORY_SUMMARY_EVERY,
+        summary_tokens: int = MEMORY_SUMMARY_TOKENS,
+    ):
+        self.summarize = summarize or llm_summarize
+        self.extract_facts = extract_facts
+        self.window_tokens = window_tokens
+        self.turn_tokens = turn_tokens
+        self.summary_every = summary_every
+        self.summary_tokens = summary_tokens
+
+        self._lock = threading.Lock()
+        self._turns = deque()       # not yet folded into the summary, oldest first
+        self._summary = ""
+        self._facts = {}
+        self._since_summary = 0
+        self._pending = None        # Future of the running summarization
+        self._stats = {"turns": 0, "summaries": 0, "summary_errors": 0, "dropped": 0}
+
+    # ---------------------------------------------------
+    # WRITE
+    # ---------------------------------------------------
+    def add(self, role: str, content: str):
+        content = content or ""
+        facts = self.extract_facts(content) if role == "user" and self.extract_facts else None
+        to_summarize = None
+
+        with self._lock:
+            self._turns.append((role, content))
+            self._stats["turns"] += 1
+            self._since_summary += 1
+            if facts:
+                self._merge_facts(facts)
+
+            while len(self._turns) > MAX_PENDING_TURNS:
+                self._turns.popleft()
+                self._stats["dropped"] += 1
+
+            if self._since_summary >= self.summary_every and self._pending is None:
+                overflow = len(self._turns) - len(self._window())
+                if overflow > 0:
+                    to_summarize = list(self._turns)[:overflow]
+                    self._since_summary = 0
+                    self._pending = True
+
+        if to_summarize:
+            self._start_summary(to_summarize)
+
+    def _merge_facts(self, facts: dict):
+        for key, value in facts.items():
+            if isinstance(value, (list, tuple)):
+                items = [v for v in self._facts.get(key, []) if v not in value] + list(value)
+                self._facts[key] = items[-MAX_FACT_ITEMS:]
+            elif value is not None:
+                self._facts[key] = value
+
+    def _start_summary(self, turns):
+        """
+        Fold turns (the oldest ones, outside the window) into the summary
+        on a background thread.
+        """
+        previous = self._summary
+        text = _format_turns(turns, self.turn_tokens)
+        ctx = contextvars.copy_context()
+
+        def run():
+            with request_context(priority=PRIORITY_BATCH):
+                return self.summarize(previous, text)
+
+        def done(future):
+            with self._lock:
+                self._pending = None
+                try:
+                    summary = future.result()
+                except Exception:
+                    # keep the turns; the next trigger retries
+                    self._stats["summary_errors"] += 1
+                    return
+                self._summary = _clip(summary.strip(), self.summary_tokens)
+                self._stats["summaries"] += 1
+                # the same tuple objects, so turns dropped or cleared meanwhile
+                # never take newer ones with them
+                folded = {id(turn) for turn in turns}
+                while self._turns and id(self._turns[0]) in folded:
+                    self._turns.popleft()
+
+        future = _summary_executor.submit(ctx.run, run)
+        future.add_done_callback(done)
+        with self._lock:
+            if not future.done():
+                self._pending = future
+
+    def wait(self, timeout: float = None):
+        """
+        Block until a running summarization has finished.
+        """
+        pending = self._pending
+        if hasattr(pending, "result"):
+            try:
+                pending.result(timeout)
+            except Exception:
+                pass
+
+    def clear(self):
+        with self._lock:
+            self._turns.clear()
+            self._summary = ""
+            self._facts = {}
+            self._since_summary = 0
+
+    # ---------------------------------------------------
+    # READ
+    # ---------------------------------------------------
+    def _window(self):
+        """
+        Newest turns that fit window_tokens (each clipped to turn_tokens),
+        oldest first. Called with the lock held.
+        """
+        window, used = [], 0
+        for role, content in reversed(self._turns):
+            text = _clip(content, self.turn_tokens)
+            tokens = estimate_tokens(text)
+            if window and used + tokens > self.window_tokens:
+                break
+            window.append((role, text))
+            used += tokens
+        window.reverse()
+        return window
+
+    def context(self) -> str:
+        """
+        Prompt block: summary, known facts and recent turns ("" if empty).
+        """
+        with self._lock:
+            summary = self._summary
+            facts = dict(self._facts)
+            window = self._window()
+
+        parts = []
+        if summary:
+            parts.append(f"Summary of earlier conversation:\n{summary}\n")
+        if facts:
+            lines = [f"- {key}: {', '.join(map(str, v)) if isinstance(v, list) else v}"
+                     for key, v in facts.items()]
+            parts.append("Known about the user:\n" + "\n".join(lines) + "\n")
+        if window:
+            parts.append("Conversation so far:\n" + _format_turns(window, self.turn_tokens))
+
+        return "\n".join(parts) + "\n" if parts else ""
+
+    @property
+    def facts(self) -> dict:
+        with self._lock:
+            return dict(self._facts)
+
+    @property
+    def summary(self) -> str:
+        return self._summary
+
+    def stats(self) -> dict:
+        with self._lock:
+            window = self._window()
+            return dict(
+                self._stats,
+                pending_turns=len(self._turns),
+                window_turns=len(window),
+                summary_tokens=estimate_tokens(self._summary) if self._summary else 0,
+                summarizing=self._pending is not None,
+            )
+
+
+# ---------------------------------------------------
+# HELPERS
+# ---------------------------------------------------
+def llm_summarize(previous: str, turns: str) -> str:
+    # imported here: src.llm uses trim_history from this module
+    from src.llm import get_llm
+
+    prompt = SUMMARY_PROMPT.format(
+        words=MEMORY_SUMMARY_TOKENS * 3 // 4,
+        summary=previous or "(none yet)",
+        turns=turns,
+    )
+    return get_llm(temperature=0).invoke(prompt).content
+
+
+def trim_history(chat_history, max_tokens: int = MEMORY_WINDOW_TOKENS,
+                 turn_tokens: int = MEMORY_TURN_TOKENS):
+    """
+    Most recent messages ({"role", "content"}) that fit max_tokens,
+    each clipped to turn_tokens, oldest first.
+    """
+    out, used = [], 0
+    for msg in reversed(chat_history or []):
+        content = _clip(msg.get("content") or "", turn_tokens)
+        tokens = estimate_tokens(content)
+        if out and used + tokens > max_tokens:
+            break
+        out.append(dict(msg, content=content))
+        used += tokens
+    out.reverse()
+    return out
+
+
+def _format_turns(turns, turn_tokens: int) -> str:
+    return "\n".join(
+        f"{'User' if role == 'user' else 'Assistant'}: {_clip(content, turn_tokens)}"
+        for role, content in turns
+    ) + "\n"
+
+
+def _clip(text: str, max_tokens: int) -> str:
+    limit = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    return text[:limit].rsplit(" ", 1)[0] + " …"
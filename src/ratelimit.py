@@ -0,0 +1,410 @@
+"""
+Rate limiting for upstream APIs (Groq, Tavily, Finnhub).
+
+- TokenBucket: N calls per period, shared by every thread in the process
+- RateLimiter: one bucket per provider (and per model), waiters served
+  by priority class, then round-robin across sessions
+- PriorityScheduler: runs queued calls concurrently as the bucket allows,
+  most important first; callers stop waiting at their own deadline
+- SingleFlight: identical in-flight calls share one upstream request
+
+The session and priority of the current request live in contextvars,
+set once per request with set_request_context().
+"""
+
+import time
+import heapq
+import itertools
+import threading
+import contextvars
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from concurrent.futures import Future
+
+from src.registry import registry
+from src.config import (
+    GROQ_REQUESTS_PER_MINUTE,
+    TAVILY_REQUESTS_PER_MINUTE,
+    FINNHUB_CALLS_PER_MINUTE,
+)
+
+
+# priorities (lower runs first)
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 10
+
+# calls per minute per provider; LLM limits apply per model
+PROVIDER_LIMITS = {
+    "groq": GROQ_REQUESTS_PER_MINUTE,
+    "tavily": TAVILY_REQUESTS_PER_MINUTE,
+    "finnhub": FINNHUB_CALLS_PER_MINUTE,
+}
+
+
+# ---------------------------------------------------
+# REQUEST CONTEXT
+# ---------------------------------------------------
+current_session = contextvars.ContextVar("ratelimit_session", default="default")
+current_priority = contextvars.ContextVar("ratelimit_priority", default=PRIORITY_INTERACTIVE)
+
+
+def set_request_context(session: str = None, priority: int = None):
+    """
+    Tag everything this thread does from now on (e.g. one Streamlit run).
+    """
+    if session is not None:
+        current_session.set(session)
+    if priority is not None:
+        current_priority.set(priority)
+
+
+@contextmanager
+def request_context(session: str = None, priority: int = None):
+    tokens = []
+    if session is not None:
+        tokens.append((current_session, current_session.set(session)))
+    if priority is not None:
+        tokens.append((current_priority, current_priority.set(priority)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+class TokenBucket:
+    """
+    capacity tokens, refilled continuously at rate tokens/second.
+
+    Usage:
+        bucket = TokenBucket.per_minute(60)
+        if bucket.acquire(timeout=5):
+            call_api()
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def per_minute(cls, calls: int, burst: int = None):
+        return cls(rate=calls / 60.0, capacity=burst or calls)
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def wait_time(self, tokens: float = 1.0) -> float:
+        """
+        Seconds until `tokens` are available (0 if available now).
+        """
+        with self._lock:
+            self._refill()
+            missing = tokens - self._tokens
+        return max(0.0, missing / self.rate) if self.rate else float("inf")
+
+    def acquire(self, tokens: float = 1.0, timeout: float = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if self.try_acquire(tokens):
+                return True
+            wait = self.wait_time(tokens)
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or wait > remaining:
+                    return False
+            time.sleep(max(wait, 0.005))
+
+    def available(self) -> float:
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    def pause(self, seconds: float):
+        """
+        Upstream said "slow down" (429): nobody gets a token for `seconds`.
+        """
+        with self._lock:
+            self._refill()
+            # next whole token becomes available exactly `seconds` from now
+            self._tokens = min(self._tokens, 1.0 - seconds * self.rate)
+
+
+def get_bucket(name: str, calls_per_minute: int) -> TokenBucket:
+    """
+    Process-wide bucket for one upstream API.
+    """
+    return registry.get(f"ratelimit:{name}", lambda: TokenBucket.per_minute(calls_per_minute))
+
+
+# ---------------------------------------------------
+# FAIR QUEUEING
+# ---------------------------------------------------
+class FairQueue:
+    """
+    Waiters for one bucket. The next token goes to the highest priority
+    class with waiters; within a class, sessions take turns, so one busy
+    session cannot starve the others.
+    """
+
+    def __init__(self, bucket: TokenBucket):
+        self.bucket = bucket
+        self._cond = threading.Condition()
+        self._classes = {}      # priority -> OrderedDict(session -> deque[ticket])
+        self.granted = 0
+        self.timeouts = 0
+
+    def _head(self):
+        for priority in sorted(self._classes):
+            sessions = self._classes[priority]
+            if sessions:
+                session, tickets = next(iter(sessions.items()))
+                return priority, session, tickets[0]
+        return None
+
+    def _remove(self, priority, session, ticket, rotate):
+        sessions = self._classes[priority]
+        tickets = sessions[session]
+        tickets.remove(ticket)
+        if not tickets:
+            del sessions[session]
+        elif rotate:
+            sessions.move_to_end(session)
+        if not sessions:
+            del self._classes[priority]
+
+    def acquire(self, session: str, priority: int, timeout: float = None) -> bool:
+        ticket = object()
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._cond:
+            sessions = self._classes.setdefault(priority, OrderedDict())
+            sessions.setdefault(session, deque()).append(ticket)
+
+            while True:
+                head = self._head()
+                if head[2] is ticket and self.bucket.try_acquire():
+                    self._remove(priority, session, ticket, rotate=True)
+                    self.granted += 1
+                    self._cond.notify_all()
+                    return True
+
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    self._remove(priority, session, ticket, rotate=False)
+                    self.timeouts += 1
+                    self._cond.notify_all()
+                    return False
+
+                wait = self.bucket.wait_time() if head[2] is ticket else 0.25
+                wait = max(wait, 0.005)
+                self._cond.wait(wait if remaining is None else min(wait, remaining))
+
+    def waiting(self) -> int:
+        with self._cond:
+            return sum(len(t) for s in self._classes.values() for t in s.values())
+
+
+class RateLimiter:
+    """
+    Shared limiter for all upstream providers.
+
+    Usage:
+        limiter = get_limiter()
+        limiter.acquire("groq", model="llama-3.3-70b-versatile")
+        ...
+        limiter.penalize("groq", model, retry_after)    # on 429
+    """
+
+    def __init__(self, limits: dict = None):
+        self.limits = dict(PROVIDER_LIMITS, **(limits or {}))
+        self._lock = threading.Lock()
+        self._queues = {}
+        self.penalties = {}
+
+    def _queue(self, provider: str, model: str = None) -> FairQueue:
+        key = f"{provider}:{model}" if model else provider
+        with self._lock:
+            queue = self._queues.get(key)
+            if queue is None:
+                bucket = get_bucket(key, self.limits[provider])
+                queue = self._queues[key] = FairQueue(bucket)
+        return queue
+
+    def acquire(self, provider: str, model: str = None, timeout: float = None) -> bool:
+        """
+        Wait for a call slot for the current session/priority.
+        False if none was granted within timeout.
+        """
+        return self._queue(provider, model).acquire(
+            current_session.get(), current_priority.get(), timeout
+        )
+
+    def penalize(self, provider: str, model: str = None, seconds: float = 1.0):
+        key = f"{provider}:{model}" if model else provider
+        self._queue(provider, model).bucket.pause(seconds)
+        with self._lock:
+            self.penalties[key] = self.penalties.get(key, 0) + 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            queues = dict(self._queues)
+            penalties = dict(self.penalties)
+        return {
+            key: {
+                "tokens": round(queue.bucket.available(), 2),
+                "waiting": queue.waiting(),
+                "granted": queue.granted,
+                "timeouts": queue.timeouts,
+                "penalties": penalties.get(key, 0),
+            }
+            for key, queue in queues.items()
+        }
+
+
+def get_limiter() -> RateLimiter:
+    return registry.get("rate_limiter", RateLimiter)
+
+
+# ---------------------------------------------------
+# SINGLE FLIGHT
+# ---------------------------------------------------
+class SingleFlight:
+    """
+    Concurrent calls with the same key share one execution of fn.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        """
+        Returns (value, shared); shared is True if another caller ran fn.
+        Exceptions are re-raised in every waiting caller.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = {"done": threading.Event()}
+
+        if not leader:
+            call["done"].wait()
+        else:
+            try:
+                call["value"] = fn()
+            except Exception as e:
+                call["error"] = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call["done"].set()
+
+        if "error" in call:
+            raise call["error"]
+        return call["value"], not leader
+
+    def in_flight(self, key) -> bool:
+        with self._lock:
+            return key in self._calls
+
+
+class PriorityScheduler:
+    """
+    Priority queue of calls drained by a small worker pool.
+
+    Whenever the bucket has a token, a worker takes the most urgent task
+    (lowest priority value, then FIFO) and runs it; the task itself spends
+    the token (e.g. inside finnhub_get). Tasks whose future was cancelled
+    or whose deadline passed are dropped without running.
+    """
+
+    def __init__(self, bucket: TokenBucket, workers: int = 8):
+        self.bucket = bucket
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+        for i in range(workers):
+            threading.Thread(target=self._worker, name=f"scheduler-{i}", daemon=True).start()
+
+    def submit(self, fn, priority: int = 0, deadline: float = None) -> Future:
+        """
+        deadline is a time.monotonic() timestamp after which fn is skipped.
+        """
+        future = Future()
+        fn = _in_context(contextvars.copy_context(), fn)
+        with self._cond:
+            heapq.heappush(self._heap, (priority, next(self._seq), fn, future, deadline))
+            self._cond.notify()
+        return future
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._heap)
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+
+            # pick the task only once there is budget, so a later but more
+            # urgent submission still goes first
+            wait = self.bucket.wait_time()
+            if wait > 0:
+                time.sleep(min(wait, 0.25))
+                self._drop_expired()
+                continue
+
+            with self._cond:
+                if not self._heap:
+                    continue
+                _, _, fn, future, deadline = heapq.heappop(self._heap)
+
+            if deadline is not None and time.monotonic() >= deadline:
+                future.cancel()
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                future.set_result(fn())
+            except Exception as e:
+                future.set_exception(e)
+
+    def _drop_expired(self):
+        now = time.monotonic()
+        with self._cond:
+            expired = [t for t in self._heap if t[4] is not None and t[4] <= now]
+            if expired:
+                self._heap = [t for t in self._heap if not (t[4] is not None and t[4] <= now)]
+                heapq.heapify(self._heap)
+        for task in expired:
+            task[3].cancel()
+
+
+def _in_context(ctx, fn):
+    return lambda: ctx.run(fn)
+
+
+def get_scheduler(name: str, calls_per_minute: int, workers: int = 8) -> PriorityScheduler:
+    """
+    Process-wide scheduler draining the bucket of the same name.
+    """
+    return registry.get(
+        f"scheduler:{name}",
+        lambda: PriorityScheduler(get_bucket(name, calls_per_minute), workers=workers),
+    )
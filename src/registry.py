@@ -0,0 +1,71 @@
+"""
+Process-wide registry for heavy shared resources
+(embedding model, vector index, LLM clients).
+
+Each resource is built once per process and shared by every
+Streamlit session and request. Access is thread-safe.
+"""
+
+import threading
+
+
+class ResourceRegistry:
+    """
+    name -> shared object, built lazily from a factory.
+
+    Usage:
+        llm = registry.get("llm:llama", lambda: ChatGroq(...))
+        index = registry.get("vector_store", load_faiss_index)
+        registry.reload("vector_store")     # rebuild with the same factory
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._build_locks = {}
+
+    def get(self, name: str, factory):
+        entry = self._entries.get(name)
+        if entry is not None:
+            return entry["value"]
+
+        with self._lock:
+            build_lock = self._build_locks.setdefault(name, threading.Lock())
+
+        # only one thread builds a given resource; others wait for it
+        with build_lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                entry = {"value": factory(), "factory": factory}
+                with self._lock:
+                    self._entries[name] = entry
+
+        return entry["value"]
+
+    def put(self, name: str, value, factory=None):
+        """
+        Atomically replace a resource (e.g. after re-indexing).
+        Holders of the old object keep using it until they re-fetch.
+        """
+        with self._lock:
+            old = self._entries.get(name)
+            self._entries[name] = {
+                "value": value,
+                "factory": factory or (old["factory"] if old else None),
+            }
+
+    def reload(self, name: str):
+        entry = self._entries.get(name)
+        if entry is None or entry["factory"] is None:
+            return None
+
+        value = entry["factory"]()
+        self.put(name, value)
+        return value
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {name: type(e["value"]).__name__ for name, e in self._entries.items()}
+
+
+registry = ResourceRegistry()
@@ -0,0 +1,224 @@
+# src/tools/answer_cache.py
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Optional
+
+import numpy as np
+
+from src.registry import registry
+from src.config import (
+    ANSWER_CACHE_THRESHOLD,
+    ANSWER_CACHE_TTL_SECONDS,
+    ANSWER_CACHE_MAX_ENTRIES,
+)
+
+
+ANSWER_CACHE_PATH = "data/cache/answer_cache.sqlite"
+
+
+class SemanticAnswerCache:
+    """
+    Answer cache in front of StockMarketRAGAgent.ask, keyed on the query
+    embedding.
+
+    A lookup hits when cosine similarity >= threshold and the entry has
+    the same answer_style and index version. Entries expire after a TTL,
+    are evicted LRU beyond max_entries, persist in SQLite and are dropped
+    as soon as a different index version is seen.
+    """
+
+    def __init__(
+        self,
+        path: str = ANSWER_CACHE_PATH,
+        threshold: float = ANSWER_CACHE_THRESHOLD,
+        ttl_seconds: float = ANSWER_CACHE_TTL_SECONDS,
+        max_entries: int = ANSWER_CACHE_MAX_ENTRIES,
+    ):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS answers (
+                id INTEGER PRIMARY KEY,
+                query TEXT NOT NULL,
+                style TEXT NOT NULL,
+                index_version INTEGER NOT NULL,
+                embedding BLOB NOT NULL,
+                answer TEXT NOT NULL,
+                sources TEXT NOT NULL,
+                latency_s REAL NOT NULL,
+                created REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS answers_created ON answers (created)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS answers_last_used ON answers (last_used)")
+        self._conn.commit()
+
+        self._hits = 0
+        self._misses = 0
+        self._latency_saved = 0.0
+        self._load()
+
+    def _load(self):
+        rows = self._conn.execute(
+            "SELECT id, style, index_version, embedding, created FROM answers"
+        ).fetchall()
+        self._ids = [r[0] for r in rows]
+        self._keys = [(r[1], r[2]) for r in rows]
+        self._created = [r[4] for r in rows]
+        self._row_of = {entry_id: row for row, entry_id in enumerate(self._ids)}
+        self._versions = {version for _, version in self._keys}
+        # rows [0, len(self._ids)) are live; the rest is spare capacity
+        self._matrix = (
+            np.vstack([np.frombuffer(r[3], dtype=np.float32) for r in rows])
+            if rows else None
+        )
+
+    def _append(self, entry_id: int, key, created: float, vector):
+        size = len(self._ids)
+        if self._matrix is None:
+            self._matrix = np.empty((64, len(vector)), dtype=np.float32)
+        elif size == len(self._matrix):
+            grown = np.empty((2 * size, self._matrix.shape[1]), dtype=np.float32)
+            grown[:size] = self._matrix
+            self._matrix = grown
+
+        self._matrix[size] = vector
+        self._ids.append(entry_id)
+        self._keys.append(key)
+        self._created.append(created)
+        self._row_of[entry_id] = size
+        self._versions.add(key[1])
+
+    def _remove(self, entry_ids):
+        # move the last row into each freed one: O(1) per entry
+        for entry_id in entry_ids:
+            row = self._row_of.pop(entry_id, None)
+            if row is None:
+                continue
+            last = len(self._ids) - 1
+            if row != last:
+                self._matrix[row] = self._matrix[last]
+                self._ids[row] = self._ids[last]
+                self._keys[row] = self._keys[last]
+                self._created[row] = self._created[last]
+                self._row_of[self._ids[row]] = row
+            self._ids.pop()
+            self._keys.pop()
+            self._created.pop()
+
+    # ---------------------------------------------------
+    # PUBLIC API
+    # ---------------------------------------------------
+    def lookup(self, query_vector, style: str, index_version: int) -> Optional[dict]:
+        vector = _normalize(query_vector)
+        now = time.time()
+
+        with self._lock:
+            self._invalidate(index_version)
+
+            best_row, best_sim = None, -1.0
+            if self._ids:
+                sims = self._matrix[:len(self._ids)] @ vector
+                for row in np.argsort(-sims):
+                    if sims[row] < self.threshold:
+                        break
+                    if self._keys[row] != (style, index_version):
+                        continue
+                    if now - self._created[row] > self.ttl_seconds:
+                        continue
+                    best_row, best_sim = row, float(sims[row])
+                    break
+
+            if best_row is None:
+                self._misses += 1
+                return None
+
+            entry_id = self._ids[best_row]
+            answer, sources, latency = self._conn.execute(
+                "SELECT answer, sources, latency_s FROM answers WHERE id = ?", (entry_id,)
+            ).fetchone()
+            self._conn.execute("UPDATE answers SET last_used = ? WHERE id = ?", (now, entry_id))
+            self._conn.commit()
+
+            self._hits += 1
+            self._latency_saved += latency
+
+        return {
+            "answer": answer,
+            "sources": json.loads(sources),
+            "similarity": round(best_sim, 4),
+        }
+
+    def store(self, query: str, query_vector, style: str, index_version: int,
+              answer: str, sources, latency_s: float):
+        vector = _normalize(query_vector)
+        now = time.time()
+
+        with self._lock:
+            self._invalidate(index_version)
+            cursor = self._conn.execute("""
+                INSERT INTO answers (query, style, index_version, embedding, answer,
+                                     sources, latency_s, created, last_used)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (query, style, index_version, vector.tobytes(), answer,
+                  json.dumps(sources), latency_s, now, now))
+            self._append(cursor.lastrowid, (style, index_version), now, vector)
+            self._remove(self._evict(now))
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        total = self._hits + self._misses
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / total, 3) if total else None,
+            "latency_saved_s": round(self._latency_saved, 2),
+            "entries": len(self._ids),
+        }
+
+    # ---------------------------------------------------
+    # EVICTION / INVALIDATION (caller holds the lock)
+    # ---------------------------------------------------
+    def _invalidate(self, index_version: int):
+        if self._versions - {index_version}:
+            self._conn.execute("DELETE FROM answers WHERE index_version != ?", (index_version,))
+            self._conn.commit()
+            self._load()
+
+    def _evict(self, now: float) -> list:
+        """
+        Delete expired entries and the least recently used beyond
+        max_entries; returns their ids.
+        """
+        doomed = [r[0] for r in self._conn.execute(
+            "SELECT id FROM answers WHERE created < ?", (now - self.ttl_seconds,)
+        )]
+        excess = len(self._ids) - len(doomed) - self.max_entries
+        if excess > 0:
+            doomed += [r[0] for r in self._conn.execute(
+                "SELECT id FROM answers WHERE created >= ? ORDER BY last_used LIMIT ?",
+                (now - self.ttl_seconds, excess),
+            )]
+        self._conn.executemany("DELETE FROM answers WHERE id = ?", [(i,) for i in doomed])
+        return doomed
+
+
+def _normalize(vector) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def get_answer_cache() -> SemanticAnswerCache:
+    return registry.get("answer_cache", SemanticAnswerCache)
@@ -1,11 +1,20 @@
-def budget_plan(income: float, fixed: float, variable: float):
+from src.tools.projection import project_savings
+
+
+def budget_plan(income: float, fixed: float, variable: float, projection_months: int = 0):
     savings = income - (fixed + variable)
     savings_rate = (savings / income) * 100 if income else 0
 
-    return {
+    plan = {
         "income": income,
         "fixed_costs": fixed,
         "variable_costs": variable,
         "savings_possible": savings,
         "savings_rate_percent": round(savings_rate, 2),
     }
+
+    # what the monthly savings could grow to in an equity SIP
+    if projection_months and savings > 0:
+        plan["savings_projection"] = project_savings(savings, projection_months, instrument="sip")
+
+    return plan
@@ -0,0 +1,258 @@
+# src/tools/cache.py
+
+import os
+import json
+import time
+import sqlite3
+import threading
+import functools
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from src.registry import registry
+from src.ratelimit import SingleFlight
+from src.tracing import annotate, count
+from src.config import (
+    TOOL_CACHE_BACKEND,
+    QUOTE_CACHE_TTL,
+    NEWS_CACHE_TTL,
+    SYMBOL_CACHE_TTL,
+)
+
+
+TOOL_CACHE_PATH = "data/cache/tool_cache.sqlite"
+MAX_MEMORY_ENTRIES = 10000
+# the SQLite backend drops expired / excess rows once every this many writes
+PURGE_EVERY = 256
+
+# namespace -> (ttl seconds, extra seconds a stale value may still be served)
+NAMESPACES = {
+    "quote": (QUOTE_CACHE_TTL, 4 * QUOTE_CACHE_TTL),
+    "news": (NEWS_CACHE_TTL, 3 * NEWS_CACHE_TTL),
+    "symbol": (SYMBOL_CACHE_TTL, 4 * SYMBOL_CACHE_TTL),
+}
+
+_refresh_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="cache-refresh")
+
+
+# ---------------------------------------------------
+# BACKENDS: get(key) -> (value, stored_at) | None, set(key, value, stored_at)
+# ---------------------------------------------------
+class MemoryBackend:
+    def __init__(self, max_entries: int = MAX_MEMORY_ENTRIES):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+            return entry
+
+    def set(self, key, value, stored_at):
+        with self._lock:
+            self._data[key] = (value, stored_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class SQLiteBackend:
+    """
+    On-disk backend so several worker processes share one cache.
+    Values must be JSON-serialisable (all tool results are).
+    Every PURGE_EVERY writes, rows past their namespace's ttl + stale
+    window are deleted and the oldest beyond max_entries are evicted.
+    """
+
+    def __init__(self, path: str = TOOL_CACHE_PATH, max_entries: int = MAX_MEMORY_ENTRIES):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.max_entries = max_entries
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS tool_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                stored_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS tool_cache_stored_at ON tool_cache (stored_at)"
+        )
+        self._conn.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, stored_at FROM tool_cache WHERE key = ?", (key,)
+            ).fetchone()
+        return (json.loads(row[0]), row[1]) if row else None
+
+    def set(self, key, value, stored_at):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tool_cache (key, value, stored_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), stored_at),
+            )
+            self._writes += 1
+            if self._writes % PURGE_EVERY == 0:
+                self._purge(time.time())
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM tool_cache")
+            self._conn.commit()
+
+    def _purge(self, now: float):
+        # caller holds the lock
+        for namespace, (ttl, stale_window) in NAMESPACES.items():
+            self._conn.execute(
+                "DELETE FROM tool_cache WHERE key LIKE ? AND stored_at < ?",
+                (f"{namespace}:%", now - ttl - stale_window),
+            )
+        self._conn.execute("""
+            DELETE FROM tool_cache WHERE key IN (
+                SELECT key FROM tool_cache ORDER BY stored_at DESC LIMIT -1 OFFSET ?
+            )
+        """, (self.max_entries,))
+
+
+# ---------------------------------------------------
+# TTL CACHE
+# ---------------------------------------------------
+class ToolCache:
+    """
+    TTL cache for tool results with stale-while-revalidate.
+
+    - fresh (age < ttl): served from cache
+    - stale (age < ttl + stale window): served from cache while one
+      background refresh fetches the new value
+    - miss / expired: fetched; concurrent misses for the same key wait
+      for a single upstream call
+    Error results ({"error": True, ...}) and exceptions are never cached.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend or _make_backend(TOOL_CACHE_BACKEND)
+        self._flight = SingleFlight()
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def get_or_fetch(self, namespace: str, key: str, fetch):
+        ttl, stale_window = NAMESPACES[namespace]
+        full_key = f"{namespace}:{key}"
+        entry = self.backend.get(full_key)
+
+        if entry is not None:
+            value, stored_at = entry
+            age = time.time() - stored_at
+            if age < ttl:
+                self._count(namespace, "hits")
+                return value
+            if age < ttl + stale_window:
+                self._count(namespace, "stale_hits")
+                self._refresh_in_background(namespace, full_key, fetch)
+                return value
+
+        self._count(namespace, "misses")
+        value, shared = self._flight.do(full_key, lambda: self._fetch(namespace, full_key, fetch))
+        if shared:
+            self._count(namespace, "coalesced")
+        return value
+
+    def peek(self, namespace: str, key: str):
+        """
+        Fresh cached value or None; never fetches.
+        """
+        ttl, _ = NAMESPACES[namespace]
+        entry = self.backend.get(f"{namespace}:{key}")
+        if entry is not None and time.time() - entry[1] < ttl:
+            self._count(namespace, "hits")
+            return entry[0]
+        return None
+
+    def _fetch(self, namespace, full_key, fetch):
+        value = fetch()
+        if _cacheable(value):
+            self.backend.set(full_key, value, time.time())
+        else:
+            self._count(namespace, "uncached_errors")
+        return value
+
+    def _refresh_in_background(self, namespace, full_key, fetch):
+        if self._flight.in_flight(full_key):
+            return
+        self._count(namespace, "refreshes")
+
+        def refresh():
+            try:
+                self._flight.do(full_key, lambda: self._fetch(namespace, full_key, fetch))
+            except Exception:
+                # keep serving the stale value; the next stale hit retries
+                self._count(namespace, "refresh_errors")
+
+        _refresh_executor.submit(refresh)
+
+    # ---------------------------------------------------
+    # STATS
+    # ---------------------------------------------------
+    def _count(self, namespace, name):
+        if name in ("hits", "stale_hits", "misses"):
+            annotate(**{f"cache_{namespace}": name})
+            count("atom_tool_cache_events_total", cache=namespace, result=name)
+        with self._lock:
+            counters = self._stats.setdefault(namespace, {})
+            counters[name] = counters.get(name, 0) + 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {ns: dict(counters) for ns, counters in self._stats.items()}
+
+    def clear(self):
+        self.backend.clear()
+
+
+def _cacheable(value) -> bool:
+    return not (isinstance(value, dict) and value.get("error"))
+
+
+def _make_backend(name: str):
+    if name == "sqlite":
+        return SQLiteBackend()
+    return MemoryBackend()
+
+
+def get_tool_cache() -> ToolCache:
+    return registry.get("tool_cache", ToolCache)
+
+
+def cached(namespace: str, key=None):
+    """
+    Decorator: cache a tool function's results under namespace.
+    key(*args, **kwargs) -> str builds the cache key (default: the arguments).
+
+        @cached("quote", key=lambda symbol: symbol.upper())
+        def get_stock_price(symbol): ...
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            cache_key = key(*args, **kwargs) if key else json.dumps([args, kwargs], default=str)
+            return get_tool_cache().get_or_fetch(
+                namespace, cache_key, lambda: fn(*args, **kwargs)
+            )
+
+        wrapper.uncached = fn
+        return wrapper
+
+    return decorator
@@ -0,0 +1,224 @@
+# src/tools/chunk_store.py
+
+import json
+import zlib
+import sqlite3
+import threading
+from collections.abc import Mapping
+from typing import Dict, List
+
+from langchain_core.documents import Document
+from langchain_community.docstore.base import Docstore, AddableMixin
+
+from src.tools.sparse_index import SparseIndex
+
+
+class SQLiteDocstore(Docstore, AddableMixin):
+    """
+    On-disk chunk store for the FAISS index (replaces the pickled index.pkl).
+
+    - chunks: id -> zlib-compressed text + JSON metadata, fetched by ID
+    - vector_ids: FAISS row -> chunk id, one set of rows per saved index version
+    - sparse: BM25 inverted index over the same chunks, kept in sync on add/delete
+
+    Rows removed from the index are only garbage-collected on the next
+    ingestion, so sessions still searching the previous version never miss.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS chunks (
+                id TEXT PRIMARY KEY,
+                text BLOB NOT NULL,
+                metadata TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS vector_ids (
+                version INTEGER NOT NULL,
+                pos INTEGER NOT NULL,
+                chunk_id TEXT NOT NULL,
+                PRIMARY KEY (version, pos)
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+        """)
+        self._conn.commit()
+        self.sparse = SparseIndex(self._conn, self._lock)
+
+    # ---------------------------------------------------
+    # DOCSTORE INTERFACE (used by LangChain FAISS)
+    # ---------------------------------------------------
+    def search(self, search: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text, metadata FROM chunks WHERE id = ?", (search,)
+            ).fetchone()
+
+        if row is None:
+            return f"ID {search} not found."
+        return self._to_document(search, row)
+
+    def add(self, texts: Dict[str, Document]) -> None:
+        rows = [
+            (id_, zlib.compress(doc.page_content.encode("utf-8")), json.dumps(doc.metadata))
+            for id_, doc in texts.items()
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO chunks (id, text, metadata) VALUES (?, ?, ?)", rows
+            )
+            self.sparse.add([(id_, doc.page_content) for id_, doc in texts.items()])
+            self._conn.commit()
+
+    def delete(self, ids: List) -> None:
+        # rows are dropped later by collect_garbage(); only hide them from BM25
+        with self._lock:
+            self.sparse.delete(ids)
+            self._conn.commit()
+
+    def get_many(self, ids: List[str]) -> List[Document]:
+        """
+        Fetch several chunks in one query, preserving order.
+        """
+        if not ids:
+            return []
+
+        placeholders = ",".join("?" * len(ids))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, text, metadata FROM chunks WHERE id IN ({placeholders})", list(ids)
+            ).fetchall()
+
+        found = {r[0]: self._to_document(r[0], r[1:]) for r in rows}
+        return [found[i] for i in ids if i in found]
+
+    @staticmethod
+    def _to_document(id_, row) -> Document:
+        text, metadata = row
+        return Document(
+            id=id_,
+            page_content=zlib.decompress(text).decode("utf-8"),
+            metadata=json.loads(metadata),
+        )
+
+    # ---------------------------------------------------
+    # VECTOR ID MAP
+    # ---------------------------------------------------
+    def current_version(self) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM meta WHERE key = 'version'"
+            ).fetchone()
+        return int(row[0]) if row else 0
+
+    def save_id_map(self, index_to_docstore_id) -> int:
+        """
+        Store the FAISS row -> chunk id map as a new version.
+        The previous version is kept for readers still using it.
+        """
+        version = self.current_version() + 1
+        rows = ((version, pos, id_) for pos, id_ in index_to_docstore_id.items())
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO vector_ids (version, pos, chunk_id) VALUES (?, ?, ?)", rows
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (str(version),)
+            )
+            self._conn.execute("DELETE FROM vector_ids WHERE version < ?", (version - 1,))
+            self._conn.commit()
+
+        return version
+
+    def id_map(self, version: int = None) -> "SQLiteIdMap":
+        return SQLiteIdMap(self, version or self.current_version())
+
+    def collect_garbage(self) -> int:
+        """
+        Drop older id-map versions and chunks no longer referenced.
+        Call before mutating the index, not while old readers are live.
+        """
+        version = self.current_version()
+        with self._lock:
+            self._conn.execute("DELETE FROM vector_ids WHERE version < ?", (version,))
+            removed = self._conn.execute("""
+                DELETE FROM chunks WHERE id NOT IN (
+                    SELECT chunk_id FROM vector_ids WHERE version = ?
+                )
+            """, (version,)).rowcount
+            self.sparse.compact()
+            self._conn.commit()
+        return removed
+
+    def rebuild_sparse(self):
+        """
+        Build the BM25 index for chunks stored before it existed.
+        """
+        version = self.current_version()
+        with self._lock:
+            self.sparse.clear()
+            rows = self._conn.execute("""
+                SELECT id, text FROM chunks WHERE id IN (
+                    SELECT chunk_id FROM vector_ids WHERE version = ?
+                )
+            """, (version,)).fetchall()
+            self.sparse.add([(id_, zlib.decompress(text).decode("utf-8")) for id_, text in rows])
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.executescript("""
+                DELETE FROM chunks;
+                DELETE FROM vector_ids;
+                DELETE FROM meta;
+            """)
+            self.sparse.clear()
+            self._conn.commit()
+
+
+class SQLiteIdMap(Mapping):
+    """
+    Read-only FAISS row -> chunk id mapping, looked up on demand.
+    Only the k rows a query hits are ever read.
+    """
+
+    def __init__(self, store: SQLiteDocstore, version: int):
+        self.store = store
+        self.version = version
+
+    def __getitem__(self, pos):
+        with self.store._lock:
+            row = self.store._conn.execute(
+                "SELECT chunk_id FROM vector_ids WHERE version = ? AND pos = ?",
+                (self.version, int(pos)),
+            ).fetchone()
+        if row is None:
+            raise KeyError(pos)
+        return row[0]
+
+    def __len__(self):
+        with self.store._lock:
+            return self.store._conn.execute(
+                "SELECT COUNT(*) FROM vector_ids WHERE version = ?", (self.version,)
+            ).fetchone()[0]
+
+    def __iter__(self):
+        for pos, _ in self.items():
+            yield pos
+
+    def items(self):
+        with self.store._lock:
+            rows = self.store._conn.execute(
+                "SELECT pos, chunk_id FROM vector_ids WHERE version = ? ORDER BY pos",
+                (self.version,),
+            ).fetchall()
+        return rows
+
+    def values(self):
+        return [chunk_id for _, chunk_id in self.items()]
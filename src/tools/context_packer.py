@@ -0,0 +1,197 @@
+# src/tools/context_packer.py
+
+import os
+import re
+from typing import Dict, List
+
+from src.config import CONTEXT_MMR_LAMBDA
+
+
+# rough size of one token in characters (English prose, Llama tokenizer)
+CHARS_PER_TOKEN = 4
+# chunks overlap by ~150 characters; shorter matches are coincidences
+MIN_OVERLAP_CHARS = 20
+# passages this similar to an already chosen one are dropped outright
+DUPLICATE_SIMILARITY = 0.8
+SHINGLE_SIZE = 3
+
+_WORD = re.compile(r"\w+")
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def pack_context(docs, token_budget: int, mmr_lambda: float = CONTEXT_MMR_LAMBDA) -> Dict:
+    """
+    Turn ranked retrieval hits into prompt passages that fit token_budget.
+
+    1. adjacent chunks of the same page are merged, with the text they
+       share through the splitter's chunk_overlap kept once
+    2. passages are picked by MMR (rank relevance vs. word-shingle
+       similarity to passages already picked); near-duplicates are dropped
+    3. passages are added in that order while they fit the budget; the
+       top passage is truncated rather than dropped
+
+    Returns {"passages": [{"source", "page", "text", "ids", "tokens"}],
+             "tokens": int, "stats": {...}}
+    """
+    passages = _merge_adjacent(docs)
+    merged = sum(len(p["ids"]) - 1 for p in passages)
+    selected, duplicates = _mmr(passages, mmr_lambda)
+
+    packed, used, skipped = [], 0, 0
+    for passage in selected:
+        tokens = estimate_tokens(passage["text"])
+        if used + tokens > token_budget:
+            if packed:
+                skipped += 1
+                continue
+            passage = dict(passage, text=_truncate(passage["text"], token_budget))
+            tokens = estimate_tokens(passage["text"])
+        packed.append({
+            "source": passage["source"],
+            "page": passage["page"],
+            "text": passage["text"],
+            "ids": passage["ids"],
+            "tokens": tokens,
+        })
+        used += tokens
+
+    return {
+        "passages": packed,
+        "tokens": used,
+        "stats": {
+            "candidates": len(docs),
+            "merged": merged,
+            "duplicates": duplicates,
+            "over_budget": skipped,
+            "passages": len(packed),
+            "raw_tokens": sum(estimate_tokens(d.page_content) for d in docs),
+        },
+    }
+
+
+# ---------------------------------------------------
+# MERGE ADJACENT CHUNKS
+# ---------------------------------------------------
+def _merge_adjacent(docs) -> List[Dict]:
+    """
+    Group hits by (source, page) and join runs of consecutive chunks.
+    A passage keeps the best (lowest) rank of its chunks.
+    """
+    groups, seen = {}, set()
+    for rank, doc in enumerate(docs):
+        if doc.id is not None and doc.id in seen:
+            continue
+        seen.add(doc.id)
+        key = (
+            os.path.basename(doc.metadata.get("source", "Unknown")),
+            doc.metadata.get("page", "N/A"),
+        )
+        groups.setdefault(key, []).append((_chunk_number(doc, rank), rank, doc))
+
+    passages = []
+    for (source, page), members in groups.items():
+        members.sort(key=lambda m: m[0])
+        run = None
+        for number, rank, doc in members:
+            text = doc.page_content.strip()
+            if run is not None and number == run["last"] + 1:
+                run["text"] = _join_overlapping(run["text"], text)
+                run["ids"].append(doc.id)
+                run["rank"] = min(run["rank"], rank)
+                run["last"] = number
+                continue
+            if run is not None:
+                passages.append(run)
+            run = {"source": source, "page": page, "text": text,
+                   "ids": [doc.id], "rank": rank, "last": number}
+        passages.append(run)
+
+    passages.sort(key=lambda p: p["rank"])
+    return passages
+
+
+def _chunk_number(doc, fallback: int) -> int:
+    """
+    Chunk IDs are "<file version prefix>:<n>" (see vector_store.chunk_id).
+    Unknown formats never count as adjacent.
+    """
+    _, _, n = str(doc.id or "").rpartition(":")
+    return int(n) if n.isdigit() else -10 * (fallback + 1)
+
+
+def _join_overlapping(left: str, right: str) -> str:
+    """
+    left + right, without the text the splitter repeated in both.
+    """
+    if right in left:
+        return left
+    longest = min(len(left), len(right))
+    for size in range(longest, MIN_OVERLAP_CHARS - 1, -1):
+        if left.endswith(right[:size]):
+            return left + right[size:]
+    return left + "\n" + right
+
+
+# ---------------------------------------------------
+# MMR
+# ---------------------------------------------------
+def _mmr(passages, mmr_lambda: float):
+    """
+    Greedy maximal marginal relevance over rank-based relevance.
+    Returns (passages in pick order, number of near-duplicates dropped).
+    """
+    n = len(passages)
+    shingles = [_shingles(p["text"]) for p in passages]
+    relevance = [1.0 - i / max(n, 1) for i in range(n)]
+
+    remaining = list(range(n))
+    picked, duplicates = [], 0
+    while remaining:
+        best, best_score, best_sim = None, None, 0.0
+        for i in remaining:
+            sim = max((_jaccard(shingles[i], shingles[j]) for j in picked), default=0.0)
+            score = mmr_lambda * relevance[i] - (1 - mmr_lambda) * sim
+            if best_score is None or score > best_score:
+                best, best_score, best_sim = i, score, sim
+        remaining.remove(best)
+        if best_sim >= DUPLICATE_SIMILARITY or _contained(passages[best], [passages[j] for j in picked]):
+            duplicates += 1
+            continue
+        picked.append(best)
+
+    return [passages[i] for i in picked], duplicates
+
+
+def _shingles(text: str) -> set:
+    words = _WORD.findall(text.lower())
+    if len(words) < SHINGLE_SIZE:
+        return {tuple(words)}
+    return {tuple(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def _jaccard(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _contained(passage, others) -> bool:
+    text = passage["text"]
+    return any(text in other["text"] for other in others)
+
+
+def _truncate(text: str, token_budget: int) -> str:
+    """
+    Cut to the budget at the last sentence (or word) boundary.
+    """
+    limit = max(0, (token_budget - 1) * CHARS_PER_TOKEN)
+    if len(text) <= limit:
+        return text
+    cut = text[:limit]
+    end = max(cut.rfind(". "), cut.rfind(".\n"))
+    if end > limit // 2:
+        return cut[:end + 1]
+    return cut.rsplit(" ", 1)[0]
@@ -1,10 +1,298 @@
+import os
+import json
+import time
+import atexit
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
 from langchain_community.embeddings import HuggingFaceEmbeddings
 
+from src.registry import registry
+
+
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+EMBEDDING_CACHE_PATH = "data/embedding_cache"
+EMBEDDING_CACHE_MAX_ROWS = 200_000
+ENCODE_BATCH_SIZE = 512
+
+# slot index writes are batched: after this many changed entries or seconds
+INDEX_FLUSH_EVERY = 10_000
+INDEX_FLUSH_SECONDS = 30.0
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper with a persistent, size-capped vector cache.
+
+    Vectors live in a memory-mapped float32 matrix (vectors.f32) and a
+    SQLite table (index.sqlite) maps hash(model + text) -> row, with a
+    last-used counter for LRU order. Only changed index entries are
+    written, once enough have piled up, after INDEX_FLUSH_SECONDS, on
+    flush() (end of an ingest) and at exit.
+    Only texts that are not cached are sent to the model, in large
+    batches, outside the lock. Query embeddings are not cached.
+    """
+
+    def __init__(
+        self,
+        base_factory,
+        model_name: str,
+        cache_dir: str = EMBEDDING_CACHE_PATH,
+        max_rows: int = EMBEDDING_CACHE_MAX_ROWS,
+        batch_size: int = ENCODE_BATCH_SIZE,
+    ):
+        self._base_factory = base_factory
+        self._base = None
+        self.model_name = model_name
+        self.cache_dir = cache_dir
+        self.max_rows = max_rows
+        self.batch_size = batch_size
+
+        self._lock = threading.Lock()
+        self._base_lock = threading.Lock()
+        self._vectors_path = os.path.join(cache_dir, "vectors.f32")
+        self._index_path = os.path.join(cache_dir, "index.sqlite")
+        self._dim = None
+        self._rows = 0
+        self._vectors = None
+        self._slots = OrderedDict()     # key -> slot, least recently used first
+        self._tick = 0                  # last-used counter
+        self._dirty = {}                # key -> (slot, tick) not yet written
+        self._flushed_at = time.monotonic()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._conn = sqlite3.connect(self._index_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS slots (
+                key TEXT PRIMARY KEY,
+                slot INTEGER NOT NULL,
+                used INTEGER NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+        self._load_index()
+        atexit.register(self.flush)
+
+    # ---------------------------------------------------
+    # EMBEDDINGS INTERFACE
+    # ---------------------------------------------------
+    @property
+    def base(self):
+        # the model is only loaded when something actually needs encoding
+        if self._base is None:
+            with self._base_lock:
+                if self._base is None:
+                    self._base = self._base_factory()
+        return self._base
+
+    def embed_query(self, text: str):
+        return self.base.embed_query(text)
+
+    def embed_queries(self, texts):
+        """
+        Many queries in one encoder call (not cached, like embed_query).
+        """
+        return self.base.embed_documents(list(texts))
+
+    def embed_documents(self, texts):
+        result = [None] * len(texts)
+        missing = OrderedDict()
+
+        with self._lock:
+            for i, text in enumerate(texts):
+                key = self._key(text)
+                slot = self._slots.get(key)
+                if slot is not None:
+                    self._touch(key, slot)
+                    result[i] = np.array(self._vectors[slot])
+                    self._hits += 1
+                else:
+                    missing.setdefault(key, (text, []))[1].append(i)
+                    self._misses += 1
+
+        # encode without the lock; it is only taken again to claim slots
+        items = list(missing.items())
+        for start in range(0, len(items), self.batch_size):
+            batch = items[start:start + self.batch_size]
+            vectors = self.base.embed_documents([text for _, (text, _) in batch])
+            vectors = [np.asarray(v, dtype=np.float32) for v in vectors]
+
+            with self._lock:
+                self._store_batch([key for key, _ in batch], vectors)
+                for (_, (_, positions)), vector in zip(batch, vectors):
+                    for i in positions:
+                        result[i] = vector
+
+        with self._lock:
+            if (len(self._dirty) >= INDEX_FLUSH_EVERY
+                    or time.monotonic() - self._flushed_at >= INDEX_FLUSH_SECONDS):
+                self._flush()
+
+        return [v.tolist() for v in result]
+
+    def flush(self):
+        """
+        Write pending index changes (and vectors) to disk.
+        """
+        with self._lock:
+            self._flush()
+
+    def stats(self) -> dict:
+        total = self._hits + self._misses
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / total, 3) if total else None,
+            "evictions": self._evictions,
+            "cached_vectors": len(self._slots),
+        }
+
+    # ---------------------------------------------------
+    # STORAGE
+    # ---------------------------------------------------
+    def _key(self, text: str) -> str:
+        return hashlib.sha1(f"{self.model_name}\0{text}".encode("utf-8")).hexdigest()
+
+    def _load_index(self):
+        meta = dict(self._conn.execute("SELECT name, value FROM meta"))
+        if not meta:
+            self._import_json_index()
+            meta = dict(self._conn.execute("SELECT name, value FROM meta"))
+
+        if meta.get("model") != self.model_name or not os.path.exists(self._vectors_path):
+            # different model (or vectors gone): start over
+            self._conn.execute("DELETE FROM slots")
+            self._conn.execute("DELETE FROM meta")
+            self._conn.commit()
+            return
+
+        self._dim = int(meta["dim"])
+        self._rows = int(meta["rows"])
+        rows = self._conn.execute("SELECT key, slot, used FROM slots ORDER BY used").fetchall()
+        self._slots = OrderedDict((key, slot) for key, slot, _ in rows)
+        self._tick = rows[-1][2] if rows else 0
+        self._open_vectors()
+
+    def _import_json_index(self):
+        # one-off: caches written before the SQLite index kept it in index.json
+        json_path = os.path.join(self.cache_dir, "index.json")
+        if not os.path.exists(json_path):
+            return
+
+        with open(json_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO slots (key, slot, used) VALUES (?, ?, ?)",
+            ((key, slot, used) for used, (key, slot) in enumerate(index["lru"], start=1)),
+        )
+        self._write_meta(index["model"], index["dim"], index["rows"])
+        self._conn.commit()
+        os.remove(json_path)
+
+    def _write_meta(self, model, dim, rows):
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)",
+            [("model", model), ("dim", str(dim)), ("rows", str(rows))],
+        )
+
+    def _open_vectors(self):
+        self._vectors = np.memmap(
+            self._vectors_path, dtype=np.float32, mode="r+",
+            shape=(self._rows, self._dim),
+        )
+
+    def _grow(self, dim: int):
+        """
+        Extend the vector file (doubling, up to max_rows).
+        """
+        self._dim = self._dim or dim
+        new_rows = min(self.max_rows, max(1024, self._rows * 2))
+
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(self._vectors_path, "ab") as f:
+            f.truncate(new_rows * self._dim * 4)
+
+        self._rows = new_rows
+        self._open_vectors()
+
+    def _touch(self, key: str, slot: int):
+        self._tick += 1
+        self._slots.move_to_end(key)
+        self._dirty[key] = (slot, self._tick)
+
+    def _store_batch(self, keys, vectors):
+        claimed, evicted = [], []
+        for key, vector in zip(keys, vectors):
+            # another caller may have encoded the same text meanwhile
+            if key not in self._slots:
+                claimed.append((self._claim(key, len(vector), evicted), vector))
+
+        if evicted:
+            # forget evicted keys on disk before their rows are overwritten
+            self._conn.executemany("DELETE FROM slots WHERE key = ?", [(k,) for k in evicted])
+            self._conn.commit()
+
+        for slot, vector in claimed:
+            self._vectors[slot] = vector
+
+    def _claim(self, key: str, dim: int, evicted: list) -> int:
+        if len(self._slots) < self._rows:
+            slot = len(self._slots)
+        elif self._rows < self.max_rows:
+            slot = len(self._slots)
+            self._grow(dim)
+        else:
+            # evict least recently used row and reuse it
+            old_key, slot = self._slots.popitem(last=False)
+            self._dirty.pop(old_key, None)
+            evicted.append(old_key)
+            self._evictions += 1
+
+        self._slots[key] = slot
+        self._touch(key, slot)
+        return slot
+
+    def _flush(self):
+        """
+        Caller holds the lock. Vectors first, so no index row ever
+        points at a slot that is not on disk yet.
+        """
+        self._flushed_at = time.monotonic()
+        if not self._dirty:
+            return
+        if self._vectors is not None:
+            self._vectors.flush()
+
+        dirty, self._dirty = self._dirty, {}
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO slots (key, slot, used) VALUES (?, ?, ?)",
+            [(key, slot, used) for key, (slot, used) in dirty.items()],
+        )
+        self._write_meta(self.model_name, self._dim, self._rows)
+        self._conn.commit()
+
 
 def get_embeddings():
     """
-    Returns embedding model.
+    Returns embedding model (with persistent vector cache).
+    The model is loaded once per process and shared.
     """
-    return HuggingFaceEmbeddings(
-        model_name="sentence-transformers/all-MiniLM-L6-v2"
-    )
+    return registry.get("embeddings", lambda: CachedEmbeddings(
+        lambda: HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL),
+        model_name=EMBEDDING_MODEL,
+    ))
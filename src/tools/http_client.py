@@ -0,0 +1,210 @@
+# src/tools/http_client.py
+
+import time
+import random
+import asyncio
+import threading
+from collections import deque
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.registry import registry
+from src.ratelimit import get_limiter
+from src.tracing import span
+from src.config import (
+    FINNHUB_API_KEY,
+    FINNHUB_BASE_URL,
+    HTTP_TIMEOUT,
+    HTTP_POOL_SIZE,
+    HTTP_MAX_RETRIES,
+    HTTP_BACKOFF_BASE,
+    HTTP_BACKOFF_MAX,
+)
+
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+LATENCY_WINDOW = 512
+
+
+class HttpClient:
+    """
+    Shared keep-alive HTTP client for the tool layer.
+
+    - one requests.Session with a connection pool, so repeated calls to
+      the same host reuse TCP/TLS connections
+    - retries on connection errors, timeouts and 429/5xx with jittered
+      exponential backoff (Retry-After is honoured when sent)
+    - per-endpoint latency and error counters, see stats()
+
+    Responses are returned as-is (callers check status_code); after the
+    last retry the final response is returned, or the last exception raised.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = HTTP_POOL_SIZE,
+        max_retries: int = HTTP_MAX_RETRIES,
+        backoff_base: float = HTTP_BACKOFF_BASE,
+        backoff_max: float = HTTP_BACKOFF_MAX,
+        timeout: float = HTTP_TIMEOUT,
+    ):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    # ---------------------------------------------------
+    # REQUESTS
+    # ---------------------------------------------------
+    def get(self, url: str, params: dict = None, endpoint: str = None,
+            timeout: float = None, provider: str = None) -> requests.Response:
+        """
+        With provider set, a 429 also pauses that provider in the shared
+        rate limiter, so other sessions back off instead of piling on.
+        """
+        endpoint = endpoint or url
+        timeout = timeout or self.timeout
+
+        with span(f"http:{endpoint}") as s:
+            response = self._get(url, params, endpoint, timeout, provider)
+            s.set(status=response.status_code)
+        return response
+
+    def _get(self, url, params, endpoint, timeout, provider):
+        for attempt in range(self.max_retries + 1):
+            start = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, timeout=timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                self._record(endpoint, start, error=True)
+                if attempt == self.max_retries:
+                    raise
+                self._retry_sleep(endpoint, attempt)
+                continue
+
+            failed = response.status_code >= 400
+            self._record(endpoint, start, error=failed, status=response.status_code)
+
+            if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                return response
+
+            delay = self._retry_sleep(endpoint, attempt, response.headers.get("Retry-After"))
+            if provider and response.status_code == 429:
+                get_limiter().penalize(provider, seconds=delay)
+
+    async def aget(self, url: str, params: dict = None, endpoint: str = None,
+                   timeout: float = None, provider: str = None) -> requests.Response:
+        """
+        asyncio entry point; runs get() in a worker thread on the same pool.
+        """
+        return await asyncio.to_thread(self.get, url, params, endpoint, timeout, provider)
+
+    def _retry_sleep(self, endpoint: str, attempt: int, retry_after: str = None) -> float:
+        delay = _parse_retry_after(retry_after)
+        if delay is None:
+            # full jitter: uniform(0, base * 2^attempt)
+            delay = random.uniform(0, self.backoff_base * (2 ** attempt))
+        delay = min(delay, self.backoff_max)
+        with self._lock:
+            self._stats[endpoint]["retries"] += 1
+        time.sleep(delay)
+        return delay
+
+    # ---------------------------------------------------
+    # COUNTERS
+    # ---------------------------------------------------
+    def _record(self, endpoint: str, start: float, error: bool, status: int = None):
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            s = self._stats.setdefault(endpoint, {
+                "calls": 0,
+                "errors": 0,
+                "retries": 0,
+                "status": {},
+                "latencies": deque(maxlen=LATENCY_WINDOW),
+            })
+            s["calls"] += 1
+            s["errors"] += int(error)
+            s["latencies"].append(elapsed_ms)
+            key = str(status) if status is not None else "network_error"
+            s["status"][key] = s["status"].get(key, 0) + 1
+
+    def stats(self) -> dict:
+        """
+        {endpoint: {calls, errors, retries, status, p50_ms, p95_ms, max_ms}}
+        Latency percentiles cover the last LATENCY_WINDOW attempts.
+        """
+        with self._lock:
+            snapshot = {name: dict(s, latencies=sorted(s["latencies"]))
+                        for name, s in self._stats.items()}
+
+        out = {}
+        for name, s in snapshot.items():
+            lat = s.pop("latencies")
+            out[name] = dict(
+                s,
+                status=dict(s["status"]),
+                p50_ms=round(_percentile(lat, 0.50), 1),
+                p95_ms=round(_percentile(lat, 0.95), 1),
+                max_ms=round(lat[-1], 1) if lat else 0.0,
+            )
+        return out
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats.clear()
+
+
+def _percentile(sorted_values, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def _parse_retry_after(value):
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def get_http_client() -> HttpClient:
+    return registry.get("http_client", HttpClient)
+
+
+# ---------------------------------------------------
+# FINNHUB
+# ---------------------------------------------------
+def finnhub_get(path: str, **params) -> requests.Response:
+    """
+    GET {FINNHUB_BASE_URL}/{path} with the API token; counted under "finnhub:/path".
+    Every call waits for a slot in the shared per-minute Finnhub budget.
+    """
+    # if no slot frees up in time, send anyway and let 429 retries back off
+    get_limiter().acquire("finnhub", timeout=HTTP_TIMEOUT)
+
+    path = "/" + path.lstrip("/")
+    params["token"] = FINNHUB_API_KEY
+    return get_http_client().get(
+        FINNHUB_BASE_URL + path, params=params, endpoint=f"finnhub:{path}", provider="finnhub"
+    )
+
+
+async def finnhub_aget(path: str, **params) -> requests.Response:
+    return await asyncio.to_thread(finnhub_get, path, **params)
@@ -0,0 +1,147 @@
+# src/tools/ingest_pipeline.py
+
+import os
+import time
+from typing import List, Dict
+from src.tools.pdf_loader import iter_load_pdfs
+from src.tools.text_splitter import iter_split_documents
+from src.tools.embeddings import get_embeddings
+from src.tools.vector_store import chunk_id, new_faiss_index
+
+
+EMBED_BATCH_SIZE = 256
+
+
+def _iter_pages(pdf_paths, stats, workers):
+    """
+    Stage 1: parse PDFs (process pool) and stream pages one by one.
+    parse_seconds is the wall time of the stage, parse_wait the time
+    the consumer spent blocked on it.
+    """
+    start = time.perf_counter()
+    pdfs = iter_load_pdfs(pdf_paths, workers=workers)
+
+    while True:
+        wait_start = time.perf_counter()
+        item = next(pdfs, None)
+        stats["parse_wait"] += time.perf_counter() - wait_start
+        if item is None:
+            return
+
+        _, pages = item
+        stats["pdfs"] += 1
+        stats["pages"] += len(pages)
+        stats["parse_seconds"] = time.perf_counter() - start
+        yield from pages
+
+
+def _iter_chunks(pages, stats):
+    """
+    Stage 2: split pages into chunks lazily.
+    """
+    chunks = iter_split_documents(pages)
+
+    while True:
+        start = time.perf_counter()
+        wait_before = stats["parse_wait"]
+        chunk = next(chunks, None)
+        # time spent blocked on the parser is not splitter time
+        stats["split_seconds"] += (
+            time.perf_counter() - start - (stats["parse_wait"] - wait_before)
+        )
+        if chunk is None:
+            return
+        stats["chunks"] += 1
+        yield chunk
+
+
+def _iter_batches(chunks, batch_size):
+    batch = []
+    for chunk in chunks:
+        batch.append(chunk)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def run_ingest_pipeline(
+    pdf_paths: List[str],
+    hashes: Dict[str, str],
+    vector_db=None,
+    batch_size: int = EMBED_BATCH_SIZE,
+    workers: int = None,
+):
+    """
+    Streaming PDF -> chunk -> embed ingestion with bounded memory.
+    - PDFs are parsed in a process pool, a few at a time
+    - pages flow through the splitter as a generator
+    - chunks are embedded and added to the index in fixed-size batches
+
+    hashes maps each normalized path to its sha256 (used for chunk IDs).
+    Returns (vector_db, stats); stats["chunk_ids"] maps path -> IDs.
+    """
+    embeddings = vector_db.embeddings if vector_db is not None else get_embeddings()
+
+    stats = {
+        "pdfs": 0,
+        "pages": 0,
+        "chunks": 0,
+        "vectors": 0,
+        "parse_seconds": 0.0,
+        "parse_wait": 0.0,
+        "split_seconds": 0.0,
+        "embed_seconds": 0.0,
+        "chunk_ids": {},
+    }
+    counters = {}
+    cache_before = embeddings.stats() if hasattr(embeddings, "stats") else None
+
+    wall_start = time.perf_counter()
+    pages = _iter_pages(pdf_paths, stats, workers)
+
+    for batch in _iter_batches(_iter_chunks(pages, stats), batch_size):
+        texts = [c.page_content for c in batch]
+        metadatas = [c.metadata for c in batch]
+
+        ids = []
+        for c in batch:
+            path = os.path.normpath(c.metadata.get("source", ""))
+            n = counters.get(path, 0)
+            counters[path] = n + 1
+            ids.append(chunk_id(path, hashes[path], n))
+            stats["chunk_ids"].setdefault(path, []).append(ids[-1])
+
+        start = time.perf_counter()
+        vectors = embeddings.embed_documents(texts)
+
+        if vector_db is None:
+            vector_db = new_faiss_index(embeddings, len(vectors[0]))
+        vector_db.add_embeddings(zip(texts, vectors), metadatas=metadatas, ids=ids)
+
+        stats["embed_seconds"] += time.perf_counter() - start
+        stats["vectors"] += len(batch)
+
+    if hasattr(embeddings, "flush"):
+        embeddings.flush()
+
+    stats["total_seconds"] = time.perf_counter() - wall_start
+    stats["throughput"] = {
+        "pages_per_s": _rate(stats["pages"], stats["parse_seconds"]),
+        "chunks_per_s": _rate(stats["chunks"], stats["split_seconds"]),
+        "vectors_per_s": _rate(stats["vectors"], stats["embed_seconds"]),
+    }
+
+    if cache_before is not None:
+        cache_after = embeddings.stats()
+        stats["embedding_cache"] = {
+            "hits": cache_after["hits"] - cache_before["hits"],
+            "misses": cache_after["misses"] - cache_before["misses"],
+        }
+
+    return vector_db, stats
+
+
+def _rate(count, seconds):
+    return round(count / seconds, 1) if seconds > 0 else None
@@ -0,0 +1,174 @@
+# src/tools/llm_cache.py
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Optional
+
+from src.registry import registry
+from src.config import LLM_CACHE_TTL_SECONDS, LLM_CACHE_MAX_BYTES
+
+
+LLM_CACHE_PATH = "data/cache/llm_cache.sqlite"
+
+
+class LLMCompletionCache:
+    """
+    Exact-match cache of LLM completions, keyed on a hash of
+    (model, temperature, normalized messages, call options).
+
+    Entries persist in SQLite (WAL, shared by worker processes), expire
+    after a TTL and are evicted least recently used once the stored
+    completions exceed max_bytes.
+    """
+
+    def __init__(
+        self,
+        path: str = LLM_CACHE_PATH,
+        ttl_seconds: float = LLM_CACHE_TTL_SECONDS,
+        max_bytes: int = LLM_CACHE_MAX_BYTES,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS completions (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                bytes INTEGER NOT NULL,
+                output_tokens INTEGER,
+                created REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS completions_last_used ON completions (last_used)"
+        )
+        self._conn.commit()
+
+        self._hits = 0
+        self._misses = 0
+        self._bypassed = 0
+        self._evicted = 0
+        self._tokens_saved = 0
+
+    # ---------------------------------------------------
+    # PUBLIC API
+    # ---------------------------------------------------
+    def lookup(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, output_tokens, created FROM completions WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or now - row[2] > self.ttl_seconds:
+                self._misses += 1
+                return None
+
+            self._conn.execute("UPDATE completions SET last_used = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self._hits += 1
+            self._tokens_saved += row[1] or 0
+        return row[0]
+
+    def store(self, key: str, model: str, response: str, output_tokens: int = None):
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            self._conn.execute("""
+                INSERT OR REPLACE INTO completions
+                    (key, model, response, bytes, output_tokens, created, last_used)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (key, model, response, size, output_tokens, now, now))
+            self._evict(now)
+            self._conn.commit()
+
+    def bypass(self):
+        with self._lock:
+            self._bypassed += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, stored = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM completions"
+            ).fetchone()
+            total = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / total, 3) if total else None,
+                "bypassed": self._bypassed,
+                "evicted": self._evicted,
+                "output_tokens_saved": self._tokens_saved,
+                "entries": entries,
+                "bytes": stored,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM completions")
+            self._conn.commit()
+
+    # ---------------------------------------------------
+    # EVICTION (caller holds the lock)
+    # ---------------------------------------------------
+    def _evict(self, now: float):
+        cursor = self._conn.execute(
+            "DELETE FROM completions WHERE created < ?", (now - self.ttl_seconds,)
+        )
+        self._evicted += cursor.rowcount
+
+        (stored,) = self._conn.execute(
+            "SELECT COALESCE(SUM(bytes), 0) FROM completions"
+        ).fetchone()
+        if stored <= self.max_bytes:
+            return
+
+        # oldest-used first until the rest fits
+        excess, doomed = stored - self.max_bytes, []
+        for key, size in self._conn.execute(
+            "SELECT key, bytes FROM completions ORDER BY last_used"
+        ):
+            if excess <= 0:
+                break
+            doomed.append((key,))
+            excess -= size
+        self._conn.executemany("DELETE FROM completions WHERE key = ?", doomed)
+        self._evicted += len(doomed)
+
+
+def completion_key(model: str, temperature: float, messages, options=None) -> str:
+    """
+    messages: a prompt string or LangChain messages. Whitespace runs are
+    collapsed, so reformatted but identical prompts share an entry.
+    """
+    if isinstance(messages, str):
+        messages = [("HumanMessage", messages)]
+    else:
+        messages = [(type(m).__name__, m.content) for m in messages]
+
+    normalized = [
+        [role, " ".join(content.split()) if isinstance(content, str) else content]
+        for role, content in messages
+    ]
+    payload = json.dumps(
+        [model, temperature, normalized, sorted((options or {}).items())],
+        ensure_ascii=False, default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_llm_cache() -> LLMCompletionCache:
+    return registry.get("llm_cache", LLMCompletionCache)
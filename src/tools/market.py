@@ -1,11 +1,16 @@
 # src/tools/market.py
 
-import requests
-from src.config import FINNHUB_API_KEY
+import time
+from concurrent.futures import wait
 
+from src.tools.http_client import finnhub_get
+from src.tools.cache import cached, get_tool_cache
+from src.ratelimit import get_scheduler, current_priority
+from src.config import FINNHUB_CALLS_PER_MINUTE, QUOTE_BATCH_DEADLINE
+
+@cached("quote", key=lambda symbol: symbol.strip().upper())
 def get_stock_price(symbol: str):
-    url = f"https://finnhub.io/api/v1/quote?symbol={symbol}&token={FINNHUB_API_KEY}"
-    r = requests.get(url, timeout=10)
+    r = finnhub_get("quote", symbol=symbol)
 
     # ✅ Don’t crash the app on forbidden/unauthorized
     if r.status_code != 200:
@@ -27,3 +32,68 @@ def get_stock_price(symbol: str):
         "open": data.get("o"),
         "prev_close": data.get("pc"),
     }
+
+
+def get_stock_prices(symbols, deadline: float = QUOTE_BATCH_DEADLINE,
+                     priority: int = None) -> dict:
+    """
+    Quotes for several symbols at once.
+
+    Cached quotes are answered immediately; the rest are queued on the
+    shared Finnhub scheduler, which runs them concurrently within the
+    per-minute budget (earlier symbols first). Whatever is not done by
+    the deadline is reported under "pending". priority defaults to the
+    current request's priority class. Symbols Finnhub has no price for
+    (current 0 or missing) are reported under "errors".
+
+    Returns {"quotes": {symbol: quote}, "errors": {symbol: error},
+             "pending": [symbols], "partial": bool}
+    """
+    symbols = list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+    deadline_at = time.monotonic() + deadline
+    priority = current_priority.get() if priority is None else priority
+
+    cache = get_tool_cache()
+    scheduler = get_scheduler("finnhub", FINNHUB_CALLS_PER_MINUTE)
+
+    results, futures = {}, {}
+    for symbol in symbols:
+        quote = cache.peek("quote", symbol)
+        if quote is not None:
+            results[symbol] = quote
+        else:
+            futures[symbol] = scheduler.submit(
+                lambda s=symbol: get_stock_price(s), priority=priority, deadline=deadline_at
+            )
+
+    wait(futures.values(), timeout=max(0.0, deadline_at - time.monotonic()))
+
+    pending = []
+    for symbol, future in futures.items():
+        if not future.done() or future.cancelled():
+            future.cancel()
+            pending.append(symbol)
+        elif future.exception() is not None:
+            results[symbol] = {"error": True, "symbol": symbol, "message": str(future.exception())}
+        else:
+            results[symbol] = future.result()
+
+    quotes, errors = {}, {}
+    for symbol in symbols:
+        result = results.get(symbol)
+        if result is None:
+            continue
+        if result.get("error"):
+            errors[symbol] = result
+        elif not result.get("current"):
+            # Finnhub answers unknown symbols with 200 and c=0
+            errors[symbol] = {"error": True, "symbol": symbol, "message": "No data for this symbol."}
+        else:
+            quotes[symbol] = result
+
+    return {
+        "quotes": quotes,
+        "errors": errors,
+        "pending": pending,
+        "partial": bool(pending),
+    }
@@ -1,16 +1,13 @@
-import requests
 from datetime import date, timedelta
-from src.config import FINNHUB_API_KEY
+from src.tools.http_client import finnhub_get
+from src.tools.cache import cached
 
+@cached("news", key=lambda symbol, days=7: f"{symbol.strip().upper()}:{days}")
 def get_company_news(symbol: str, days: int = 7):
     to_date = date.today()
     from_date = to_date - timedelta(days=days)
 
-    url = (
-        "https://finnhub.io/api/v1/company-news"
-        f"?symbol={symbol}&from={from_date}&to={to_date}&token={FINNHUB_API_KEY}"
-    )
-    r = requests.get(url, timeout=10)
+    r = finnhub_get("company-news", symbol=symbol, **{"from": str(from_date), "to": str(to_date)})
     r.raise_for_status()
     data = r.json()
 
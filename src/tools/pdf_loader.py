@@ -1,3 +1,6 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from typing import List
 from langchain_community.document_loaders import PyPDFLoader
 
@@ -19,3 +22,44 @@ def load_pdfs(pdf_paths: List[str]):
         documents.extend(docs)
 
     return documents
+
+
+def _load_one_pdf(path: str):
+    """
+    Worker: parse a single PDF.
+    """
+    return PyPDFLoader(path).load()
+
+
+def iter_load_pdfs(pdf_paths: List[str], workers: int = None, max_pending: int = None):
+    """
+    Parse PDFs in a process pool and yield (path, pages) in input order.
+    At most max_pending PDFs are parsed or buffered at once,
+    so memory does not grow with the number of files.
+    """
+    workers = workers or min(4, os.cpu_count() or 1, max(len(pdf_paths), 1))
+    max_pending = max_pending or workers * 2
+
+    if workers <= 1:
+        for path in pdf_paths:
+            yield path, _load_one_pdf(path)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        paths = iter(pdf_paths)
+
+        for path in paths:
+            pending.append((path, pool.submit(_load_one_pdf, path)))
+            if len(pending) >= max_pending:
+                break
+
+        while pending:
+            path, future = pending.popleft()
+            docs = future.result()
+
+            next_path = next(paths, None)
+            if next_path is not None:
+                pending.append((next_path, pool.submit(_load_one_pdf, next_path)))
+
+            yield path, docs
@@ -0,0 +1,203 @@
+# src/tools/renderers.py
+
+from typing import Dict, Optional
+
+
+# Finnhub symbols on Indian exchanges are quoted in rupees
+INR_SUFFIXES = (".NS", ".BO")
+
+INSTRUMENT_NAMES = {
+    "sip": "Equity index SIP",
+    "rd": "Recurring deposit",
+    "fd": "Fixed deposit",
+}
+
+LAKH = 100000
+CRORE = 10000000
+
+
+# ---------------------------------------------------
+# INDIAN NUMBER FORMATTING
+# ---------------------------------------------------
+def group_indian(number: float, decimals: int = 0) -> str:
+    """
+    1234567.5 -> "12,34,567.50" (last three digits, then groups of two)
+    """
+    text = f"{abs(number):.{decimals}f}"
+    whole, _, fraction = text.partition(".")
+
+    head, tail = whole[:-3], whole[-3:]
+    groups = []
+    while len(head) > 2:
+        groups.insert(0, head[-2:])
+        head = head[:-2]
+    if head:
+        groups.insert(0, head)
+    whole = ",".join(groups + [tail])
+
+    sign = "-" if number < 0 and float(text) != 0 else ""
+    return sign + whole + ("." + fraction if fraction else "")
+
+
+def format_inr(amount: float, decimals: int = 0) -> str:
+    text = group_indian(amount, decimals)
+    return "-₹" + text[1:] if text.startswith("-") else "₹" + text
+
+
+def format_inr_short(amount: float) -> str:
+    """
+    Amount in words for large sums: ₹5 lakh, ₹1.25 crore, else ₹45,000.
+    """
+    for unit, name in ((CRORE, "crore"), (LAKH, "lakh")):
+        if abs(amount) >= unit:
+            value = f"{abs(amount) / unit:.2f}".rstrip("0").rstrip(".")
+            return f"{'-' if amount < 0 else ''}₹{value} {name}"
+    return format_inr(amount)
+
+
+def format_price(amount: float, symbol: str) -> str:
+    # "$" would start a math block in Streamlit markdown
+    if symbol.upper().endswith(INR_SUFFIXES):
+        return format_inr(amount, 2)
+    return f"{amount:,.2f} USD"
+
+
+def _percent(value: float) -> str:
+    return f"{value:.0f}%" if float(value).is_integer() else f"{value:.1f}%"
+
+
+# ---------------------------------------------------
+# RENDERERS (tool output -> markdown answer)
+# ---------------------------------------------------
+def render_budget(data: Dict) -> str:
+    income = data["income"]
+    fixed, variable = data["fixed_costs"], data["variable_costs"]
+    savings = data["savings_possible"]
+
+    def share(amount):
+        return _percent(amount / income * 100) if income else "-"
+
+    lines = [
+        f"**Monthly budget for an income of {format_inr(income)}**",
+        "",
+        f"- Fixed costs (rent, EMIs, bills): {format_inr(fixed)} ({share(fixed)})",
+        f"- Variable costs (food, travel, shopping): {format_inr(variable)} ({share(variable)})",
+        f"- Savings: {format_inr(savings)} ({share(savings)})",
+        "",
+    ]
+    if savings > 0:
+        lines.append(
+            f"Saving {format_inr(savings)} every month adds up to "
+            f"{format_inr_short(savings * 12)} a year, before any returns."
+        )
+    else:
+        lines.append("Expenses use up the whole income; trim variable costs first.")
+
+    projection = data.get("savings_projection")
+    if projection and not projection.get("error"):
+        nominal, real = projection["percentiles"], projection["real_percentiles"]
+        lines += [
+            "",
+            f"Invested in an equity index SIP (about {_percent(projection['assumptions']['annual_return'] * 100)} "
+            f"a year, with ups and downs), that could grow to **{format_inr_short(nominal['p50'])}** "
+            f"in {projection['months'] // 12} years: {format_inr_short(nominal['p10'])} to "
+            f"{format_inr_short(nominal['p90'])} in 8 of 10 simulated markets, "
+            f"about {format_inr_short(real['p50'])} in today's money.",
+        ]
+    return "\n".join(lines)
+
+
+def render_savings(data: Dict) -> str:
+    goal, months = data["goal_amount"], data["months"]
+    monthly = data["monthly_required"]
+
+    lines = [
+        f"To save **{format_inr_short(goal)}** ({format_inr(goal)}) in {months} months, "
+        f"set aside **{format_inr(monthly)} a month** "
+        f"(about {format_inr(monthly * 12 / 52)} a week).",
+    ]
+    projections = {k: p for k, p in (data.get("projections") or {}).items() if not p.get("error")}
+    if projections:
+        lines += ["", "With returns (simulated, after monthly compounding):"]
+        for instrument, p in projections.items():
+            rate = _percent(p["assumptions"]["annual_return"] * 100)
+            required = p["required_monthly"]
+            if p["assumptions"]["volatility"]:
+                lines.append(
+                    f"- {INSTRUMENT_NAMES.get(instrument, instrument)} (about {rate}, volatile): "
+                    f"{format_inr(required['p50'])} a month at the median, "
+                    f"{format_inr(required['p90'])} for a 90% chance"
+                )
+            else:
+                lines.append(
+                    f"- {INSTRUMENT_NAMES.get(instrument, instrument)} ({rate}): "
+                    f"{format_inr(required['p50'])} a month"
+                )
+
+    if data.get("tip"):
+        lines += ["", f"Tip: {data['tip']}"]
+    return "\n".join(lines)
+
+
+def render_quote(data: Dict) -> Optional[str]:
+    symbol, current = data.get("symbol", ""), data.get("current")
+    if not current:
+        return None
+
+    lines = [f"**{symbol}** is at **{format_price(current, symbol)}**{_change(data)}."]
+    if data.get("low") and data.get("high"):
+        lines.append(
+            f"- Day range: {format_price(data['low'], symbol)} – {format_price(data['high'], symbol)}"
+        )
+    if data.get("open"):
+        lines.append(f"- Open: {format_price(data['open'], symbol)}")
+    if data.get("prev_close"):
+        lines.append(f"- Previous close: {format_price(data['prev_close'], symbol)}")
+    return "\n".join(lines)
+
+
+def render_quotes(data: Dict) -> Optional[str]:
+    quotes = {s: q for s, q in data.get("quotes", {}).items() if q.get("current")}
+    if not quotes:
+        return None
+
+    lines = ["| Symbol | Price | Change | Day range |", "|---|---|---|---|"]
+    for symbol, q in quotes.items():
+        day_range = (
+            f"{format_price(q['low'], symbol)} – {format_price(q['high'], symbol)}"
+            if q.get("low") and q.get("high") else "-"
+        )
+        change = _change(q).strip(" ()") or "-"
+        lines.append(f"| {symbol} | {format_price(q['current'], symbol)} | {change} | {day_range} |")
+
+    missing = list(data.get("errors", {})) + list(data.get("pending", []))
+    if missing:
+        lines += ["", f"No live quote for {', '.join(missing)} right now."]
+    return "\n".join(lines)
+
+
+def _change(quote: Dict) -> str:
+    current, prev = quote.get("current"), quote.get("prev_close")
+    if not current or not prev:
+        return ""
+    diff = current - prev
+    arrow = "▲" if diff > 0 else "▼" if diff < 0 else "▶"
+    return f" ({arrow} {abs(diff):,.2f}, {diff / prev * 100:+.2f}% today)"
+
+
+def render_result(data) -> Optional[str]:
+    """
+    Markdown answer for a structured tool result, or None when the
+    result has no template (errors, web search results).
+    """
+    if not isinstance(data, dict) or data.get("error"):
+        return None
+    if "savings_possible" in data:
+        return render_budget(data)
+    if "monthly_required" in data:
+        return render_savings(data)
+    if "current" in data:
+        return render_quote(data)
+    if "quotes" in data:
+        return render_quotes(data)
+    return None
@@ -0,0 +1,137 @@
+# src/tools/retrieval.py
+
+import time
+from typing import Dict, List
+
+import numpy as np
+import faiss
+
+from src.tools.sparse_index import identifier_terms
+
+
+RRF_K = 60
+CANDIDATES = 20
+
+
+def hybrid_search(vector_db, query: str, k: int = 6, candidates: int = CANDIDATES,
+                  query_vector=None, dense_hits=None) -> Dict:
+    """
+    BM25 + dense retrieval in one call, fused with reciprocal rank fusion.
+
+    If the query contains exact identifiers ("Section 11B", "45-IA",
+    circular numbers) and at least k chunks contain all of them,
+    the sparse hits are returned directly and dense search is skipped.
+    Pass query_vector if the query was already embedded, or dense_hits
+    (at least `candidates` of them) if dense search already ran.
+
+    Returns {"docs": [...], "mode": "hybrid" | "sparse_exact" | "dense",
+             "timings_ms": {...}}
+    """
+    timings = {}
+    store = vector_db.docstore
+    sparse = getattr(store, "sparse", None)
+
+    if sparse is None:
+        start = time.perf_counter()
+        docs = dense_hits[:k] if dense_hits is not None else _dense_search(vector_db, query, k, query_vector)
+        timings["dense"] = _ms(start)
+        return {"docs": docs, "mode": "dense", "timings_ms": timings}
+
+    start = time.perf_counter()
+    sparse_hits = sparse.search(query, k=candidates)
+    timings["sparse"] = _ms(start)
+
+    identifiers = identifier_terms(query)
+    if identifiers:
+        exact = sparse.docs_with_all_terms(identifiers)
+        exact_hits = [chunk_id for chunk_id, _ in sparse_hits if chunk_id in exact]
+        if len(exact_hits) >= k:
+            start = time.perf_counter()
+            docs = store.get_many(exact_hits[:k])
+            timings["fetch"] = _ms(start)
+            return {"docs": docs, "mode": "sparse_exact", "timings_ms": timings}
+
+    if dense_hits is None:
+        start = time.perf_counter()
+        dense_hits = _dense_search(vector_db, query, candidates, query_vector)
+        timings["dense"] = _ms(start)
+
+    start = time.perf_counter()
+    ranked = reciprocal_rank_fusion([
+        [doc.id for doc in dense_hits],
+        [chunk_id for chunk_id, _ in sparse_hits],
+    ])[:k]
+
+    by_id = {doc.id: doc for doc in dense_hits}
+    missing = [chunk_id for chunk_id in ranked if chunk_id not in by_id]
+    by_id.update({doc.id: doc for doc in store.get_many(missing)})
+
+    docs = [by_id[chunk_id] for chunk_id in ranked if chunk_id in by_id]
+    timings["fuse"] = _ms(start)
+
+    return {"docs": docs, "mode": "hybrid", "timings_ms": timings}
+
+
+def hybrid_search_batch(vector_db, queries: List[str], query_vectors, k: int = 6,
+                        candidates: int = CANDIDATES) -> List[Dict]:
+    """
+    hybrid_search for many queries: dense search runs once over the
+    whole query matrix, then BM25 and fusion per query.
+    Each result's timings_ms["dense_batch"] is the shared FAISS call.
+    """
+    start = time.perf_counter()
+    dense = dense_search_batch(vector_db, query_vectors, candidates)
+    dense_ms = _ms(start)
+
+    results = []
+    for query, dense_hits in zip(queries, dense):
+        result = hybrid_search(vector_db, query, k, candidates, dense_hits=dense_hits)
+        result["timings_ms"]["dense_batch"] = dense_ms
+        results.append(result)
+    return results
+
+
+def dense_search_batch(vector_db, query_vectors, k: int) -> List[List]:
+    """
+    One FAISS search over the (n, dim) query matrix; all hit chunks are
+    fetched from the docstore in a single query. Same ranking as
+    similarity_search_by_vector per row.
+    """
+    matrix = np.ascontiguousarray(query_vectors, dtype=np.float32)
+    if matrix.size == 0:
+        return []
+    if getattr(vector_db, "_normalize_L2", False):
+        faiss.normalize_L2(matrix)
+
+    _, rows = vector_db.index.search(matrix, k)
+    id_map = vector_db.index_to_docstore_id
+    ranked = [[id_map[int(i)] for i in row if i != -1] for row in rows]
+
+    unique = list(dict.fromkeys(chunk_id for ids in ranked for chunk_id in ids))
+    store = vector_db.docstore
+    if hasattr(store, "get_many"):
+        by_id = {doc.id: doc for doc in store.get_many(unique)}
+    else:
+        by_id = {chunk_id: store.search(chunk_id) for chunk_id in unique}
+    return [[by_id[chunk_id] for chunk_id in ids if chunk_id in by_id] for ids in ranked]
+
+
+def _dense_search(vector_db, query, k, query_vector):
+    if query_vector is None:
+        return vector_db.similarity_search(query, k=k)
+    return vector_db.similarity_search_by_vector(query_vector, k=k)
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], rrf_k: int = RRF_K) -> List[str]:
+    """
+    score(id) = sum over rankings of 1 / (rrf_k + rank)
+    """
+    scores = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (rrf_k + rank)
+    return sorted(scores, key=scores.get, reverse=True)
+
+
+def _ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 3)
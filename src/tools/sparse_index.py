@@ -0,0 +1,279 @@
+# src/tools/sparse_index.py
+
+import re
+import math
+from array import array
+from collections import Counter
+from typing import List, Tuple
+
+import numpy as np
+
+
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:[-/.][a-z0-9]+)*")
+SPLIT_RE = re.compile(r"[-/.]")
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has",
+    "have", "in", "is", "it", "its", "of", "on", "or", "shall", "such",
+    "that", "the", "this", "to", "under", "was", "what", "which", "with",
+    "any", "all", "may", "does", "do", "how", "who", "when", "where", "why",
+}
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# placeholders per IN (...) query; old SQLite builds allow only 999 variables
+SQL_BATCH = 500
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase word tokens that keep legal identifiers intact:
+    "Section 45-IA" -> ["section", "45-ia", "45", "ia"],
+    "RBI/2025-26/45" -> ["rbi/2025-26/45", "rbi", "2025", "26", "45"].
+    """
+    tokens = []
+    for tok in TOKEN_RE.findall(text.lower()):
+        if tok in STOPWORDS:
+            continue
+        tokens.append(tok)
+        if SPLIT_RE.search(tok):
+            tokens.extend(p for p in SPLIT_RE.split(tok) if p and p not in STOPWORDS)
+    return tokens
+
+
+def identifier_terms(query: str) -> List[str]:
+    """
+    Query tokens that look like exact identifiers (contain a digit),
+    e.g. "11b", "45-ia", "rbi/2025-26/45".
+    """
+    return [
+        t for t in dict.fromkeys(TOKEN_RE.findall(query.lower()))
+        if any(c.isdigit() for c in t) and t not in STOPWORDS
+    ]
+
+
+class SparseIndex:
+    """
+    BM25 inverted index stored in the chunk store's SQLite database.
+
+    Postings are compact uint32 (doc, tf) pairs, one blob per term.
+    Document lengths and liveness are mirrored in numpy arrays, so
+    scoring a term is a couple of vectorised operations.
+    Deleted documents are tombstoned and dropped on compact().
+    """
+
+    def __init__(self, conn, lock):
+        self._conn = conn
+        self._lock = lock
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS sparse_docs (
+                doc INTEGER PRIMARY KEY,
+                chunk_id TEXT NOT NULL UNIQUE,
+                length INTEGER NOT NULL,
+                live INTEGER NOT NULL DEFAULT 1
+            );
+            CREATE TABLE IF NOT EXISTS postings (
+                term TEXT PRIMARY KEY,
+                data BLOB NOT NULL
+            );
+        """)
+        self._conn.commit()
+        self._generation = None
+        self._lengths = np.zeros(0, dtype=np.float32)
+        self._live = np.zeros(0, dtype=bool)
+        self._chunk_ids = []
+
+    # ---------------------------------------------------
+    # WRITES
+    # ---------------------------------------------------
+    def add(self, docs: List[Tuple[str, str]]):
+        """
+        Index (chunk_id, text) pairs. Caller holds the store lock.
+        """
+        known = set()
+        for start in range(0, len(docs), SQL_BATCH):
+            batch = [chunk_id for chunk_id, _ in docs[start:start + SQL_BATCH]]
+            known.update(row[0] for row in self._conn.execute(
+                f"SELECT chunk_id FROM sparse_docs WHERE chunk_id IN ({','.join('?' * len(batch))})",
+                batch,
+            ))
+
+        next_doc = self._conn.execute("SELECT COALESCE(MAX(doc), -1) + 1 FROM sparse_docs").fetchone()[0]
+        new_postings = {}
+        doc_rows = []
+
+        for chunk_id, text in docs:
+            if chunk_id in known:
+                continue
+            counts = Counter(tokenize(text))
+            doc_rows.append((next_doc, chunk_id, sum(counts.values())))
+            for term, tf in counts.items():
+                new_postings.setdefault(term, array("I")).extend((next_doc, tf))
+            next_doc += 1
+
+        if not doc_rows:
+            return
+
+        self._conn.executemany(
+            "INSERT INTO sparse_docs (doc, chunk_id, length) VALUES (?, ?, ?)", doc_rows
+        )
+        self._merge_postings(new_postings)
+        self._bump_generation()
+
+    def delete(self, chunk_ids: List[str]):
+        """
+        Tombstone documents. Caller holds the store lock.
+        """
+        if not chunk_ids:
+            return
+        self._conn.executemany(
+            "UPDATE sparse_docs SET live = 0 WHERE chunk_id = ?", [(i,) for i in chunk_ids]
+        )
+        self._bump_generation()
+
+    def compact(self):
+        """
+        Physically drop tombstoned documents from postings.
+        Caller holds the store lock.
+        """
+        dead = np.array(
+            [r[0] for r in self._conn.execute("SELECT doc FROM sparse_docs WHERE live = 0")],
+            dtype=np.uint32,
+        )
+        if not len(dead):
+            return 0
+
+        rows = self._conn.execute("SELECT term, data FROM postings").fetchall()
+        for term, data in rows:
+            pairs = np.frombuffer(data, dtype=np.uint32).reshape(-1, 2)
+            kept = pairs[~np.isin(pairs[:, 0], dead)]
+            if len(kept) == len(pairs):
+                continue
+            if len(kept):
+                self._conn.execute(
+                    "UPDATE postings SET data = ? WHERE term = ?", (kept.tobytes(), term)
+                )
+            else:
+                self._conn.execute("DELETE FROM postings WHERE term = ?", (term,))
+
+        self._conn.execute("DELETE FROM sparse_docs WHERE live = 0")
+        self._bump_generation()
+        return len(dead)
+
+    def clear(self):
+        self._conn.executescript("DELETE FROM sparse_docs; DELETE FROM postings;")
+        self._bump_generation()
+
+    def is_empty(self) -> bool:
+        return self._conn.execute("SELECT 1 FROM sparse_docs LIMIT 1").fetchone() is None
+
+    def _merge_postings(self, new_postings):
+        terms = list(new_postings)
+        existing = {}
+        for start in range(0, len(terms), SQL_BATCH):
+            batch = terms[start:start + SQL_BATCH]
+            existing.update(self._conn.execute(
+                f"SELECT term, data FROM postings WHERE term IN ({','.join('?' * len(batch))})",
+                batch,
+            ).fetchall())
+
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO postings (term, data) VALUES (?, ?)",
+            [(term, existing.get(term, b"") + pairs.tobytes()) for term, pairs in new_postings.items()],
+        )
+
+    def _bump_generation(self):
+        self._conn.execute("""
+            INSERT INTO meta (key, value) VALUES ('sparse_generation', '1')
+            ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1
+        """)
+
+    # ---------------------------------------------------
+    # SEARCH
+    # ---------------------------------------------------
+    def _refresh(self):
+        """
+        Reload doc lengths/liveness if the index changed (in any process).
+        Caller holds the store lock.
+        """
+        row = self._conn.execute(
+            "SELECT value FROM meta WHERE key = 'sparse_generation'"
+        ).fetchone()
+        generation = row[0] if row else None
+        if generation == self._generation:
+            return
+
+        rows = self._conn.execute(
+            "SELECT doc, chunk_id, length, live FROM sparse_docs ORDER BY doc"
+        ).fetchall()
+        size = rows[-1][0] + 1 if rows else 0
+        self._lengths = np.zeros(size, dtype=np.float32)
+        self._live = np.zeros(size, dtype=bool)
+        self._chunk_ids = [None] * size
+        for doc, chunk_id, length, live in rows:
+            self._lengths[doc] = length
+            self._live[doc] = bool(live)
+            self._chunk_ids[doc] = chunk_id
+        self._generation = generation
+
+    def search(self, query: str, k: int = 20) -> List[Tuple[str, float]]:
+        """
+        Top-k (chunk_id, bm25 score) for the query.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        with self._lock:
+            self._refresh()
+            postings = self._conn.execute(
+                f"SELECT data FROM postings WHERE term IN ({','.join('?' * len(terms))})", terms
+            ).fetchall()
+            lengths, live, chunk_ids = self._lengths, self._live, self._chunk_ids
+
+        n_docs = int(live.sum())
+        if not n_docs or not postings:
+            return []
+
+        avgdl = float(lengths[live].mean())
+        scores = np.zeros(len(lengths), dtype=np.float32)
+
+        for (data,) in postings:
+            pairs = np.frombuffer(data, dtype=np.uint32).reshape(-1, 2)
+            pairs = pairs[live[pairs[:, 0]]]
+            if not len(pairs):
+                continue
+            docs, tf = pairs[:, 0], pairs[:, 1].astype(np.float32)
+            df = len(docs)
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[docs] / avgdl)
+            scores[docs] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        top = np.argsort(-scores)[:k]
+        return [(chunk_ids[d], float(scores[d])) for d in top if scores[d] > 0]
+
+    def docs_with_all_terms(self, terms: List[str]) -> set:
+        """
+        Chunk ids containing every one of terms (exact identifier match).
+        """
+        if not terms:
+            return set()
+
+        with self._lock:
+            self._refresh()
+            rows = dict(self._conn.execute(
+                f"SELECT term, data FROM postings WHERE term IN ({','.join('?' * len(terms))})", terms
+            ).fetchall())
+            live, chunk_ids = self._live, self._chunk_ids
+
+        if len(rows) < len(set(terms)):
+            return set()
+
+        common = None
+        for data in rows.values():
+            docs = np.frombuffer(data, dtype=np.uint32).reshape(-1, 2)[:, 0]
+            docs = docs[live[docs]]
+            common = docs if common is None else np.intersect1d(common, docs)
+
+        return {chunk_ids[d] for d in common}
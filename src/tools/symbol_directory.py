@@ -0,0 +1,308 @@
+# src/tools/symbol_directory.py
+
+import os
+import re
+import csv
+from difflib import SequenceMatcher
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from src.registry import registry
+from src.config import SYMBOL_EXCHANGE_PREFERENCE
+
+
+LISTING_PATH = "data/symbols/listing.csv"
+
+# exchange -> Finnhub ticker suffix / Finnhub exchange code
+EXCHANGE_SUFFIXES = {"NSE": ".NS", "BSE": ".BO", "US": ""}
+FINNHUB_EXCHANGE_CODES = {"NSE": "NS", "BSE": "BO", "US": "US"}
+
+# words in a query that pin the exchange
+EXCHANGE_WORDS = {
+    "nse": "NSE", "bse": "BSE", "nasdaq": "US", "nyse": "US",
+}
+
+# words a query may carry around a company name ("what is tcs trading at")
+FILLER_WORDS = {
+    "what", "whats", "is", "are", "was", "how", "much", "for", "at", "in", "on",
+    "now", "right", "today", "current", "latest", "live", "stock", "stocks",
+    "share", "shares", "price", "prices", "quote", "rate", "value", "of",
+    "trading", "tell", "show", "give", "me", "check", "please", "pls",
+}
+
+LEGAL_SUFFIXES = {
+    "limited", "ltd", "inc", "incorporated", "corporation", "corp",
+    "company", "co", "plc", "the", "class",
+}
+
+PREFIX_MIN_CHARS = 3
+FUZZY_MIN_CHARS = 4
+PREFIX_KEEP = 5
+FUZZY_THRESHOLD = 0.55
+WORD_SIMILARITY = 0.75
+MAX_SPAN_WORDS = 5
+
+
+def normalize(text: str) -> str:
+    """
+    'Dr. Reddy's Laboratories Ltd' -> 'dr reddys laboratories'
+    """
+    t = text.lower().replace("&", " and ").replace("'", "").replace(".", "")
+    words = re.sub(r"[^a-z0-9]+", " ", t).split()
+    return " ".join(w for w in words if w not in LEGAL_SUFFIXES)
+
+
+def _trigrams(key: str) -> set:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SymbolDirectory:
+    """
+    Offline company name / ticker -> symbol resolution.
+
+    Every listing is indexed under its normalised name, aliases and
+    bare ticker. resolve() tries, in order:
+      1. exact key match on the whole query
+      2. exact match on a word span of the query, when the other words
+         are filler ("what is the tcs")
+      3. prefix match through a trie ("hindust" -> Hindustan Unilever)
+      4. trigram similarity for typos ("hdfc bnk")
+      5. a span with other words left over ("icici lombard" -> ICICI Bank),
+         returned as match "partial": likely a different, unlisted company
+    Listings of the same company are ranked by exchange preference.
+    """
+
+    def __init__(self, rows: List[Dict], preference: List[str] = None):
+        self.preference = preference or SYMBOL_EXCHANGE_PREFERENCE
+        self.entries = rows
+
+        self._exact = defaultdict(list)     # key -> [entry]
+        self._keys = []                     # key id -> key
+        self._key_entries = []              # key id -> [entry]
+        self._trie = {}
+        self._grams = defaultdict(list)     # trigram -> [key id]
+        self._gram_counts = []              # key id -> number of trigrams
+
+        for i, row in enumerate(rows):
+            for key in self._entry_keys(row):
+                self._exact[key].append(i)
+
+        for key, entry_ids in self._exact.items():
+            key_id = len(self._keys)
+            self._keys.append(key)
+            self._key_entries.append(entry_ids)
+
+            node = self._trie
+            for ch in key:
+                node = node.setdefault(ch, {})
+                node.setdefault("$", []).extend(entry_ids)
+
+            grams = _trigrams(key)
+            self._gram_counts.append(len(grams))
+            for gram in grams:
+                self._grams[gram].append(key_id)
+
+        self._rank_trie(self._trie)
+
+    @staticmethod
+    def _entry_keys(row) -> set:
+        keys = {normalize(row["name"]), row["symbol"].split(".")[0].lower()}
+        keys.update(normalize(a) for a in row.get("aliases", "").split("|") if a.strip())
+        keys.discard("")
+        return keys
+
+    def _rank_trie(self, node):
+        # keep only the best few entries per prefix, so lookups never walk subtrees
+        for ch, child in node.items():
+            if ch == "$":
+                continue
+            child["$"] = self._rank(set(child["$"]))[:PREFIX_KEEP]
+            self._rank_trie(child)
+
+    def _rank(self, entry_ids, preference=None) -> List[int]:
+        preference = preference or self.preference
+
+        def order(i):
+            exchange = self.entries[i]["exchange"]
+            rank = preference.index(exchange) if exchange in preference else len(preference)
+            return rank, len(self.entries[i]["name"]), i
+
+        return sorted(entry_ids, key=order)
+
+    # ---------------------------------------------------
+    # RESOLVE
+    # ---------------------------------------------------
+    def resolve(self, query: str) -> Optional[Dict]:
+        """
+        {"symbol", "name", "exchange", "match", "score"} or None.
+        """
+        words = normalize(query).split()
+        preference = list(self.preference)
+        pinned = [EXCHANGE_WORDS[w] for w in words if w in EXCHANGE_WORDS]
+        if pinned:
+            preference = [pinned[-1]] + [e for e in preference if e != pinned[-1]]
+            words = [w for w in words if w not in EXCHANGE_WORDS]
+
+        key = " ".join(words)
+        if not key:
+            return None
+
+        match = self._match(key, words, preference)
+        if match and pinned and match["exchange"] != pinned[-1]:
+            # same ticker on the requested exchange (e.g. INFY.NS -> INFY on NYSE)
+            base = match["symbol"].split(".")[0].lower()
+            on_pinned = [i for i in self._exact.get(base, ()) if self.entries[i]["exchange"] == pinned[-1]]
+            if on_pinned:
+                match = self._result(on_pinned, match["match"], match["score"], preference)
+        return match
+
+    def _match(self, key: str, words: List[str], preference) -> Optional[Dict]:
+        if key in self._exact:
+            return self._result(self._exact[key], "exact", 1.0, preference)
+
+        # longest word span first; short keys only match the whole query
+        partial = None
+        for size in range(min(len(words) - 1, MAX_SPAN_WORDS), 0, -1):
+            for start in range(len(words) - size + 1):
+                span = " ".join(words[start:start + size])
+                if len(span) < PREFIX_MIN_CHARS or span not in self._exact:
+                    continue
+                rest = words[:start] + words[start + size:]
+                if all(w in FILLER_WORDS for w in rest):
+                    return self._result(self._exact[span], "exact", 1.0, preference)
+                if partial is None:
+                    extra = [w for w in rest if w not in FILLER_WORDS]
+                    partial = (span, round(len(span) / len(key), 3), extra)
+
+        if len(key) >= PREFIX_MIN_CHARS:
+            node = self._trie
+            for ch in key:
+                node = node.get(ch)
+                if node is None:
+                    break
+            else:
+                return self._result(node["$"], "prefix", round(len(key) / (len(key) + 1), 3), preference)
+
+        if len(key) >= FUZZY_MIN_CHARS:
+            # a listed name plus other words is only a typo if the name
+            # it fuzzes to also has those words ("hdfc bnk", not "icici lombard")
+            match = self._fuzzy(key, preference, partial[2] if partial else ())
+            if match:
+                return match
+
+        if partial:
+            span, score, _ = partial
+            return self._result(self._exact[span], "partial", score, preference)
+        return None
+
+    def _fuzzy(self, key: str, preference, extra_words=()) -> Optional[Dict]:
+        grams = _trigrams(key)
+        common = defaultdict(int)
+        for gram in grams:
+            for key_id in self._grams.get(gram, ()):
+                common[key_id] += 1
+
+        # Dice coefficient over trigram sets
+        scored = []
+        for key_id, shared in common.items():
+            score = 2.0 * shared / (len(grams) + self._gram_counts[key_id])
+            if score >= FUZZY_THRESHOLD:
+                scored.append((-score, key_id))
+
+        for neg_score, key_id in sorted(scored):
+            if not extra_words or self._has_words(key_id, extra_words):
+                return self._result(self._key_entries[key_id], "fuzzy", round(-neg_score, 3), preference)
+        return None
+
+    def _has_words(self, key_id: int, words) -> bool:
+        key_words = self._keys[key_id].split()
+        return all(
+            any(SequenceMatcher(None, w, k).ratio() >= WORD_SIMILARITY for k in key_words)
+            for w in words
+        )
+
+    def _result(self, entry_ids, match, score, preference) -> Dict:
+        row = self.entries[self._rank(entry_ids, preference)[0]]
+        return {
+            "symbol": row["symbol"],
+            "name": row["name"],
+            "exchange": row["exchange"],
+            "match": match,
+            "score": score,
+        }
+
+
+# ---------------------------------------------------
+# LISTING FILE
+# ---------------------------------------------------
+def load_listing(path: str = LISTING_PATH) -> List[Dict]:
+    if not os.path.exists(path):
+        return []
+    with open(path, newline="", encoding="utf-8") as f:
+        return [row for row in csv.DictReader(f) if row.get("symbol")]
+
+
+def refresh_listing(exchanges=("NSE", "BSE", "US"), path: str = LISTING_PATH) -> dict:
+    """
+    Re-download listings from Finnhub /stock/symbol and rewrite the file.
+    Aliases from the existing file are kept. Reloads the shared directory.
+    """
+    from src.tools.http_client import finnhub_get
+
+    aliases = {row["symbol"]: row.get("aliases", "") for row in load_listing(path)}
+    rows = []
+
+    for exchange in exchanges:
+        r = finnhub_get("stock/symbol", exchange=FINNHUB_EXCHANGE_CODES[exchange])
+        if r.status_code != 200:
+            return {
+                "error": True,
+                "status_code": r.status_code,
+                "exchange": exchange,
+                "response_text": r.text,
+            }
+        for item in r.json():
+            symbol = item.get("symbol")
+            if not symbol or not item.get("description"):
+                continue
+            rows.append({
+                "symbol": symbol,
+                "name": item["description"],
+                "exchange": exchange,
+                "aliases": aliases.get(symbol, ""),
+            })
+
+    tmp_path = path + ".tmp"
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["symbol", "name", "exchange", "aliases"])
+        writer.writeheader()
+        writer.writerows(rows)
+    os.replace(tmp_path, path)
+
+    registry.reload("symbol_directory")
+    return {"rows": len(rows), "exchanges": list(exchanges)}
+
+
+def get_symbol_directory() -> SymbolDirectory:
+    return registry.get("symbol_directory", lambda: SymbolDirectory(load_listing()))
+
+
+def best_listing(results: List[Dict], preference: List[str] = None) -> Optional[Dict]:
+    """
+    Pick the preferred listing from Finnhub /search results
+    (common stock first, then exchange preference, then Finnhub's order).
+    """
+    preference = preference or SYMBOL_EXCHANGE_PREFERENCE
+    suffixes = [EXCHANGE_SUFFIXES.get(e, "") for e in preference]
+
+    def order(item):
+        position, result = item
+        symbol = result.get("symbol", "")
+        suffix = "." + symbol.rsplit(".", 1)[1] if "." in symbol else ""
+        rank = suffixes.index(suffix) if suffix in suffixes else len(suffixes)
+        return result.get("type") != "Common Stock", rank, position
+
+    ranked = sorted(enumerate(results), key=order)
+    return ranked[0][1] if ranked else None
@@ -1,9 +1,8 @@
 # src/tools/symbol_lookup.py
 
 import re
-import requests
-from urllib.parse import quote_plus
-from src.config import FINNHUB_API_KEY
+from src.tools.http_client import finnhub_get
+from src.tools.cache import cached
 
 def _clean_query(user_query: str) -> str:
     """
@@ -23,10 +22,11 @@ def _clean_query(user_query: str) -> str:
     return q if q else user_query.strip()
 
 def symbol_lookup(user_query: str) -> dict:
-    query = _clean_query(user_query)
-    url = f"https://finnhub.io/api/v1/search?q={quote_plus(query)}&token={FINNHUB_API_KEY}"
+    return _search(_clean_query(user_query))
 
-    r = requests.get(url, timeout=10)
+@cached("symbol", key=lambda query: query.lower())
+def _search(query: str) -> dict:
+    r = finnhub_get("search", q=query)
 
     # ✅ Better error message
     if r.status_code != 200:
@@ -1,14 +1,33 @@
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
 
+CHUNK_SIZE = 800
+CHUNK_OVERLAP = 150
+
+
+def get_splitter(chunk_size: int = CHUNK_SIZE, chunk_overlap: int = CHUNK_OVERLAP):
+    return RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+    )
+
+
 def split_documents(documents):
     """
     Split documents into smaller chunks for embedding.
     Uses LangChain's updated text splitters package.
     """
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=800,
-        chunk_overlap=150,
-    )
+    splitter = get_splitter()
 
     return splitter.split_documents(documents)
+
+
+def iter_split_documents(documents):
+    """
+    Generator version of split_documents: splits one page at a time
+    so pages never have to be held in a list.
+    """
+    splitter = get_splitter()
+
+    for doc in documents:
+        yield from splitter.split_documents([doc])
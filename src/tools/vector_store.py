@@ -1,28 +1,315 @@
 import os
+import json
+import math
+import pickle
+import hashlib
+import numpy as np
+import faiss
 from langchain_community.vectorstores import FAISS
 from src.tools.embeddings import get_embeddings
+from src.tools.chunk_store import SQLiteDocstore
+from src.registry import registry
+from src.config import VECTOR_INDEX_TYPE, FAISS_NPROBE, FAISS_EF_SEARCH
 
 
 VECTOR_DB_PATH = "data/vector_store"
+MANIFEST_PATH = os.path.join(VECTOR_DB_PATH, "manifest.json")
+CHUNK_STORE_PATH = os.path.join(VECTOR_DB_PATH, "chunks.sqlite")
+LEGACY_DOCSTORE_PATH = os.path.join(VECTOR_DB_PATH, "index.pkl")
 
+# index_type -> faiss index_factory spec (all L2, like LangChain's default)
+INDEX_TYPES = {
+    "flat": "Flat",
+    "ivf_flat": "IVF{nlist},Flat",
+    "ivf_pq": "IVF{nlist},PQ{m}x{nbits}",
+    "hnsw": "HNSW32",
+}
+TRAIN_SAMPLE_SIZE = 50_000
 
-def build_faiss_index(documents):
+
+def build_faiss_index(documents, ids=None):
     """
     Create FAISS vector store from documents.
     """
     embeddings = get_embeddings()
-    db = FAISS.from_documents(documents, embeddings)
-    db.save_local(VECTOR_DB_PATH)
+    db = FAISS.from_documents(documents, embeddings, ids=ids)
+    save_faiss_index(db)
     return db
 
 
-def load_faiss_index():
+def new_faiss_index(embeddings, dim: int):
+    """
+    Empty flat index backed by the on-disk chunk store.
+    """
+    return FAISS(embeddings, faiss.IndexFlatL2(dim), get_chunk_store(), {})
+
+
+def load_faiss_index(index_type: str = None, writable: bool = False):
     """
     Load FAISS vector store from disk.
+
+    The flat index (index.faiss) is the canonical, updatable copy.
+    Query-only loads use the ANN index for index_type if one was built,
+    and are memory-mapped so worker processes share the same pages.
+    Chunk text stays in SQLite and is read per hit, never unpickled.
     """
     embeddings = get_embeddings()
-    return FAISS.load_local(
-        VECTOR_DB_PATH,
-        embeddings,
-        allow_dangerous_deserialization=True
-    )
+    index_type = index_type or VECTOR_INDEX_TYPE
+    store = get_chunk_store()
+
+    if store.current_version() == 0 and os.path.exists(LEGACY_DOCSTORE_PATH):
+        migrate_pickle_docstore(store)
+
+    if writable:
+        index = faiss.read_index(_index_path("flat"))
+        index_to_docstore_id = dict(store.id_map().items())
+    else:
+        path = _index_path(index_type)
+        if not os.path.exists(path):
+            path = _index_path("flat")
+        index = read_index_mmap(path)
+        set_search_params(index, nprobe=FAISS_NPROBE, ef_search=FAISS_EF_SEARCH)
+        index_to_docstore_id = store.id_map()
+
+    return FAISS(embeddings, index, store, index_to_docstore_id)
+
+
+def get_shared_index():
+    """
+    Process-wide FAISS index, loaded once and shared by all sessions.
+    """
+    return registry.get("vector_store", load_faiss_index)
+
+
+def publish_index():
+    """
+    Swap the freshly saved index in for all sessions.
+    """
+    registry.put("vector_store", load_faiss_index(), factory=load_faiss_index)
+
+
+def save_faiss_index(db, index_type: str = None):
+    """
+    Persist an updated FAISS vector store.
+    If an ANN index type is configured it is rebuilt from the flat vectors.
+    """
+    store = get_chunk_store()
+    if db.docstore is not store:
+        store.add({
+            id_: db.docstore.search(id_)
+            for id_ in db.index_to_docstore_id.values()
+        })
+
+    _write_index(db.index, _index_path("flat"))
+    _write_ann_index(db.index, index_type or VECTOR_INDEX_TYPE)
+    store.save_id_map(db.index_to_docstore_id)
+
+
+def ensure_ann_index(index_type: str = None):
+    """
+    Build the ANN index for index_type if only the flat one exists
+    (e.g. after switching VECTOR_INDEX_TYPE without corpus changes).
+    """
+    index_type = index_type or VECTOR_INDEX_TYPE
+    if index_type == "flat" or os.path.exists(_index_path(index_type)) or not index_exists():
+        return
+    _write_ann_index(faiss.read_index(_index_path("flat")), index_type)
+
+
+def index_exists() -> bool:
+    return os.path.exists(os.path.join(VECTOR_DB_PATH, "index.faiss"))
+
+
+# ---------------------------------------------------
+# CHUNK STORE
+# ---------------------------------------------------
+
+def get_chunk_store() -> SQLiteDocstore:
+    def build():
+        os.makedirs(VECTOR_DB_PATH, exist_ok=True)
+        store = SQLiteDocstore(CHUNK_STORE_PATH)
+        if store.current_version() and store.sparse.is_empty():
+            store.rebuild_sparse()
+        return store
+
+    return registry.get("chunk_store", build)
+
+
+def get_index_version() -> int:
+    """
+    Increments every time the index is saved; used to invalidate caches.
+    """
+    return get_chunk_store().current_version()
+
+
+def migrate_pickle_docstore(store: SQLiteDocstore):
+    """
+    One-time import of a LangChain index.pkl written by older versions.
+    This is the only place a pickle is still read.
+    """
+    with open(LEGACY_DOCSTORE_PATH, "rb") as f:
+        docstore, index_to_docstore_id = pickle.load(f)
+
+    store.add({id_: docstore.search(id_) for id_ in index_to_docstore_id.values()})
+    store.save_id_map(index_to_docstore_id)
+
+
+# ---------------------------------------------------
+# INDEX TYPES
+# ---------------------------------------------------
+
+def _index_path(index_type: str) -> str:
+    name = "index.faiss" if index_type == "flat" else f"index.{index_type}.faiss"
+    return os.path.join(VECTOR_DB_PATH, name)
+
+
+def _write_ann_index(flat_index, index_type: str):
+    if index_type == "flat":
+        return
+
+    path = _index_path(index_type)
+    if not flat_index.ntotal:
+        if os.path.exists(path):
+            os.remove(path)
+        return
+
+    vectors = flat_index.reconstruct_n(0, flat_index.ntotal)
+    _write_index(make_faiss_index(vectors, index_type), path)
+
+
+def _write_index(index, path: str):
+    """
+    Write via a temp file + rename, so processes that memory-mapped
+    the previous file keep a consistent view.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    faiss.write_index(index, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def make_faiss_index(vectors, index_type: str = "flat", seed: int = 0):
+    """
+    Build a trained faiss index of the given type and add vectors to it.
+    Training runs on a random sample of at most TRAIN_SAMPLE_SIZE vectors.
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type {index_type!r}, expected one of {list(INDEX_TYPES)}")
+
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    n, dim = vectors.shape
+
+    # ~4*sqrt(n) lists, with enough points per list to train k-means
+    nlist = max(1, min(int(4 * math.sqrt(n)), n // 39))
+    m = next(m for m in (48, 32, 24, 16, 12, 8, 4, 2, 1) if dim % m == 0)
+    # 8-bit PQ codebooks need ~10k training points; use 4-bit below that
+    nbits = 8 if n >= 256 * 39 else 4
+    spec = INDEX_TYPES[index_type].format(nlist=nlist, m=m, nbits=nbits)
+    index = faiss.index_factory(dim, spec)
+
+    if not index.is_trained:
+        rng = np.random.default_rng(seed)
+        sample = vectors[rng.choice(n, min(n, TRAIN_SAMPLE_SIZE), replace=False)]
+        index.train(sample)
+
+    index.add(vectors)
+    return index
+
+
+def read_index_mmap(path: str):
+    """
+    Read an index with memory-mapped storage where faiss supports it
+    for the index type; fall back to a normal read.
+    """
+    for flags in (
+        faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY,
+        faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY,
+    ):
+        try:
+            return faiss.read_index(path, flags)
+        except RuntimeError:
+            continue
+    return faiss.read_index(path)
+
+
+def set_search_params(index, nprobe: int = None, ef_search: int = None):
+    """
+    Tune recall/latency at query time: nprobe for IVF, efSearch for HNSW.
+    """
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None and nprobe:
+        ivf.nprobe = min(nprobe, ivf.nlist)
+
+    hnsw = getattr(faiss.downcast_index(index), "hnsw", None)
+    if hnsw is not None and ef_search:
+        hnsw.efSearch = ef_search
+
+
+# ---------------------------------------------------
+# INGESTION MANIFEST
+# ---------------------------------------------------
+
+def file_sha256(path: str) -> str:
+    """
+    Content hash of a PDF, used to detect new/changed files.
+    """
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def chunk_id(path: str, sha256: str, n: int) -> str:
+    """
+    Stable vector ID for chunk n of one version of one file.
+    """
+    prefix = hashlib.sha1(f"{path}:{sha256}".encode("utf-8")).hexdigest()[:16]
+    return f"{prefix}:{n}"
+
+
+def load_manifest() -> dict:
+    """
+    Manifest stored next to the index:
+    {"files": {path: {"sha256": ..., "chunk_ids": [...]}}}
+    """
+    if not os.path.exists(MANIFEST_PATH):
+        return {"files": {}}
+
+    with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest: dict):
+    os.makedirs(VECTOR_DB_PATH, exist_ok=True)
+    tmp_path = MANIFEST_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, MANIFEST_PATH)
+
+
+def manifest_from_index(db, pdf_paths) -> dict:
+    """
+    Rebuild a manifest for an index created before manifests existed,
+    by grouping stored chunk IDs by their source file.
+    """
+    by_source = {}
+    for doc_id in db.index_to_docstore_id.values():
+        doc = db.docstore.search(doc_id)
+        source = os.path.normpath(doc.metadata.get("source", ""))
+        by_source.setdefault(source, []).append(doc_id)
+
+    files = {}
+    for path in pdf_paths:
+        key = os.path.normpath(path)
+        if key in by_source:
+            files[key] = {
+                "sha256": file_sha256(path),
+                "chunk_ids": by_source.pop(key),
+            }
+
+    # sources no longer on disk stay listed so they get removed
+    for key, ids in by_source.items():
+        files[key] = {"sha256": None, "chunk_ids": ids}
+
+    return {"files": files}
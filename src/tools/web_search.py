@@ -2,10 +2,33 @@
 
 from langchain_tavily import TavilySearch
 
+from src.registry import registry
+from src.ratelimit import get_limiter, SingleFlight
+from src.tracing import span
+from src.config import RATE_LIMIT_QUEUE_TIMEOUT, TAVILY_BASE_URL
+
+# identical searches already in flight share one Tavily call
+_flight = SingleFlight()
+
+
 def web_search(query: str):
     """
     Search the web using Tavily.
     Returns top results as JSON.
     """
-    tool = TavilySearch(max_results=5)
-    return tool.invoke({"query": query})
+    tool = registry.get("tavily_search", _make_tavily)
+
+    def search():
+        get_limiter().acquire("tavily", timeout=RATE_LIMIT_QUEUE_TIMEOUT)
+        return tool.invoke({"query": query})
+
+    with span("tavily") as s:
+        result, shared = _flight.do(query.strip().lower(), search)
+        s.set(coalesced=shared)
+    return result
+
+
+def _make_tavily():
+    if TAVILY_BASE_URL:
+        return TavilySearch(max_results=5, api_base_url=TAVILY_BASE_URL.rstrip("/"))
+    return TavilySearch(max_results=5)
@@ -0,0 +1,346 @@
+"""
+Per-request tracing and stage-level latency metrics.
+
+- a trace per user request (finance / rag), spans per stage
+  (routing, tools, HTTP calls, retrieval, LLM), nested through contextvars
+- every span feeds a latency histogram, exported in Prometheus text format
+- finished traces go to an in-memory ring for the debug panel and,
+  if TRACE_LOG_PATH is set, a size-rotated JSONL log
+- user text is never recorded, only its length and a short hash
+
+Usage:
+    with trace("rag", **query_attrs(query)):
+        with span("retrieval") as s:
+            docs = ...
+            s.set(mode="hybrid", k=len(docs))
+"""
+
+import os
+import json
+import time
+import uuid
+import hashlib
+import bisect
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+
+from src.config import TRACING_ENABLED, TRACE_LOG_PATH, TRACE_LOG_MAX_BYTES, TRACE_LOG_BACKUPS
+from src.ratelimit import current_session
+
+
+RECENT_TRACES = 50
+
+# histogram buckets, seconds
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """
+    One timed stage; use as a context manager (see span()).
+    """
+    __slots__ = ("name", "parent", "start", "end", "attrs", "_token")
+
+    def __init__(self, name, attrs):
+        self.name = name
+        self.attrs = attrs
+        self.end = None
+
+    def __enter__(self):
+        self.parent = _current_span.get()
+        self._token = _current_span.set(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end = time.perf_counter()
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        try:
+            _current_span.reset(self._token)
+        except ValueError:
+            # closed from another context (e.g. an abandoned stream)
+            pass
+
+        t = _current_trace.get()
+        if t is not None:
+            t.spans.append(self)
+        METRICS.observe("atom_span_seconds", (("span", self.name),), self.end - self.start)
+        return False
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+        return self
+
+    @property
+    def duration(self) -> float:
+        return (self.end or time.perf_counter()) - self.start
+
+
+class Trace:
+    """
+    One user request. Created by start_trace() / trace(); finish() records it.
+    """
+
+    def __init__(self, name, attrs):
+        self.id = uuid.uuid4().hex[:16]
+        self.name = name
+        self.attrs = attrs
+        self.spans = []
+        self.wall_start = time.time()
+        self.start = time.perf_counter()
+        self.end = None
+        self._token = _current_trace.set(self)
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+        return self
+
+    def finish(self, **attrs):
+        if self.end is not None:
+            return
+        self.end = time.perf_counter()
+        self.attrs.update(attrs)
+        try:
+            _current_trace.reset(self._token)
+        except ValueError:
+            # finished from another context (e.g. an abandoned stream)
+            pass
+
+        METRICS.observe("atom_request_seconds", (("agent", self.name),), self.end - self.start)
+        record = self.to_dict()
+        _recent.append(record)
+        _log.write(record)
+
+    def to_dict(self) -> dict:
+        spans = sorted(self.spans, key=lambda s: s.start)
+        index = {id(s): i for i, s in enumerate(spans)}
+        return {
+            "trace_id": self.id,
+            "name": self.name,
+            "time": self.wall_start,
+            "duration_ms": round(((self.end or time.perf_counter()) - self.start) * 1000, 3),
+            "attrs": self.attrs,
+            "spans": [
+                {
+                    "name": s.name,
+                    "parent": index.get(id(s.parent)),
+                    "offset_ms": round((s.start - self.start) * 1000, 3),
+                    "duration_ms": round(s.duration * 1000, 3),
+                    "attrs": s.attrs,
+                }
+                for s in spans
+            ],
+        }
+
+
+# ---------------------------------------------------
+# PUBLIC API
+# ---------------------------------------------------
+def start_trace(name: str, **attrs) -> Trace:
+    """
+    Begin a request trace in the current context; call finish() when done.
+    For work that outlives the call that starts it (streamed answers).
+    """
+    attrs.setdefault("session", current_session.get())
+    return Trace(name, attrs)
+
+
+def query_attrs(query: str) -> dict:
+    """
+    Trace attributes for user text (which may hold salaries, goals):
+    its length and a short hash, never the text itself.
+    """
+    text = query or ""
+    return {
+        "query_chars": len(text),
+        "query_hash": hashlib.sha256(text.encode("utf-8")).hexdigest()[:12],
+    }
+
+
+@contextmanager
+def trace(name: str, **attrs):
+    t = start_trace(name, **attrs)
+    try:
+        yield t
+    except Exception as e:
+        t.set(error=type(e).__name__)
+        raise
+    finally:
+        t.finish()
+
+
+def span(name: str, **attrs):
+    """
+    Time one stage:  with span("retrieval") as s: ...
+    Always feeds the histogram; attached to the current trace (and
+    parent span) when there is one.
+    """
+    if not TRACING_ENABLED:
+        return _NULL_SPAN
+    return Span(name, attrs)
+
+
+def annotate(**attrs):
+    """
+    Attach attributes to the innermost open span (or the trace).
+    """
+    s = _current_span.get()
+    if s is not None:
+        s.attrs.update(attrs)
+        return
+    t = _current_trace.get()
+    if t is not None:
+        t.attrs.update(attrs)
+
+
+def count(metric: str, value: float = 1, **labels):
+    METRICS.inc(metric, labels, value)
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+def recent_traces(session: str = None, limit: int = 10):
+    """
+    Newest first; only this session's traces if session is given.
+    """
+    traces = [t for t in reversed(_recent)
+              if session is None or t["attrs"].get("session") == session]
+    return traces[:limit]
+
+
+class _NullSpan:
+    attrs = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        return self
+
+
+_NULL_SPAN = _NullSpan()
+
+
+# ---------------------------------------------------
+# METRICS (Prometheus text format)
+# ---------------------------------------------------
+class Metrics:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._histograms = {}   # (name, labels) -> [bucket counts..., sum, count]
+        self._counters = {}     # (name, labels) -> value
+
+    def observe(self, name: str, labels: tuple, value: float):
+        """
+        labels: tuple of (name, value) pairs, e.g. (("span", "llm"),)
+        """
+        key = (name, labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            h = self._histograms.get(key)
+            if h is None:
+                h = self._histograms[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            h[i] += 1
+            h[-2] += value
+            h[-1] += 1
+
+    def inc(self, name: str, labels: dict, value: float = 1):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def text(self) -> str:
+        with self._lock:
+            histograms = {k: list(v) for k, v in self._histograms.items()}
+            counters = dict(self._counters)
+
+        lines, typed = [], set()
+        for (name, labels), h in sorted(histograms.items()):
+            if name not in typed:
+                lines.append(f"# TYPE {name} histogram")
+                typed.add(name)
+            cumulative = 0
+            for bound, n in zip(list(self.buckets) + ["+Inf"], h[:-2]):
+                cumulative += n
+                lines.append(f"{name}_bucket{_labels(labels, le=bound)} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels)} {h[-2]:.6f}")
+            lines.append(f"{name}_count{_labels(labels)} {h[-1]}")
+
+        for (name, labels), value in sorted(counters.items()):
+            if name not in typed:
+                lines.append(f"# TYPE {name} counter")
+                typed.add(name)
+            lines.append(f"{name}{_labels(labels)} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels, **extra) -> str:
+    items = list(labels) + [(k, v) for k, v in extra.items()]
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+
+METRICS = Metrics()
+
+
+def metrics_text() -> str:
+    return METRICS.text()
+
+
+# ---------------------------------------------------
+# JSONL TRACE LOG
+# ---------------------------------------------------
+class TraceLog:
+    """
+    Append-only JSONL; at max_bytes the file moves to path.1
+    (path.1 -> path.2, ...) and the oldest of `backups` is dropped.
+    """
+
+    def __init__(self, path: str, max_bytes: int = TRACE_LOG_MAX_BYTES,
+                 backups: int = TRACE_LOG_BACKUPS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._lock = threading.Lock()
+        self._file = None
+
+    def write(self, record: dict):
+        if not self.path:
+            return
+        line = json.dumps(record, default=str) + "\n"
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            elif self.max_bytes and self._file.tell() >= self.max_bytes:
+                self._rotate()
+            self._file.write(line)
+            self._file.flush()
+
+    def _rotate(self):
+        self._file.close()
+        for n in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{n}"):
+                os.replace(f"{self.path}.{n}", f"{self.path}.{n + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+
+_recent = deque(maxlen=RECENT_TRACES)
+_log = TraceLog(TRACE_LOG_PATH if TRACING_ENABLED else "")